@@ -0,0 +1,3 @@
+from DMD.cli import main
+
+main()
@@ -0,0 +1,141 @@
+import time
+import torch as pt
+from DMD.reconstruction import LazyReconstruction
+
+def adjoint_product(phi, data_matrix):
+    """
+    Function that computes phi^H @ data_matrix, without converting a real data matrix to complex (a full-size copy).
+
+    Parameters:
+        phi (torch.Tensor): Complex matrix, e.g. DMD modes or an orthonormal basis of them.
+        data_matrix (torch.Tensor): Real or complex matrix of data, with as many rows as phi.
+
+    Returns:
+        product (torch.Tensor): Complex matrix with one row per column of phi and one column per column of data.
+
+    """
+    if data_matrix.is_complex():
+        return phi.conj().T @ data_matrix
+    return pt.complex(phi.real.T @ data_matrix, -(phi.imag.T @ data_matrix))
+
+def pinv_amplitudes(phi, data_matrix):
+    """
+    Function that computes the amplitudes of DMD modes as b = pinv(phi) @ x_0.
+
+    Parameters:
+        phi (torch.Tensor): Tensor containing DMD modes.
+        data_matrix (torch.Tensor): Matrix of data.
+
+    Returns:
+        b (torch.Tensor): Amplitudes of DMD modes.
+
+    """
+    return pt.linalg.pinv(phi) @ data_matrix[:, 0].type(phi.dtype)
+
+def projected_amplitudes(sr, Vr, eig_val, eig_vec):
+    """
+    Function that computes the amplitudes of DMD modes in the reduced space, without touching the m x r mode matrix.
+
+    Since Ur^H @ phi = eig_vec @ diag(eig_val) and Ur^H @ x_0 = sr * Vr[:, 0], the amplitudes solve
+    the r x r system (eig_vec @ diag(eig_val)) @ b = sr * Vr[:, 0].
+
+    Parameters:
+        sr (torch.Tensor): Reduced singular values.
+        Vr (torch.Tensor): Reduced conjugate transpose of the right singular vectors.
+        eig_val (torch.Tensor): Eigenvalues of the reduced operator.
+        eig_vec (torch.Tensor): Eigenvectors of the reduced operator.
+
+    Returns:
+        b (torch.Tensor): Amplitudes of DMD modes.
+
+    """
+    x0_reduced = (sr * Vr[:, 0]).type(eig_vec.dtype)
+    return pt.linalg.lstsq(eig_vec * eig_val, x0_reduced.unsqueeze(1)).solution.squeeze(1)
+
+def optimal_amplitudes(phi, data_matrix, eig_val):
+    """
+    Function that computes the amplitudes of DMD modes that best fit all snapshots in least-squares sense (Jovanovic, Schmid and Nichols).
+
+    Minimizing ||data_matrix - phi @ diag(b) @ vander||_F leads to the r x r system P @ b = q, with
+    P = (phi^H @ phi) * conj(vander @ vander^H) and q = conj(diag(vander @ data_matrix^H @ phi)).
+
+    Parameters:
+        phi (torch.Tensor): Tensor containing DMD modes.
+        data_matrix (torch.Tensor): Matrix of data.
+        eig_val (torch.Tensor): Eigenvalues of the reduced operator.
+
+    Returns:
+        b (torch.Tensor): Amplitudes of DMD modes.
+
+    """
+    vander_matrix = pt.vander(eig_val, data_matrix.size(1), increasing = True)
+
+    P = (phi.conj().T @ phi) * (vander_matrix @ vander_matrix.conj().T).conj()
+    q = (vander_matrix * adjoint_product(phi, data_matrix).conj()).sum(dim=1).conj()
+
+    return pt.linalg.solve(P, q)
+
+def compute_amplitudes(method, phi, data_matrix, sr, Vr, eig_val, eig_vec):
+    """
+    Function that computes the amplitudes of DMD modes with the chosen strategy.
+
+    Parameters:
+        method (str): "pinv", "projected" or "optimal".
+        phi (torch.Tensor): Tensor containing DMD modes.
+        data_matrix (torch.Tensor): Matrix of data.
+        sr (torch.Tensor): Reduced singular values.
+        Vr (torch.Tensor): Reduced conjugate transpose of the right singular vectors.
+        eig_val (torch.Tensor): Eigenvalues of the reduced operator.
+        eig_vec (torch.Tensor): Eigenvectors of the reduced operator.
+
+    Returns:
+        b (torch.Tensor): Amplitudes of DMD modes.
+
+    Raises:
+        ValueError: If `method` is not one of the available ones.
+
+    """
+    if method == "pinv":
+        return pinv_amplitudes(phi, data_matrix)
+
+    elif method == "projected":
+        return projected_amplitudes(sr, Vr, eig_val, eig_vec)
+
+    elif method == "optimal":
+        return optimal_amplitudes(phi, data_matrix, eig_val)
+
+    raise ValueError(f"Unknown amplitude method '{method}', choose among 'pinv', 'projected' and 'optimal'.")
+
+def benchmark_amplitudes(phi, data_matrix, sr, Vr, eig_val, eig_vec, methods=("pinv", "projected", "optimal")):
+    """
+    Function that compares amplitude strategies for runtime and reconstruction error.
+
+    Parameters:
+        phi (torch.Tensor): Tensor containing DMD modes.
+        data_matrix (torch.Tensor): Matrix of data.
+        sr (torch.Tensor): Reduced singular values.
+        Vr (torch.Tensor): Reduced conjugate transpose of the right singular vectors.
+        eig_val (torch.Tensor): Eigenvalues of the reduced operator.
+        eig_vec (torch.Tensor): Eigenvectors of the reduced operator.
+        methods (tuple, optional): Strategies to be compared.
+
+    Returns:
+        results (dict): For each method, runtime in seconds, speedup with respect to "pinv" and MSE averaged over time steps.
+
+    """
+    vander_matrix = pt.vander(eig_val, data_matrix.size(1), increasing = True)
+    results = {}
+
+    for method in methods:
+        start = time.perf_counter()
+        b = compute_amplitudes(method, phi, data_matrix, sr, Vr, eig_val, eig_vec)
+        elapsed = time.perf_counter() - start
+
+        mse = LazyReconstruction(phi, b.unsqueeze(1) * vander_matrix).mse(data_matrix)
+        results[method] = {"time": elapsed, "mse": mse.real.mean().item()}
+
+    if "pinv" in results:
+        for result in results.values():
+            result["speedup"] = results["pinv"]["time"] / result["time"]
+
+    return results
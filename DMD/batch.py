@@ -0,0 +1,169 @@
+import os
+import logging
+import torch as pt
+import torch.multiprocessing    # Registers reductions that send tensors to worker processes through shared memory
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from numpy import pi
+from DMD.data_loader import load_data, load_snapshots
+from DMD.data_processor import select_time_steps, allocate_data_matrix
+from DMD.simulation import run_DMD
+from DMD.execution import ExecutionSettings
+from DMD.config import DATASET_NAME, FIELD_NAME, MASK_LOWER_BOUND, MASK_UPPER_BOUND, TIME_THRESHOLD, SVD_THRESHOLD, REAL_DMD
+
+logger = logging.getLogger(__name__)
+
+CaseSpec = namedtuple("CaseSpec", ["name", "dataset", "field", "lower", "upper", "min_time", "thr", "keep_pairs"],
+                      defaults=[DATASET_NAME, FIELD_NAME, MASK_LOWER_BOUND, MASK_UPPER_BOUND, TIME_THRESHOLD, SVD_THRESHOLD, False])
+CaseSpec.__doc__ = """
+Specification of a DMD case: name, dataset, field, mask bounds (lower, upper), minimum time, threshold of singular values contribution
+and whether rank selection keeps pairs of singular values together (see `run_DMD`).
+Every field but the name defaults to the value in DMD.config, keep_pairs to the default of `run_DMD`.
+"""
+
+def load_field(dataset_name, field_name, min_time):
+    """
+    Function that loads a field on every vertex of the grid, so that cases sharing dataset and field load it only once.
+
+    Parameters:
+        dataset_name (str): Name of the dataset among flowtorch DATASETS.
+        field_name (str): Name of the field to be loaded.
+        min_time (float): Minimum time kept.
+
+    Returns:
+        pts (torch.FloatTensor): Vertices of the grid.
+        times (list): List of time steps loaded.
+        field_matrix (torch.FloatTensor): Matrix of field values, one row per vertex and one column per time step.
+
+    """
+    times, pts, loader = load_data(dataset_name=dataset_name)
+    times, _ = select_time_steps(times, min_time)
+
+    field_matrix = allocate_data_matrix(pts.size(0), len(times), storage="memory")
+    load_snapshots(loader, field_name, times, pt.ones(pts.size(0), dtype=pt.bool), field_matrix)
+
+    return pts, times, field_matrix
+
+def _init_worker(threads):
+    # Without a limit, every worker would start as many threads as cores
+    ExecutionSettings(threads=threads, blas_threads=threads).apply()
+
+def run_case(spec, pts, times, field_matrix, keep_modes=False):
+    """
+    Function that runs DMD on one case, starting from the field loaded on every vertex.
+
+    Parameters:
+        spec (CaseSpec): Specification of the case.
+        pts (torch.FloatTensor): Vertices of the grid.
+        times (list): List of time steps of `field_matrix`.
+        field_matrix (torch.FloatTensor): Matrix of field values on every vertex.
+        keep_modes (bool, optional): If True, DMD modes are part of the results.
+
+    Returns:
+        result (dict): Specification, optimal rank, eigenvalues, frequencies in Hz, amplitudes, MSE and, optionally, modes.
+
+    """
+    from flowtorch.data import mask_box    # Imported on first use, see `load_data`
+
+    mask = mask_box(pts, lower=spec.lower, upper=spec.upper)
+    t_steps, dt = select_time_steps(times, spec.min_time)
+
+    data_matrix = field_matrix[:, len(times) - len(t_steps):][mask]
+    if not REAL_DMD:
+        data_matrix = data_matrix.type(pt.cfloat)
+
+    # The reconstruction is never needed, only its error
+    optimal_rank, eig_val, _, phi, dynamics, _, mse = run_DMD((mask, t_steps, dt, data_matrix), thr=spec.thr,
+                                                              keep_pairs=spec.keep_pairs, lazy=True)
+
+    result = {
+        "spec": spec._asdict(),
+        "optimal_rank": optimal_rank,
+        "eig_val": eig_val,
+        "frequencies": pt.log(eig_val).imag / (2.0 * pi * dt),
+        "amplitudes": dynamics[:, 0],
+        "mse": mse,
+    }
+
+    if keep_modes:
+        result["phi"] = phi
+
+    return result
+
+def run_batch(specs, results_path=None, workers=None, keep_modes=False):
+    """
+    Function that runs many DMD cases through a pool of processes.
+
+    Cases with the same dataset and field share the snapshots, which are loaded once on every vertex and handed to
+    the workers through shared memory; each worker only applies its own mask and time window.
+
+    Parameters:
+        specs (list): List of CaseSpec objects. Names must be unique.
+        results_path (str, optional): Path of the file where results are saved with `torch.save`.
+        workers (int, optional): Number of processes, by default the number of cores.
+        keep_modes (bool, optional): If True, DMD modes are part of the results.
+
+    Returns:
+        results (dict): Results of each case, see `run_case`, keyed by case name.
+
+    Raises:
+        ValueError: If two cases have the same name.
+
+    """
+    names = [spec.name for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError("Case names must be unique.")
+
+    workers = workers or os.cpu_count()
+    threads = max(1, os.cpu_count() // workers)
+
+    groups = {}
+    for spec in specs:
+        groups.setdefault((spec.dataset, spec.field), []).append(spec)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(threads,)) as pool:
+        futures = {}
+
+        for (dataset, field), group in groups.items():
+            logger.info(f"Loading field '{field}' of dataset '{dataset}' for {len(group)} cases...")
+            pts, times, field_matrix = load_field(dataset, field, min(spec.min_time for spec in group))
+            field_matrix.share_memory_()
+
+            for spec in group:
+                futures[spec.name] = pool.submit(run_case, spec, pts, times, field_matrix, keep_modes)
+
+        for name, future in futures.items():
+            results[name] = future.result()
+            logger.info(f"Case '{name}' completed, optimal rank {results[name]['optimal_rank']}")
+
+    if results_path is not None:
+        save_results(results, results_path)
+
+    return results
+
+def save_results(results, path):
+    """
+    Function that saves the results of a batch in a single binary file.
+
+    Parameters:
+        results (dict): Results keyed by case name, see `run_batch`.
+        path (str): Path of the file.
+
+    """
+    tmp_path = f"{path}.tmp"
+    pt.save(results, tmp_path)
+    os.replace(tmp_path, path)
+
+def load_results(path):
+    """
+    Function that loads the results of a batch saved with `save_results`.
+
+    Parameters:
+        path (str): Path of the file.
+
+    Returns:
+        results (dict): Results keyed by case name.
+
+    """
+    return pt.load(path)
@@ -0,0 +1,194 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import torch as pt
+from DMD.config import CACHE_DIR, CACHE_MAX_BYTES
+
+def _sources(dataset_path, field_names):
+    # Only files of the chosen fields and of the mesh determine the content of an entry, so they are looked up
+    # directly in every folder of the case and of its processor folders, instead of walking the whole dataset
+    roots = [dataset_path] + [os.path.join(dataset_path, name) for name in sorted(os.listdir(dataset_path))
+                              if name.startswith("processor") and os.path.isdir(os.path.join(dataset_path, name))]
+    paths = []
+
+    for root in roots:
+        for folder in sorted(os.listdir(root)):
+            paths += [os.path.join(root, folder, name) for name in field_names]
+            for directory, dirs, files in os.walk(os.path.join(root, folder, "polyMesh")):
+                dirs.sort()
+                paths += [os.path.join(directory, name) for name in sorted(files)]
+
+    sources = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:    # Field not written in this folder
+            continue
+        sources.append([os.path.relpath(path, dataset_path), stat.st_mtime_ns, stat.st_size])
+
+    return sources
+
+class SnapshotCache:
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        """
+        Class for storing processed data matrices on disk, so that repeated runs don't parse snapshots again.
+
+        Every entry is a folder named after its key, containing `data_matrix.npy`, `mask.npy` and `meta.json`.
+        When the total size exceeds `max_bytes`, least recently used entries are evicted.
+
+        Parameters:
+            directory (str, optional): Folder where entries are stored.
+            max_bytes (int, optional): Maximum size of the cache in bytes.
+
+        Methods:
+            key(dataset_path, field_name, lower, upper, min_time, dtype, components): Computes the key of an entry.
+            load(key): Returns the stored entry or None if missing.
+            store(key, mask, t_steps, dt, data_matrix): Stores a new entry and evicts old ones if needed.
+            invalidate(key): Removes one entry, or all of them if no key is given.
+            size(): Returns the total size of the cache in bytes.
+
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, dataset_path, field_name, lower, upper, min_time, dtype=None, components=None):
+        """
+        Computes the key of an entry from the parameters of processing and the modification times of source files.
+        Only the files of the chosen fields and of the mesh are looked up, instead of walking the whole dataset.
+
+        Parameters:
+            dataset_path (str): Path of the dataset folder.
+            field_name (str or list): Name of the loaded field, or list of names if several fields are stacked.
+            lower (list): Lower bound of the mask box.
+            upper (list): Upper bound of the mask box.
+            min_time (float): Minimum time step kept.
+            dtype (torch.dtype, optional): Type of the stored data matrix.
+            components (list, optional): List of (field name, component) pairs of stacked fields.
+
+        Returns:
+            key (str): Hexadecimal digest identifying the entry.
+
+        """
+        field_names = [field_name] if isinstance(field_name, str) else list(field_name)
+        sources = _sources(str(dataset_path), field_names)
+
+        description = {
+            "dataset": os.path.abspath(dataset_path),
+            "field": field_name,
+            "lower": [float(v) for v in lower],
+            "upper": [float(v) for v in upper],
+            "min_time": float(min_time),
+            "dtype": str(dtype),
+            "sources": sources,
+        }
+
+        if components is not None:
+            description["components"] = [[field_name, component] for field_name, component in components]
+
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def load(self, key):
+        """
+        Returns the stored entry, marking it as the most recently used.
+
+        Parameters:
+            key (str): Key of the entry.
+
+        Returns:
+            entry (tuple or None): (mask, t_steps, dt, data_matrix) as returned by `process_data`, None if missing.
+
+        """
+        entry = self._entry(key)
+
+        try:
+            with open(os.path.join(entry, "meta.json")) as f:
+                meta = json.load(f)
+            mask = pt.from_numpy(np.load(os.path.join(entry, "mask.npy")))
+            # Copy-on-write mapping: pages are read from disk only when accessed
+            data_matrix = pt.from_numpy(np.load(os.path.join(entry, "data_matrix.npy"), mmap_mode="c"))
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("dtype") == str(pt.bfloat16):
+            data_matrix = data_matrix.view(pt.bfloat16)
+
+        os.utime(entry)
+        return mask, meta["t_steps"], meta["dt"], data_matrix
+
+    def store(self, key, mask, t_steps, dt, data_matrix):
+        """
+        Stores a new entry and evicts the least recently used ones if the cache grows beyond its maximum size.
+
+        Parameters:
+            key (str): Key of the entry.
+            mask (torch.BoolTensor): Matrix of 0s and 1s to restrict data.
+            t_steps (list): List of time steps used.
+            dt (float): Time interval between adjacent time steps.
+            data_matrix (torch.Tensor): Matrix of data.
+
+        """
+        entry = self._entry(key)
+        tmp_entry = f"{entry}.tmp{os.getpid()}"
+        os.makedirs(tmp_entry, exist_ok=True)
+
+        np.save(os.path.join(tmp_entry, "mask.npy"), mask.numpy())
+        # numpy has no bfloat16, its values are stored as 16-bit integers and reinterpreted on load
+        stored = data_matrix.view(pt.int16) if data_matrix.dtype == pt.bfloat16 else data_matrix
+        np.save(os.path.join(tmp_entry, "data_matrix.npy"), stored.numpy())
+        with open(os.path.join(tmp_entry, "meta.json"), "w") as f:
+            json.dump({"t_steps": list(t_steps), "dt": dt, "dtype": str(data_matrix.dtype)}, f)
+
+        # The entry becomes visible only once it is complete
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp_entry, entry)
+
+        self._evict(keep=key)
+
+    def invalidate(self, key=None):
+        """
+        Removes one entry, or every entry if no key is given.
+
+        Parameters:
+            key (str, optional): Key of the entry to be removed.
+
+        """
+        if key is not None:
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+        else:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _entries(self):
+        if not os.path.isdir(self.directory):
+            return []
+
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path) and ".tmp" not in name:
+                size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                entries.append((os.path.getmtime(path), size, name))
+        return entries
+
+    def size(self):
+        """
+        Returns the total size of the cache in bytes.
+
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self, keep):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        # Oldest access time first; the entry just stored is kept even if it exceeds the cap alone
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            if name != keep:
+                shutil.rmtree(self._entry(name), ignore_errors=True)
+                total -= size
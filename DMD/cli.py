@@ -0,0 +1,195 @@
+"""
+Headless command-line entry point: load -> process -> DMD -> save results, without notebook or plots.
+
+Usage (from the repository root):
+    python -m DMD --output results.pt --set SVD_THRESHOLD=99.9 --set DTYPE_POLICY=double
+    python -m DMD --synthetic vortex_shedding --points 20000 --snapshots 200 --output results.pt
+
+"""
+import os
+import ast
+import time
+import logging
+import argparse
+import DMD.config as config
+
+logger = logging.getLogger(__name__)
+
+# Variables of DMD.config that `main` passes to the pipeline, the only ones that can be overridden
+SETTINGS = ("DATASET_NAME", "FIELD_NAME", "MASK_LOWER_BOUND", "MASK_UPPER_BOUND", "TIME_THRESHOLD", "CACHE_ENABLED",
+            "DATA_STORAGE", "REAL_DMD", "DTYPE_POLICY", "LOADER_MODE", "LOADER_WORKERS", "LOADER_PREFETCH",
+            "SVD_THRESHOLD", "SVD_METHOD", "AMPLITUDE_METHOD", "LAZY_RECONSTRUCTION",
+            "EXECUTION_THREADS", "EXECUTION_INTEROP_THREADS", "EXECUTION_BLAS_THREADS", "EXECUTION_CPUS")
+
+def parse_override(text):
+    """
+    Function that parses a configuration override of the form NAME=VALUE.
+
+    Values are read as Python literals, e.g. 99.9, [0.1, -1] or "double"; anything else is kept as a string.
+
+    Parameters:
+        text (str): Override given on the command line.
+
+    Returns:
+        name (str): Name of the variable of DMD.config.
+        value (object): New value of the variable.
+
+    Raises:
+        ValueError: If the override has no "=" or the name is not a variable of DMD.config.
+        ValueError: If the variable is not one of those passed to the pipeline, see SETTINGS.
+
+    """
+    name, separator, value = text.partition("=")
+    name = name.strip()
+
+    if not separator:
+        raise ValueError(f"Override '{text}' must have the form NAME=VALUE.")
+
+    if not name.isupper() or not hasattr(config, name):
+        raise ValueError(f"Unknown configuration variable '{name}', see DMD/config.py.")
+
+    if name not in SETTINGS:
+        raise ValueError(f"Variable '{name}' can't be overridden from the command line, choose among {', '.join(SETTINGS)}.")
+
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+
+    return name, value
+
+def settings(overrides):
+    """
+    Function that collects the values of SETTINGS from DMD.config, with the overrides applied.
+
+    DMD.config and the modules that import its variables are never changed: the values are passed to the pipeline as arguments.
+
+    Parameters:
+        overrides (dict): New values keyed by variable name, see `parse_override`.
+
+    Returns:
+        values (dict): Value of each variable of SETTINGS, keyed by name.
+
+    """
+    return {name: overrides.get(name, getattr(config, name)) for name in SETTINGS}
+
+def _parser():
+    parser = argparse.ArgumentParser(prog="python -m DMD", description="Runs DMD on a dataset and saves the results, without plots.")
+    parser.add_argument("--output", default="results.pt", help="Path of the file with results, written with torch.save")
+    parser.add_argument("--set", dest="overrides", metavar="NAME=VALUE", action="append", default=[],
+                        help="Overrides a variable of DMD/config.py among SETTINGS of DMD/cli.py, can be repeated")
+    parser.add_argument("--keep-modes", action="store_true", help="Save DMD modes as well")
+    parser.add_argument("--model", metavar="DIRECTORY", help="Also save the result as a DMDModel, see DMD/model.py")
+    parser.add_argument("--synthetic", metavar="GENERATOR", help="Run on synthetic data instead of the dataset, see DMD/synthetic.py")
+    parser.add_argument("--points", type=int, default=20000, help="Grid points of synthetic data")
+    parser.add_argument("--snapshots", type=int, default=200, help="Snapshots of synthetic data")
+    parser.add_argument("--rank", type=int, default=10, help="Rank of synthetic data")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    return parser
+
+def main(argv=None):
+    """
+    Function that runs the pipeline from the command line and saves its results.
+
+    Overrides given with --set are passed to the pipeline as arguments, so they hold for this run only.
+
+    Parameters:
+        argv (list, optional): Command-line arguments, `sys.argv[1:]` if None.
+
+    Returns:
+        results (dict): Optimal rank, eigenvalues, frequencies in Hz, amplitudes, MSE, mask, time steps, time interval,
+            applied overrides and, optionally, modes.
+
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    try:
+        overrides = dict(parse_override(text) for text in args.overrides)
+    except ValueError as error:
+        parser.error(str(error))
+
+    logging.basicConfig(level=args.log_level, format='%(message)s')
+
+    return _run(args, parser, overrides)
+
+def _run(args, parser, overrides):
+    import torch as pt
+    from numpy import pi
+    from DMD.data_processor import process_data
+    from DMD.simulation import run_DMD
+    from DMD.batch import save_results
+    from DMD.model import DMDModel
+    from DMD.execution import ExecutionSettings
+
+    start = time.perf_counter()
+    values = settings(overrides)
+
+    options = {
+        "storage": values["DATA_STORAGE"],
+        "real": values["REAL_DMD"],
+        "lower": values["MASK_LOWER_BOUND"],
+        "upper": values["MASK_UPPER_BOUND"],
+        "min_time": values["TIME_THRESHOLD"],
+        "policy": values["DTYPE_POLICY"],
+        "loader_mode": values["LOADER_MODE"],
+        "loader_workers": values["LOADER_WORKERS"],
+        "loader_prefetch": values["LOADER_PREFETCH"],
+    }
+
+    if args.synthetic is not None:
+        from DMD.synthetic import SyntheticLoader
+
+        try:
+            loader = SyntheticLoader(args.synthetic, args.points, args.snapshots, args.rank)
+        except ValueError as error:
+            parser.error(str(error))
+
+        # The whole synthetic grid and all snapshots are kept, unless bounds are overridden
+        defaults = {"lower": ("MASK_LOWER_BOUND", [-1.0, -1.0]), "upper": ("MASK_UPPER_BOUND", [2.0, 1.0]),
+                    "min_time": ("TIME_THRESHOLD", 0.0)}
+        for key, (name, default) in defaults.items():
+            if name not in overrides:
+                options[key] = default
+
+        data = process_data(use_cache=False, loader=loader, **options)
+    else:
+        data = process_data(use_cache=values["CACHE_ENABLED"], dataset_name=values["DATASET_NAME"], field_name=values["FIELD_NAME"], **options)
+
+    mask, t_steps, dt, _ = data
+
+    # An enclosing context keeps run_DMD from applying the execution settings of DMD.config
+    execution = ExecutionSettings(values["EXECUTION_THREADS"], values["EXECUTION_INTEROP_THREADS"], values["EXECUTION_BLAS_THREADS"],
+                                  values["EXECUTION_CPUS"])
+    with execution:
+        result = run_DMD(data, thr=values["SVD_THRESHOLD"], policy=values["DTYPE_POLICY"], lazy=values["LAZY_RECONSTRUCTION"],
+                         svd_method=values["SVD_METHOD"], amplitude_method=values["AMPLITUDE_METHOD"])
+    optimal_rank, eig_val, _, phi, dynamics, _, mse = result
+
+    results = {
+        "optimal_rank": optimal_rank,
+        "eig_val": eig_val,
+        "frequencies": pt.log(eig_val).imag / (2.0 * pi * dt),
+        "amplitudes": dynamics[:, 0],
+        "mse": mse,
+        "mask": mask,
+        "t_steps": t_steps,
+        "dt": dt,
+        "overrides": overrides,
+    }
+
+    if args.keep_modes:
+        results["phi"] = phi
+
+    directory = os.path.dirname(os.path.abspath(args.output))
+    os.makedirs(directory, exist_ok=True)
+    save_results(results, args.output)
+
+    if args.model is not None:
+        DMDModel.from_run(data, result).save(args.model)
+
+    logger.info(f"Results saved in {args.output} ({time.perf_counter() - start:.2f}s)")
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,92 @@
+import os
+
 DATASET_NAME = "of_cylinder2D_binary"
 MASK_LOWER_BOUND = [.1, -1]
 MASK_UPPER_BOUND = [.75, 1]
 FIELD_NAME = "vorticity"
+TIME_THRESHOLD = 4.0    # Vortex shedding is complete after 4 seconds
+
+# Stacked fields of process_fields: (field name, component), with component None for scalar fields
+FIELDS = [("U", 0), ("U", 1), ("p", None)]
+
+# Keep the data matrix real-valued, DMD then runs in real arithmetic up to the eigendecomposition
+REAL_DMD = True
+
+# Precision of each stage, see DMD.precision: "half", "bfloat16", "single", "mixed" or "double"
+# Minimum precision of computations: matrices passed in a higher precision are never downcast
+DTYPE_POLICY = "single"
+
+# Threads and cores used by run_DMD, see DMD.execution; None leaves the defaults of torch and of the platform
+EXECUTION_THREADS = None    # Intra-op threads of torch, which also run its MKL/OpenBLAS calls
+EXECUTION_INTEROP_THREADS = None
+EXECUTION_BLAS_THREADS = None    # BLAS libraries outside torch, through threadpoolctl if installed
+EXECUTION_CPUS = None    # Cores the process is pinned to, e.g. range(0, 4)
+
+# Snapshot loading engine: "sequential", "thread" or "process"
+LOADER_MODE = "thread"
+LOADER_WORKERS = 4
+LOADER_PREFETCH = 4    # Snapshots read ahead of the ones being collected
+
+# On-disk cache of processed snapshot matrices, opt-in since it writes to the home folder by default
+CACHE_ENABLED = False
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "DMD", "snapshots")
+CACHE_MAX_BYTES = 4 * 1024 ** 3
+
+# Storage of the data matrix: "memory" or "memmap" (column-major file in MEMMAP_DIR)
+DATA_STORAGE = "memory"
+MEMMAP_DIR = os.path.join(os.path.expanduser("~"), ".cache", "DMD", "memmap")
+
+# SVD engine of run_DMD: "exact", "randomized" or "snapshots"
+SVD_METHOD = "exact"
+SVD_THRESHOLD = 99.5    # Percentage of singular values contribution kept
+SVD_INITIAL_RANK = 16    # First rank tried by the randomized engine, doubled until SVD_THRESHOLD is met
+SVD_OVERSAMPLING = 10
+SVD_POWER_ITERATIONS = 2
+RANK_PAIR_TOLERANCE = 0.1    # Relative difference below which two singular values are kept together, see truncation_rank
+
+# Spatially compressed DMD: "subsample" (random points) or "projection" (random combinations of points)
+COMPRESSION_METHOD = "subsample"
+COMPRESSION_SAMPLES = 2000    # Points or projections on which eigenvalues are computed
+COMPRESSION_BLOCK_SIZE = 4096    # Points projected at once, the random matrix is never built whole
+
+# Optimized DMD (variable projection): Levenberg-Marquardt fit of eigenvalues over all snapshots
+OPTIMIZED_MAX_ITERATIONS = 50
+OPTIMIZED_TOLERANCE = 1e-6    # Relative residual, or relative decrease of it, at which iterations stop
+OPTIMIZED_LAMBDA = 1e-2    # Initial damping
+
+# Hankel DMD, see DMD.hankel
+HANKEL_DELAYS = 10    # Snapshots stacked in each delay-embedded snapshot
+
+# Rank sweep, see DMD.sweep
+SWEEP_WORKERS = None    # Threads evaluating candidate ranks, None evaluates them one after the other
+
+# Streaming DMD
+STREAMING_MAX_RANK = 50    # Maximum number of basis vectors kept between updates
+STREAMING_BASIS_THRESHOLD = 99.99    # Percentage of singular values contribution kept when the basis is compressed
+
+# Sliding-window DMD
+WINDOW_LENGTH = 50    # Snapshots of each window
+WINDOW_STRIDE = 10    # Time steps between the starts of consecutive windows
+
+# Reconstruction: if lazy, run_DMD returns a LazyReconstruction computing columns on demand
+LAZY_RECONSTRUCTION = False
+MSE_BLOCK_SIZE = 64    # Time steps reconstructed at once when computing the MSE
+
+# Forecasting through DMDModel.predict_chunks
+PREDICTION_CHUNK_SIZE = 256    # Times predicted at once
+
+# Amplitudes of DMD modes: "pinv", "projected" (reduced space) or "optimal" (least squares over all snapshots)
+AMPLITUDE_METHOD = "pinv"
+
+# Summary of the spectrum logged by run_DMD, strongest modes first
+SPECTRUM_SUMMARY = True
+SPECTRUM_SUMMARY_ROWS = 10
+
+# Plots, see DMD.plotter
+PLOT_TRIANGULATIONS = 4    # Triangulations of different masks kept in memory, the least recently used is dropped first
+
+# Per-stage timing and memory instrumentation, see DMD.instrumentation
+INSTRUMENTATION_ENABLED = False
+INSTRUMENTATION_PROFILER = False    # Mark stages with torch.profiler.record_function
+INSTRUMENTATION_SAMPLE_RSS = False    # Sample the resident memory of the process in every stage, through a background thread
+INSTRUMENTATION_MAX_RECORDS = 10000    # Records kept, the oldest ones are dropped first
@@ -1,14 +1,16 @@
+import torch as pt
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from numpy import isnan
-from flowtorch import DATASETS
-from flowtorch.data import FOAMDataloader
-from DMD.config import DATASET_NAME
+from DMD.functions import mask_indices
+from DMD.config import DATASET_NAME, LOADER_MODE, LOADER_WORKERS, LOADER_PREFETCH
 
-def load_data(loader=None):
+def load_data(loader=None, dataset_name=DATASET_NAME):
     """
     Function that loads data of the chosen dataset and verifies their integrity.
 
     Parameters:
         loader (FOAMDataloader, optional): FOAMDataloader object. It is set different from None in tests, otherwise defined as the loader of the default dataset.
+        dataset_name (str, optional): Name of the dataset among flowtorch DATASETS, used if `loader` is None.
 
     Returns:
         times (list): List of time steps available as strings.
@@ -23,7 +25,11 @@ def load_data(loader=None):
     """
     
     if loader is None:
-        dataset = DATASETS[DATASET_NAME]
+        # flowtorch is imported only when a dataset is actually loaded, it dominates the startup time otherwise
+        from flowtorch import DATASETS
+        from flowtorch.data import FOAMDataloader
+
+        dataset = DATASETS[dataset_name]
         loader = FOAMDataloader(dataset)
     
     times = loader.write_times
@@ -45,3 +51,145 @@ def load_data(loader=None):
         raise ValueError("One or more vertices value is NaN.") 
 
     return times, pts, loader
+
+# State of process-pool workers, set once by `_init_worker` so that the loader
+# and the mask indices are not pickled again for every snapshot
+_worker_state = {}
+
+def _gather_column(values, index, column):
+    # Values are gathered straight into the destination column when its memory layout allows it
+    if column.is_contiguous() and column.dtype == values.dtype:
+        pt.index_select(values, 0, index, out=column)
+    else:
+        column.copy_(pt.index_select(values, 0, index))
+
+def _load_column(loader, components, t, index, column):
+    # Every field of a time step is read by the same task, so that each time directory is visited once
+    snapshots = {}
+    n_points = index.size(0)
+
+    for k, (field_name, component) in enumerate(components):
+        if field_name not in snapshots:
+            snapshots[field_name] = loader.load_snapshot(field_name, t)
+
+        values = snapshots[field_name] if component is None else snapshots[field_name][:, component]
+        _gather_column(values, index, column[k * n_points:(k + 1) * n_points])
+
+def _init_worker(loader, components, index, dtype):
+    _worker_state["args"] = (loader, components, index, dtype)
+
+def _load_column_in_worker(idx, t):
+    # Columns are sent back in the type of the data matrix, so that a lower precision also reduces the data exchanged
+    loader, components, index, dtype = _worker_state["args"]
+    column = pt.empty(len(components) * index.size(0), dtype=dtype)
+    _load_column(loader, components, t, index, column)
+    return idx, column
+
+def load_snapshots(loader, field_name, t_steps, mask, data_matrix, mode=LOADER_MODE, workers=LOADER_WORKERS, prefetch=LOADER_PREFETCH):
+    """
+    Function that loads the snapshots of the given time steps and fills the columns of a preallocated data matrix.
+
+    Parameters:
+        loader (FOAMDataloader): Loader of the dataset.
+        field_name (str): Name of the field to be loaded.
+        t_steps (list): List of time steps to load, column `i` of `data_matrix` is filled with time step `t_steps[i]`.
+        mask (torch.BoolTensor): Matrix of 0s and 1s to restrict data.
+        data_matrix (torch.Tensor): Preallocated matrix of shape (number of masked points, number of time steps).
+        mode (str, optional): "sequential" loads one snapshot after another, "thread" and "process" load them
+            through a pool of threads or processes and fill the columns in completion order.
+        workers (int, optional): Number of threads or processes of the pool.
+        prefetch (int, optional): Number of snapshots read ahead besides the ones being loaded by the workers.
+
+    Returns:
+        data_matrix (torch.Tensor): The same matrix passed as input, filled with data.
+
+    Raises:
+        ValueError: If `mode` is not one of the available ones.
+        ValueError: If `workers` is not positive or `prefetch` is negative.
+        ValueError: If `data_matrix` has not one column per time step.
+
+    """
+    # Vorticity is defined as the curl of velocity, it has non-zero values only along z-axis
+    return load_fields(loader, [(field_name, 2)], t_steps, mask, data_matrix, mode, workers, prefetch)
+
+def load_fields(loader, components, t_steps, mask, data_matrix, mode=LOADER_MODE, workers=LOADER_WORKERS, prefetch=LOADER_PREFETCH):
+    """
+    Function that loads several fields, or components of vector fields, reading each time step once,
+    and stacks them in the columns of a preallocated data matrix, one block of rows per component.
+
+    Parameters:
+        loader (FOAMDataloader): Loader of the dataset.
+        components (list): List of (field name, component) pairs, with component None for scalar fields.
+        t_steps (list): List of time steps to load, column `i` of `data_matrix` is filled with time step `t_steps[i]`.
+        mask (torch.BoolTensor): Matrix of 0s and 1s to restrict data.
+        data_matrix (torch.Tensor): Preallocated matrix of shape (number of components * number of masked points, number of time steps).
+            Its type sets the precision of the loaded values, see `DMD.precision`.
+        mode (str, optional): See `load_snapshots`.
+        workers (int, optional): See `load_snapshots`.
+        prefetch (int, optional): See `load_snapshots`.
+
+    Returns:
+        data_matrix (torch.Tensor): The same matrix passed as input, filled with data.
+
+    Raises:
+        ValueError: If `mode` is not one of the available ones.
+        ValueError: If `workers` is not positive or `prefetch` is negative.
+        ValueError: If `data_matrix` has not one column per time step.
+
+    """
+    if mode not in ("sequential", "thread", "process"):
+        raise ValueError(f"Unknown loader mode '{mode}', choose among 'sequential', 'thread' and 'process'.")
+
+    if workers < 1 or prefetch < 0:
+        raise ValueError("Number of workers must be positive and prefetch must be non-negative.")
+
+    if data_matrix.size(1) != len(t_steps):
+        raise ValueError("`data_matrix` must have one column per time step.")
+
+    # Indices of masked points are computed once, instead of selecting them again for every snapshot
+    index = mask_indices(mask)
+
+    if mode == "sequential":
+        for idx, t in enumerate(t_steps):
+            _load_column(loader, components, t, index, data_matrix[:, idx])
+        return data_matrix
+
+    if mode == "thread":
+        pool = ThreadPoolExecutor(max_workers=workers)
+
+        # Threads write straight into their own column of the shared matrix
+        def submit(idx, t):
+            return pool.submit(_load_column, loader, components, t, index, data_matrix[:, idx])
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(loader, components, index, data_matrix.dtype))
+
+        def submit(idx, t):
+            return pool.submit(_load_column_in_worker, idx, t)
+
+    # At most `workers + prefetch` snapshots are in flight, so that memory stays bounded
+    # while the pool never waits for the main thread to hand out new work
+    pending_steps = iter(enumerate(t_steps))
+    in_flight = set()
+
+    with pool:
+        for idx, t in pending_steps:
+            in_flight.add(submit(idx, t))
+            if len(in_flight) >= workers + prefetch:
+                break
+
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                result = future.result()
+
+                # Processes can't write into the matrix of the parent, their columns are copied here
+                if result is not None:
+                    idx, column = result
+                    data_matrix[:, idx] = column
+
+                next_step = next(pending_steps, None)
+                if next_step is not None:
+                    in_flight.add(submit(*next_step))
+
+    return data_matrix
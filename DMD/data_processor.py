@@ -1,37 +1,203 @@
+import os
+import tempfile
+import numpy as np
 import torch as pt
-from flowtorch.data import mask_box
-from DMD.data_loader import load_data
-from DMD.config import FIELD_NAME, MASK_LOWER_BOUND, MASK_UPPER_BOUND
+from DMD.cache import SnapshotCache
+from DMD.instrumentation import span
+from DMD.data_loader import load_data, load_fields
+from DMD.fields import FieldLayout
+from DMD.functions import box_mask
+from DMD.config import DATASET_NAME, FIELD_NAME, MASK_LOWER_BOUND, MASK_UPPER_BOUND, TIME_THRESHOLD, CACHE_ENABLED
+from DMD.config import DATA_STORAGE, MEMMAP_DIR, REAL_DMD, FIELDS, DTYPE_POLICY
+from DMD.config import CACHE_DIR, CACHE_MAX_BYTES, LOADER_MODE, LOADER_WORKERS, LOADER_PREFETCH
+from DMD.precision import get_policy
 
-def process_data():
+def open_data_matrix(path, n_points, n_times, dtype=pt.float32, mode="r+"):
+    """
+    Function that maps a data matrix file into memory, without reading it.
+
+    Data are stored column-major, so that each snapshot is a contiguous block of the file.
+
+    Parameters:
+        path (str or file): Path of the file, or a file object opened in binary mode.
+        n_points (int): Number of rows (masked points).
+        n_times (int): Number of columns (time steps).
+        dtype (torch.dtype, optional): Type of the stored values.
+        mode (str, optional): "r+" to open an existing file, "w+" to create it, "c" for a copy-on-write mapping.
+
+    Returns:
+        data_matrix (torch.Tensor): Tensor of shape (n_points, n_times) sharing memory with the file.
+
+    """
+    # numpy has no bfloat16, its values are mapped as 16-bit integers and reinterpreted
+    mapped_dtype = pt.int16 if dtype == pt.bfloat16 else dtype
+    np_dtype = pt.empty(0, dtype=mapped_dtype).numpy().dtype
+    array = np.memmap(path, dtype=np_dtype, mode=mode, shape=(n_points, n_times), order="F")
+    return pt.from_numpy(array).view(dtype)
+
+def allocate_data_matrix(n_points, n_times, storage=DATA_STORAGE, dtype=pt.float32):
+    """
+    Function that allocates the data matrix with the chosen storage backend.
+
+    Parameters:
+        n_points (int): Number of rows (masked points).
+        n_times (int): Number of columns (time steps).
+        storage (str, optional): "memory" for a tensor in RAM, "memmap" for a column-major file in `MEMMAP_DIR`.
+        dtype (torch.dtype, optional): Type of the stored values.
+
+    Returns:
+        data_matrix (torch.Tensor): Zero-initialized matrix of shape (n_points, n_times).
+
+    Raises:
+        ValueError: If `storage` is not one of the available ones.
+
+    """
+    # Both storages are column-major, so that each snapshot is gathered into contiguous memory
+    if storage == "memory":
+        return pt.zeros(n_times, n_points, dtype=dtype).T
+
+    elif storage == "memmap":
+        os.makedirs(MEMMAP_DIR, exist_ok=True)
+
+        # The mapping stays valid once the file is closed. On POSIX the file has no name from the start (unlink semantics),
+        # on Windows it's deleted when its last handle, the one of the mapping, is closed; so in both cases disk space
+        # is released when the tensor is freed, and no file is left behind
+        with tempfile.TemporaryFile(suffix=".dat", dir=MEMMAP_DIR) as file:
+            return open_data_matrix(file, n_points, n_times, dtype, mode="w+")
+
+    raise ValueError(f"Unknown storage '{storage}', choose between 'memory' and 'memmap'.")
+
+def select_time_steps(times, min_time=TIME_THRESHOLD):
+    """
+    Function that selects the time steps after a given time and computes the time interval between them.
+
+    Parameters:
+        times (list): List of time steps available as strings.
+        min_time (float, optional): Minimum time kept, the first time step is kept if it comes later.
+
+    Returns:
+        t_steps (list): List of time steps used.
+        dt (float): Time interval between adjacent time steps.
+
+    Raises:
+        ValueError: If fewer than two time steps come after `min_time`.
+
+    """
+    min_time_threshold = max(min_time, float(times[0]))
+    t_steps = [t for t in times if float(t) >= min_time_threshold]
+
+    if len(t_steps) < 2:
+        raise ValueError(f"Only {len(t_steps)} time steps come after {min_time} s, at least 2 are needed.")
+
+    dt = round(float(t_steps[1]) - float(t_steps[0]), 3)
+    return t_steps, dt
+
+def process_data(use_cache=CACHE_ENABLED, storage=DATA_STORAGE, real=REAL_DMD, dataset_name=DATASET_NAME, field_name=FIELD_NAME,
+                 lower=MASK_LOWER_BOUND, upper=MASK_UPPER_BOUND, min_time=TIME_THRESHOLD, loader=None, fields=None, policy=DTYPE_POLICY,
+                 loader_mode=LOADER_MODE, loader_workers=LOADER_WORKERS, loader_prefetch=LOADER_PREFETCH):
     """
     Function that takes loaded data and process them.
 
+    Parameters:
+        use_cache (bool, optional): If True, the processed data are read from the on-disk cache when available and stored there otherwise.
+        storage (str, optional): Storage backend of the data matrix, see `allocate_data_matrix`.
+        real (bool, optional): If True, the data matrix is kept real-valued, otherwise it is converted to complex.
+        dataset_name (str, optional): Name of the dataset among flowtorch DATASETS.
+        field_name (str, optional): Name of the field to be loaded.
+        lower (list, optional): Lower bound of the mask box.
+        upper (list, optional): Upper bound of the mask box.
+        min_time (float, optional): Minimum time kept.
+        loader (FOAMDataloader, optional): Loader to be used instead of the one of `dataset_name`, data are then never cached.
+        fields (list, optional): List of (field name, component) pairs to be stacked instead of the z-component of `field_name`,
+            with component None for scalar fields; see `process_fields`.
+        policy (str or DtypePolicy, optional): Precision in which data are loaded and stored, see `DMD.precision`.
+        loader_mode (str, optional): Loading engine of snapshots, see `load_snapshots`.
+        loader_workers (int, optional): Number of threads or processes of the loading engine.
+        loader_prefetch (int, optional): Number of snapshots read ahead by the loading engine.
+
     Returns:
         mask (torch.BoolTensor): Matrix of 0s and 1s to restrict data.
         t_steps (list): List of time steps used.
         dt (float): Time interval between adjacent time steps.
-        data_matrix (torch.FloatTensor): Matrix of vorticity values.
+        data_matrix (torch.Tensor): Matrix of vorticity values, or of stacked fields, real or complex in the storage precision of `policy`.
+
+    Raises:
+        ValueError: If complex data are requested with a half-precision storage.
         
     """
-    times, pts, loader = load_data()
-    mask = mask_box(pts, lower=MASK_LOWER_BOUND, upper=MASK_UPPER_BOUND)
+    # flowtorch is imported on first use (see `load_data`), and only for its datasets, so other loaders run without it
+    if loader is None:
+        from flowtorch import DATASETS
+        from flowtorch.data import mask_box
+    else:
+        mask_box = box_mask
+
+    use_cache = use_cache and loader is None
+
+    policy = get_policy(policy)
+    final_dtype = policy.storage_dtype(real)
+
+    # Vorticity is defined as the curl of velocity, it has non-zero values only along z-axis
+    components = [(field_name, 2)] if fields is None else [(name, component) for name, component in fields]
+
+    if use_cache:
+        cache = SnapshotCache(CACHE_DIR, CACHE_MAX_BYTES)
+        dtype = final_dtype
+        if fields is None:
+            key = cache.key(DATASETS[dataset_name], field_name, lower, upper, min_time, dtype)
+        else:
+            key = cache.key(DATASETS[dataset_name], [name for name, _ in components], lower, upper, min_time, dtype, components)
+        cached = cache.load(key)
+
+        if cached is not None:
+            return cached
+
+    with span("load_data"):
+        times, pts, loader = load_data(loader, dataset_name)
+
+    with span("mask", pts=pts) as stage:
+        mask = mask_box(pts, lower=lower, upper=upper)
+        stage.set(masked_points=pt.count_nonzero(mask).item())
 
     # In case the large dataset is used, only times greater than 4s are selected
     # The reason is that vortex shedding is complete after 4 seconds
-    min_time_threshold = max(4.0, float(times[0]))
-    t_steps = [t for t in times if float(t) >= min_time_threshold]
-    
-    dt = round(float(t_steps[1]) - float(t_steps[0]), 3)
-    data_matrix = pt.zeros(pt.count_nonzero(mask), len(t_steps))
+    t_steps, dt = select_time_steps(times, min_time)
+
+    # Memory-mapped matrices are allocated with their final type, to avoid a second full-size copy below
+    dtype = final_dtype if storage == "memmap" else policy.storage_dtype(real=True)
+    data_matrix = allocate_data_matrix(len(components) * pt.count_nonzero(mask).item(), len(t_steps), storage, dtype)
+
+    # Columns are filled by the loading engine, possibly out of order (see DMD.config)
+    with span("load_snapshots", data_matrix=data_matrix):
+        load_fields(loader, components, t_steps, mask, data_matrix, loader_mode, loader_workers, loader_prefetch)
 
-    for idx, t in enumerate(t_steps):
-        snapshots = loader.load_snapshot(FIELD_NAME, t)
-      
-        # Vorticity is defined as the curl of velocity, it has non-zero values only along z-axis
-        data_matrix[:, idx] = pt.masked_select(snapshots[:, 2], mask)
+    if data_matrix.dtype != final_dtype:
+        data_matrix = data_matrix.type(final_dtype)
 
-    if data_matrix.dtype not in (pt.complex64, pt.complex128):
-        data_matrix = data_matrix.type(pt.cfloat)
+    if use_cache:
+        cache.store(key, mask, t_steps, dt, data_matrix)
             
     return mask, t_steps, dt, data_matrix
+
+def process_fields(fields=FIELDS, normalize=True, **kwargs):
+    """
+    Function that loads several fields, or components of vector fields, in one pass over the time steps
+    and stacks them into a single data matrix, one block of rows per component.
+
+    Parameters:
+        fields (list, optional): List of (field name, component) pairs, with component None for scalar fields, e.g. [("U", 0), ("U", 1), ("p", None)].
+        normalize (bool, optional): If True, each field is divided by its root mean square, see `FieldLayout.normalize`.
+        **kwargs: Additional arguments of `process_data`.
+
+    Returns:
+        data (tuple): (mask, t_steps, dt, data_matrix) as returned by `process_data`, to be passed to `run_DMD`.
+        layout (FieldLayout): Layout of the stacked matrix, used to split modes back into fields.
+
+    """
+    mask, t_steps, dt, data_matrix = process_data(fields=fields, **kwargs)
+    layout = FieldLayout(fields, pt.count_nonzero(mask).item())
+
+    if normalize:
+        layout.normalize(data_matrix)
+
+    return (mask, t_steps, dt, data_matrix), layout
@@ -0,0 +1,220 @@
+import os
+import logging
+import functools
+import threading
+import torch as pt
+from DMD.config import EXECUTION_THREADS, EXECUTION_INTEROP_THREADS, EXECUTION_BLAS_THREADS, EXECUTION_CPUS
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:    # Optional, environment variables are set instead
+    threadpool_limits = None
+
+logger = logging.getLogger(__name__)
+
+_BLAS_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+# Cores and BLAS settings belong to the process, so contexts entered by any thread are tracked together: the settings
+# of all active contexts are applied in the order they were entered. Values are saved the first time a context changes
+# them, and only those are restored, so settings no context changed are never touched
+_lock = threading.RLock()
+_stack = []
+_saved = {}
+# Threads of torch belong to the calling thread on OpenMP builds, so they are tracked per thread: a context sets and
+# restores them in the thread that entered it only, and never sees the contexts of other threads
+_local = threading.local()
+
+def _thread_stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+def _threads():
+    try:
+        return [int(tid) for tid in os.listdir("/proc/self/task")]
+    except OSError:
+        return [0]
+
+def _set_affinity(cpus):
+    # sched_setaffinity(0) pins the calling thread only, so every thread of the process is pinned; threads started
+    # later inherit the affinity of the thread that starts them
+    for tid in _threads():
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except OSError:    # Thread ended in the meantime
+            pass
+
+def _save_affinity():
+    # Affinity of every thread, e.g. OpenMP workers bound to their own core, and of the calling thread for threads
+    # started while the context is active
+    affinity = {}
+    for tid in _threads():
+        try:
+            affinity[tid] = os.sched_getaffinity(tid)
+        except OSError:
+            pass
+    return os.sched_getaffinity(0), affinity
+
+def _restore():
+    if "cpus" in _saved:
+        default, affinity = _saved["cpus"]
+        for tid in _threads():
+            try:
+                os.sched_setaffinity(tid, affinity.get(tid, default))
+            except OSError:
+                pass
+
+    for name, value in _saved.get("variables", {}).items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+class ExecutionSettings:
+    def __init__(self, threads=EXECUTION_THREADS, interop_threads=EXECUTION_INTEROP_THREADS, blas_threads=EXECUTION_BLAS_THREADS, cpus=EXECUTION_CPUS):
+        """
+        Context manager that sets threads and cores used by the process, restoring the previous values on exit.
+        Settings left to None are not changed.
+
+        Torch runs its SVD, eig and matrix products, including the MKL or OpenBLAS calls inside them, on its intra-op pool,
+        so `threads` is what limits run_DMD. `blas_threads` limits BLAS libraries loaded by other packages, e.g. numpy:
+        through threadpoolctl if installed, otherwise through environment variables, which only affect libraries loaded later.
+
+        Parameters:
+            threads (int, optional): Number of intra-op threads of torch. On OpenMP builds each thread has its own,
+                so they are set and restored in the thread that enters the context only.
+            interop_threads (int, optional): Number of inter-op threads of torch. Torch accepts it only once per process,
+                before any parallel work starts, and it can't be restored.
+            blas_threads (int, optional): Number of threads of BLAS libraries outside torch.
+            cpus (iterable, optional): Indices of the cores all threads of the process are pinned to, where the platform
+                supports it. On exit, every thread gets back its own affinity.
+
+        Raises:
+            ValueError: If a number of threads is not positive or `cpus` is empty.
+
+        """
+        if any(n is not None and n < 1 for n in (threads, interop_threads, blas_threads)):
+            raise ValueError("Numbers of threads must be positive.")
+
+        if cpus is not None and len(set(cpus)) == 0:
+            raise ValueError("At least one core must be given.")
+
+        self.threads = threads
+        self.interop_threads = interop_threads
+        self.blas_threads = blas_threads
+        self.cpus = set(cpus) if cpus is not None else None
+
+    def is_default(self):
+        """
+        Returns True if every setting is None, so that the context changes nothing.
+
+        """
+        return all(value is None for value in (self.threads, self.interop_threads, self.blas_threads, self.cpus))
+
+    def _apply_threads(self):
+        if self.threads is not None:
+            if not hasattr(_local, "threads"):
+                _local.threads = pt.get_num_threads()
+            pt.set_num_threads(self.threads)
+
+    def _apply(self):
+        if self.interop_threads is not None and self.interop_threads != pt.get_num_interop_threads():
+            try:
+                pt.set_num_interop_threads(self.interop_threads)
+            except RuntimeError:
+                logger.warning("Inter-op threads can only be set before torch starts any parallel work, setting ignored.")
+
+        if self.blas_threads is not None:
+            _saved.setdefault("variables", {name: os.environ.get(name) for name in _BLAS_VARIABLES})
+            if threadpool_limits is not None:
+                self._limiter = threadpool_limits(limits=self.blas_threads, user_api="blas")
+            for name in _BLAS_VARIABLES:
+                os.environ[name] = str(self.blas_threads)
+
+        if self.cpus is not None:
+            if hasattr(os, "sched_setaffinity"):
+                if "cpus" not in _saved:
+                    _saved["cpus"] = _save_affinity()
+                _set_affinity(self.cpus)
+            else:
+                logger.warning("Core pinning is not supported on this platform, setting ignored.")
+
+    def _release(self):
+        if self._limiter is not None:
+            self._limiter.restore_original_limits()
+            self._limiter = None
+
+    def __enter__(self):
+        _thread_stack().append(self)
+        self._apply_threads()
+
+        with _lock:
+            self._limiter = None
+            _stack.append(self)
+            self._apply()
+
+        return self
+
+    def __exit__(self, *exc):
+        stack = _thread_stack()
+        stack.remove(self)
+        if hasattr(_local, "threads"):
+            pt.set_num_threads(_local.threads)
+            if stack:
+                for settings in stack:
+                    settings._apply_threads()
+            else:
+                del _local.threads
+
+        with _lock:
+            # Contexts of other threads may have been entered after this one, so the saved settings are restored
+            # and those of the contexts still active are applied again
+            for settings in reversed(_stack):
+                settings._release()
+
+            _stack.remove(self)
+            _restore()
+
+            if _stack:
+                for settings in _stack:
+                    settings._apply()
+            else:
+                _saved.clear()
+
+        return False
+
+    def apply(self):
+        """
+        Applies the settings for the rest of the life of the process, e.g. in the initializer of a worker process.
+        It is meant to be called outside any `ExecutionSettings` context, whose exit would restore the previous settings.
+
+        """
+        self._apply_threads()
+        if not _thread_stack() and hasattr(_local, "threads"):
+            del _local.threads    # Nothing to restore later
+
+        with _lock:
+            self._limiter = None
+            self._apply()
+
+            if not _stack:
+                _saved.clear()    # Nothing to restore later
+
+def with_execution_settings(function):
+    """
+    Decorator that runs a function with the execution settings of DMD.config, unless an `ExecutionSettings` context
+    is active in the calling thread, whose settings are then kept. Contexts of other threads don't count, since threads
+    of torch are set per thread, while cores and BLAS settings of both are combined.
+    With every setting of DMD.config left to None, the function runs without any context, so nothing is touched.
+
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        # Passed explicitly, so that values of DMD.config set after import (see DMD.cli) are used
+        settings = ExecutionSettings(EXECUTION_THREADS, EXECUTION_INTEROP_THREADS, EXECUTION_BLAS_THREADS, EXECUTION_CPUS)
+        if _thread_stack() or settings.is_default():
+            return function(*args, **kwargs)
+
+        with settings:
+            return function(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,87 @@
+_AXES = "xyz"
+
+class FieldLayout:
+    def __init__(self, components, n_points, scales=None):
+        """
+        Class describing a data matrix of stacked fields, one block of rows per component, in the order of `components`.
+
+        Parameters:
+            components (list): List of (field name, component) pairs, with component None for scalar fields.
+            n_points (int): Number of masked points, namely rows of each block.
+            scales (dict, optional): Scale dividing each field in the data matrix, 1 if missing.
+
+        Methods:
+            labels(): Returns the names of blocks, e.g. "U_x" or "p".
+            block(k): Returns the slice of rows of block k.
+            normalize(data_matrix): Divides each field by its root mean square, in place.
+            split(matrix): Splits the rows of a data matrix or of DMD modes back into fields, in physical units.
+
+        """
+        self.components = [(field_name, component) for field_name, component in components]
+        self.n_points = n_points
+        self.scales = dict(scales) if scales is not None else {}
+
+    def labels(self):
+        """
+        Returns the names of blocks, the field name followed by the axis of the component for vector fields.
+
+        """
+        return [field_name if component is None else f"{field_name}_{_AXES[component]}" for field_name, component in self.components]
+
+    def block(self, k):
+        """
+        Returns the slice of rows of block k.
+
+        """
+        return slice(k * self.n_points, (k + 1) * self.n_points)
+
+    def normalize(self, data_matrix):
+        """
+        Divides each field by its root mean square over all snapshots, so that no field dominates the SVD because of its units.
+        Components of the same vector field share one scale, which preserves the direction of vectors.
+
+        Parameters:
+            data_matrix (torch.Tensor): Matrix of stacked fields, modified in place.
+
+        Returns:
+            data_matrix (torch.Tensor): The same matrix passed as input, normalized.
+
+        Raises:
+            ValueError: If `data_matrix` has not one block of rows per component.
+
+        """
+        if data_matrix.size(0) != len(self.components) * self.n_points:
+            raise ValueError("`data_matrix` must have one block of rows per component.")
+
+        squares = {}
+        for k, (field_name, _) in enumerate(self.components):
+            total, count = squares.get(field_name, (0.0, 0))
+            squares[field_name] = (total + data_matrix[self.block(k)].abs().square().sum().item(), count + data_matrix[self.block(k)].numel())
+
+        for field_name, (total, count) in squares.items():
+            self.scales[field_name] = (total / count) ** 0.5 or 1.0
+
+        for k, (field_name, _) in enumerate(self.components):
+            data_matrix[self.block(k)] /= self.scales[field_name]
+
+        return data_matrix
+
+    def split(self, matrix):
+        """
+        Splits the rows of a data matrix, of DMD modes or of a reconstruction back into fields, multiplied by their scales.
+
+        Parameters:
+            matrix (torch.Tensor): Matrix with one block of rows per component.
+
+        Returns:
+            blocks (dict): Blocks of rows keyed by label, see `labels`.
+
+        Raises:
+            ValueError: If `matrix` has not one block of rows per component.
+
+        """
+        if matrix.size(0) != len(self.components) * self.n_points:
+            raise ValueError("`matrix` must have one block of rows per component.")
+
+        return {label: matrix[self.block(k)] * self.scales.get(field_name, 1.0)
+                for k, (label, (field_name, _)) in enumerate(zip(self.labels(), self.components))}
@@ -1,4 +1,5 @@
 import torch as pt
+from DMD.config import RANK_PAIR_TOLERANCE
 
 def find_optimal_rank(s, thr):
     """
@@ -27,3 +28,58 @@ def find_optimal_rank(s, thr):
 
     optimal_rank = pt.where(s_cumsum >= thr)[0][0].item()
     return optimal_rank
+
+def truncation_rank(s, thr, pair_tolerance=RANK_PAIR_TOLERANCE):
+    """
+    Function that computes the number of singular values to keep, keeping pairs of singular values together.
+
+    `find_optimal_rank` returns the index of the singular value at which the threshold is reached, so that value is
+    counted as well. Travelling structures of real data, e.g. vortices shed by a cylinder, appear as pairs of almost equal
+    singular values whose modes are a conjugate pair; if the last kept singular value and the next one form such a pair,
+    the next one is kept too, since keeping only one of them turns an oscillation into a spurious real eigenvalue.
+
+    Parameters:
+        s (torch.Tensor): Tensor containing singular values, in descending order.
+        thr (float): Chosen threshold to truncate singular values.
+        pair_tolerance (float, optional): Maximum relative difference of two singular values of a pair.
+
+    Returns:
+        rank (int): Number of singular values to keep.
+
+    """
+    rank = find_optimal_rank(s, thr) + 1
+
+    if rank < s.size(0) and (s[rank - 1] - s[rank]) <= pair_tolerance * s[rank - 1]:
+        rank += 1
+
+    return rank
+
+def mask_indices(mask):
+    """
+    Function that converts a boolean mask into the indices of its non-zero entries, so that masked values can be gathered with `index_select`.
+
+    Parameters:
+        mask (torch.BoolTensor): Vector of 0s and 1s to restrict data.
+
+    Returns:
+        index (torch.LongTensor): Indices of the entries equal to 1, in ascending order.
+
+    """
+    return pt.nonzero(mask, as_tuple=True)[0]
+
+def box_mask(pts, lower, upper):
+    """
+    Function that selects the points inside a box, bounds included, as `flowtorch.data.mask_box` does.
+
+    Parameters:
+        pts (torch.Tensor): Coordinates of the points, one row per point.
+        lower (list): Lower bound of the box, one value per coordinate.
+        upper (list): Upper bound of the box, one value per coordinate.
+
+    Returns:
+        mask (torch.BoolTensor): Vector of 0s and 1s, 1 for the points inside the box.
+
+    """
+    lower = pt.tensor(lower, dtype=pts.dtype)
+    upper = pt.tensor(upper, dtype=pts.dtype)
+    return ((pts >= lower) & (pts <= upper)).all(dim=1)
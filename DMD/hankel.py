@@ -0,0 +1,264 @@
+import logging
+import torch as pt
+from DMD.svd import randomized_svd, tail_bound
+from DMD.functions import find_optimal_rank
+from DMD.amplitudes import projected_amplitudes
+from DMD.simulation import reconstruct_dynamics
+from DMD.data_processor import process_data
+from DMD.instrumentation import span
+from DMD.precision import get_policy, complex_dtype
+from DMD.execution import with_execution_settings
+from DMD.config import HANKEL_DELAYS, SVD_THRESHOLD, SVD_INITIAL_RANK, SVD_OVERSAMPLING, SVD_POWER_ITERATIONS, DTYPE_POLICY
+from DMD.config import LAZY_RECONSTRUCTION, AMPLITUDE_METHOD
+
+logger = logging.getLogger(__name__)
+
+def _column_major(data_matrix):
+    # One copy at the size of data, only if snapshots are not contiguous already (see `allocate_data_matrix`)
+    if data_matrix.size(1) > 1 and data_matrix.stride() != (1, data_matrix.size(0)):
+        return data_matrix.T.contiguous().T
+    return data_matrix
+
+def delay_embedding(data_matrix, delays):
+    """
+    Function that returns the block-Hankel matrix of delay-embedded snapshots as a strided view, without copying data.
+
+    Column j stacks snapshots j, j + 1, ..., j + delays - 1. With snapshots contiguous in memory (column-major storage),
+    this is exactly a window of `delays` snapshots sliding over the storage, one snapshot at a time.
+
+    Parameters:
+        data_matrix (torch.Tensor): Matrix of data in column-major storage, one row per point and one column per time step.
+        delays (int): Number of stacked snapshots.
+
+    Returns:
+        embedding (torch.Tensor): View of shape (delays * number of points, number of time steps - delays + 1).
+
+    Raises:
+        ValueError: If `data_matrix` is not column-major or `delays` doesn't leave at least one column.
+
+    """
+    n_points, n_times = data_matrix.shape
+
+    if delays < 1 or delays > n_times:
+        raise ValueError("Delays must be positive and no more than the number of time steps.")
+
+    if n_times > 1 and data_matrix.stride() != (1, n_points):
+        raise ValueError("Data matrix must be column-major, with contiguous snapshots.")
+
+    return data_matrix.as_strided((delays * n_points, n_times - delays + 1), (1, n_points))
+
+class HankelOperator:
+    def __init__(self, data_matrix, delays, start=0, stop=None, adjoint=False):
+        """
+        Class that acts as the block-Hankel matrix of delay-embedded snapshots, without building it.
+
+        Block k of rows of column j is snapshot start + j + k, so every block of rows is a slice of columns of the
+        data matrix, i.e. a view. Products go through one product per block, and the operator can be used as a matrix
+        by `randomized_svd`.
+
+        Parameters:
+            data_matrix (torch.Tensor): Matrix of data, one row per point and one column per time step.
+            delays (int): Number of stacked snapshots.
+            start (int, optional): First column of the embedding represented by the operator.
+            stop (int, optional): Column after the last one, by default the last column of the embedding.
+            adjoint (bool, optional): If True, the operator is the conjugate transpose of the embedding.
+
+        Methods:
+            columns(start, stop): Returns the operator of a range of columns, e.g. X and X' of DMD.
+            view(): Returns the columns of the operator as a strided view of the data matrix, see `delay_embedding`.
+            norm_sq(): Returns the squared Frobenius norm, computed from the norms of snapshots.
+
+        Raises:
+            ValueError: If `delays` doesn't leave at least one column, or the range of columns is empty.
+
+        """
+        n_times = data_matrix.size(1)
+        if delays < 1 or delays > n_times:
+            raise ValueError("Delays must be positive and no more than the number of time steps.")
+
+        stop = n_times - delays + 1 if stop is None else stop
+        if not 0 <= start < stop <= n_times - delays + 1:
+            raise ValueError("Range of columns must be non-empty and within the embedding.")
+
+        self.data_matrix = data_matrix
+        self.delays = delays
+        self.start = start
+        self.stop = stop
+        self.adjoint = adjoint
+
+    @property
+    def shape(self):
+        shape = (self.delays * self.data_matrix.size(0), self.stop - self.start)
+        return pt.Size(shape[::-1] if self.adjoint else shape)
+
+    @property
+    def dtype(self):
+        return self.data_matrix.dtype
+
+    @property
+    def mH(self):
+        return HankelOperator(self.data_matrix, self.delays, self.start, self.stop, not self.adjoint)
+
+    def size(self, dim=None):
+        return self.shape if dim is None else self.shape[dim]
+
+    def columns(self, start, stop):
+        """
+        Returns the operator of columns `start` to `stop` (excluded) of this operator.
+
+        """
+        return HankelOperator(self.data_matrix, self.delays, self.start + start, self.start + stop)
+
+    def view(self):
+        """
+        Returns the columns of the operator as a strided view of the data matrix, e.g. to read delay-embedded snapshots.
+        Products with the view are copies of the embedding for most BLAS libraries, products with the operator are not.
+
+        """
+        return delay_embedding(self.data_matrix, self.delays)[:, self.start:self.stop]
+
+    def _block(self, k):
+        return self.data_matrix[:, self.start + k:self.stop + k]
+
+    def __matmul__(self, other):
+        vector = other.dim() == 1
+        other = other.unsqueeze(1) if vector else other
+        n_points = self.data_matrix.size(0)
+        dtype = pt.promote_types(self.dtype, other.dtype)
+
+        if not self.adjoint:
+            result = pt.empty(self.delays * n_points, other.size(1), dtype=dtype)
+            for k in range(self.delays):
+                pt.matmul(self._block(k).type(dtype), other.type(dtype), out=result[k * n_points:(k + 1) * n_points])
+        else:
+            result = sum(self._block(k).mH.type(dtype) @ other[k * n_points:(k + 1) * n_points].type(dtype)
+                         for k in range(self.delays))
+
+        return result.squeeze(1) if vector else result
+
+    def norm_sq(self):
+        """
+        Returns the squared Frobenius norm, summing the squared norm of every snapshot as many times as it is stacked.
+
+        """
+        norms = pt.linalg.vector_norm(self.data_matrix, dim=0).to(pt.float64) ** 2
+        windows = pt.cat([pt.zeros(1, dtype=pt.float64), pt.cumsum(norms, dim=0)])
+        return sum(windows[self.stop + k] - windows[self.start + k] for k in range(self.delays))
+
+def hankel_svd(H, thr=SVD_THRESHOLD, rank=None, initial_rank=SVD_INITIAL_RANK, generator=None):
+    """
+    Function that computes a truncated SVD of a Hankel operator through random projections, doubling the rank
+    until the threshold criterion is met as in `adaptive_randomized_svd`.
+
+    Parameters:
+        H (HankelOperator): Operator to be decomposed.
+        thr (float, optional): Percentage of singular values contribution to keep, see `find_optimal_rank`.
+        rank (int, optional): Fixed number of singular triplets, instead of the one given by `thr`.
+        initial_rank (int, optional): Rank of the first attempt.
+        generator (torch.Generator, optional): Generator of the random test matrices.
+
+    Returns:
+        U (torch.Tensor): Left singular vectors.
+        s (torch.Tensor): Singular values, in descending order.
+        Vh (torch.Tensor): Conjugate transpose of the right singular vectors.
+        optimal_rank (int): Optimal rank for the chosen threshold, or `rank`.
+
+    """
+    full_rank = min(H.shape)
+
+    if rank is not None:
+        U, s, Vh = randomized_svd(H, min(rank, full_rank), SVD_OVERSAMPLING, SVD_POWER_ITERATIONS, generator)
+        return U, s, Vh, s.size(0)
+
+    H_norm_sq = H.norm_sq()
+    current = min(initial_rank, full_rank)
+
+    while current < full_rank:
+        U, s, Vh = randomized_svd(H, current, SVD_OVERSAMPLING, SVD_POWER_ITERATIONS, generator)
+        tail = tail_bound(H_norm_sq, s.to(pt.float64), full_rank - current)
+        optimal_rank = find_optimal_rank(pt.cat([s.to(pt.float64), tail.reshape(1)]), thr)
+
+        if optimal_rank < current:
+            return U, s, Vh, optimal_rank
+
+        current *= 2
+
+    # The test matrix spans all columns at full rank, so the decomposition is exact up to round-off
+    U, s, Vh = randomized_svd(H, full_rank, 0, SVD_POWER_ITERATIONS, generator)
+    return U, s, Vh, find_optimal_rank(s, thr)
+
+@with_execution_settings
+def run_hankel_DMD(data=None, delays=HANKEL_DELAYS, thr=SVD_THRESHOLD, rank=None, policy=DTYPE_POLICY, lazy=LAZY_RECONSTRUCTION):
+    """
+    Function that runs DMD on delay-embedded snapshots (Hankel DMD), which captures dynamics that plain DMD misses
+    when there are few points, e.g. a few probes, compared to the rank of the dynamics.
+
+    The block-Hankel matrix is never built: products and the randomized SVD go through `HankelOperator`,
+    whose blocks are views of the data matrix. Modes are projected back to the mesh by keeping the block of rows
+    of the first delay, so they have one row per point of data as those of `run_DMD` and can be plotted by `Plotter`.
+    Amplitudes are always computed in the reduced space (see `projected_amplitudes`): the other methods fit modes to
+    snapshots on the points of data, which are too few for them, so a different AMPLITUDE_METHOD only logs a warning.
+
+    Parameters:
+        data (tuple, optional): (mask, t_steps, dt, data_matrix) as returned by `process_data`, which is called if None.
+        delays (int, optional): Number of stacked snapshots, 1 gives plain DMD.
+        thr (float, optional): Percentage of singular values contribution kept, see `find_optimal_rank`.
+        rank (int, optional): Fixed number of modes, instead of the one given by `thr`.
+        policy (str or DtypePolicy, optional): Precision of each stage, see `DMD.precision`.
+        lazy (bool, optional): See `run_DMD`.
+
+    Returns:
+        The same tuple as `run_DMD`, with modes on the points of data.
+
+    Raises:
+        ValueError: If `delays` leaves fewer than 2 columns in the embedding.
+
+    """
+    if data is None:
+        with span("process_data"):
+            data = process_data()
+
+    _, t_steps, dt, data_matrix = data
+
+    policy = get_policy(policy)
+    data_matrix = _column_major(policy.to_compute(data_matrix))
+    n_points, n_times = data_matrix.shape
+
+    if delays < 1 or n_times - delays + 1 < 2:
+        raise ValueError("Delays must be positive and leave at least 2 delay-embedded snapshots.")
+
+    H = HankelOperator(data_matrix, delays)
+    X, Xp = H.columns(0, H.size(1) - 1), H.columns(1, H.size(1))
+
+    with span("svd", method="hankel", delays=delays) as stage:
+        U, s, Vh, optimal_rank = hankel_svd(X, thr, rank, SVD_INITIAL_RANK)
+        stage.set(U=U, optimal_rank=optimal_rank)
+    logger.info(f"Hankel DMD with {delays} delays: {optimal_rank} modes kept\n")
+
+    Ur = U[:, :optimal_rank]
+    sr = s[:optimal_rank].to(data_matrix.dtype)
+    Vr = Vh[:optimal_rank, :]
+
+    with span("operator") as stage:
+        B = Xp @ (Vr.mH / sr)    # X' V S^-1, one block product per delay
+        At = Ur.mH @ B
+        stage.set(At=At)
+
+    with span("eig", At=At):
+        eig_val, eig_vec = pt.linalg.eig(policy.to_eig(At))
+
+    with span("modes") as stage:
+        eig_vec_c = eig_vec.to(complex_dtype(data_matrix.dtype))
+        phi = B[:n_points].type(eig_vec_c.dtype) @ eig_vec_c    # Block of the first delay, on the points of data
+        stage.set(phi=phi)
+
+    if AMPLITUDE_METHOD != "projected":
+        logger.warning(f"Amplitude method '{AMPLITUDE_METHOD}' is not available in Hankel DMD, projected amplitudes are used instead.")
+
+    with span("amplitudes", method="projected"):
+        b = projected_amplitudes(sr, Vr, eig_val, eig_vec).to(phi.dtype)
+
+    dynamics = b.unsqueeze(1) * pt.vander(eig_val.to(phi.dtype), n_times, increasing = True)
+    reconstruction, mse = reconstruct_dynamics(phi, dynamics, data_matrix, lazy)
+
+    return optimal_rank, eig_val, eig_vec, phi, dynamics, reconstruction, mse
@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import time
+import threading
+from collections import deque
+import torch as pt
+from DMD.config import INSTRUMENTATION_ENABLED, INSTRUMENTATION_PROFILER, INSTRUMENTATION_SAMPLE_RSS, INSTRUMENTATION_MAX_RECORDS
+
+try:
+    import resource
+except ImportError:    # Not available on Windows, where only /proc is tried and memory reads 0 otherwise
+    resource = None
+
+_settings = {"enabled": INSTRUMENTATION_ENABLED, "profiler": INSTRUMENTATION_PROFILER, "sample_rss": INSTRUMENTATION_SAMPLE_RSS}
+_records = deque(maxlen=INSTRUMENTATION_MAX_RECORDS)    # Oldest records are dropped, so that long-running jobs don't grow
+_callbacks = []
+_local = threading.local()
+
+def _rss():
+    # Resident set size in bytes, read from /proc where available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+class PeakMemory:
+    def __init__(self, interval=0.001):
+        """
+        Context manager that samples the resident memory in a background thread and records its peak above the initial value.
+        CPU tensors have no allocator statistics in torch, so the resident memory of the process is the closest measure.
+
+        Parameters:
+            interval (float, optional): Sampling interval in seconds.
+
+        """
+        self.interval = interval
+        self.peak = 0
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss() - self.baseline)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.baseline = _rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss() - self.baseline)
+
+class _NullSpan:
+    # Returned when instrumentation is disabled, so that a span costs a function call and nothing else
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **info):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+def _tensor_bytes(info):
+    return sum(value.numel() * value.element_size() for value in info.values() if isinstance(value, pt.Tensor))
+
+class Span:
+    def __init__(self, name, info):
+        """
+        Context manager that records wall time, CPU time, peak tensor memory and matrix shapes of a stage.
+
+        Peak tensor memory is the size of the tensors the stage records, inputs and results passed to `span` and `set`,
+        or the peak of a nested stage if larger. CPU tensors have no allocator statistics in torch, so temporaries are
+        not counted; the resident memory of the process can be sampled as well, see `enable`.
+
+        Parameters:
+            name (str): Name of the stage.
+            info (dict): Additional information, tensors are recorded through their shape.
+
+        """
+        self.name = name
+        self.info = info
+
+    def set(self, **info):
+        """
+        Adds information known only inside the stage, e.g. the shapes of its results.
+
+        """
+        self.info.update(info)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+
+        self._parent = stack[-1] if stack else None
+        self.parent = self._parent.name if self._parent is not None else None
+        stack.append(self)
+
+        self._profiler = pt.profiler.record_function(self.name) if _settings["profiler"] else None
+        if self._profiler is not None:
+            self._profiler.__enter__()
+
+        # Peak statistics of CUDA are not reset, which would lose the peak of enclosing stages and of the caller:
+        # a peak higher than the one on entry was reached inside the stage, otherwise children report theirs
+        self._cuda = pt.cuda.is_available()
+        if self._cuda:
+            self._cuda_peak = pt.cuda.memory_allocated()
+            self._cuda_start = pt.cuda.max_memory_allocated()
+
+        self._peak = 0
+        self._memory = PeakMemory().__enter__() if _settings["sample_rss"] else None
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        if self._memory is not None:
+            self._memory.__exit__(*exc)
+
+        if self._profiler is not None:
+            self._profiler.__exit__(*exc)
+
+        _local.stack.pop()
+
+        record = {
+            "name": self.name,
+            "parent": self.parent,
+            "wall_time": wall,
+            "cpu_time": cpu,
+        }
+
+        # Tensors of the stage and of its nested stages, which ended before it, are counted as in CUDA below
+        self._peak = max(self._peak, _tensor_bytes(self.info))
+        record["peak_memory"] = self._peak
+        if self._parent is not None:
+            self._parent._peak = max(self._parent._peak, self._peak)
+
+        if self._memory is not None:
+            record["peak_rss"] = self._memory.peak
+
+        if self._cuda:
+            peak = pt.cuda.max_memory_allocated()
+            self._cuda_peak = max(self._cuda_peak, pt.cuda.memory_allocated(), peak if peak > self._cuda_start else 0)
+            record["cuda_peak_memory"] = self._cuda_peak
+
+            if self._parent is not None:
+                self._parent._cuda_peak = max(self._parent._cuda_peak, self._cuda_peak)
+
+        for key, value in self.info.items():
+            record[key] = list(value.shape) if isinstance(value, pt.Tensor) else value
+
+        _records.append(record)
+        for callback in _callbacks:
+            callback(record)
+
+        return False
+
+def span(name, **info):
+    """
+    Function that opens an instrumented stage, to be used as `with span("svd", X=matrix): ...`.
+
+    Parameters:
+        name (str): Name of the stage.
+        **info: Additional information, tensors are recorded through their shape.
+
+    Returns:
+        span (Span): Context manager of the stage, a no-op one if instrumentation is disabled.
+
+    """
+    if not _settings["enabled"]:
+        return _NULL_SPAN
+    return Span(name, info)
+
+def enable(profiler=False, sample_rss=False):
+    """
+    Function that enables instrumentation.
+
+    Parameters:
+        profiler (bool, optional): If True, stages are marked with `torch.profiler.record_function`,
+            so that they appear by name in traces of `torch.profiler.profile`.
+        sample_rss (bool, optional): If True, every stage also records "peak_rss", the peak resident memory of the
+            process above its value on entry, sampled by a background thread through `PeakMemory`.
+
+    """
+    _settings["enabled"] = True
+    _settings["profiler"] = profiler
+    _settings["sample_rss"] = sample_rss
+
+def disable():
+    """
+    Function that disables instrumentation.
+
+    """
+    _settings["enabled"] = False
+
+def add_callback(callback):
+    """
+    Function that registers a callback, called with the record of every stage when it ends.
+
+    Parameters:
+        callback (callable): Function taking a dict as only argument.
+
+    """
+    _callbacks.append(callback)
+
+def remove_callback(callback):
+    """
+    Function that removes a callback registered with `add_callback`.
+
+    """
+    _callbacks.remove(callback)
+
+def records():
+    """
+    Function that returns the records of the stages ended so far, in order of completion.
+    Only the last INSTRUMENTATION_MAX_RECORDS of DMD.config are kept.
+
+    """
+    return list(_records)
+
+def reset():
+    """
+    Function that removes all records.
+
+    """
+    _records.clear()
+
+def export_json(path=None):
+    """
+    Function that exports records as JSON.
+
+    Parameters:
+        path (str, optional): Path of the file where records are written.
+
+    Returns:
+        records (str): Records in JSON format.
+
+    """
+    output = json.dumps(list(_records), indent=2)
+
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(output)
+
+    return output
@@ -0,0 +1,298 @@
+import os
+import json
+import shutil
+import logging
+import hashlib
+import numpy as np
+import torch as pt
+from numpy import pi
+import DMD.config as config
+from DMD.config import PREDICTION_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NAME = "DMDModel"
+FORMAT_VERSION = 2    # Version 2 records whether data are real, version 1 models are loaded as real ones
+
+# Variables of DMD.config that change the result of DMD, checked when a model is loaded
+COMPATIBILITY_KEYS = ("DATASET_NAME", "FIELD_NAME", "FIELDS", "MASK_LOWER_BOUND", "MASK_UPPER_BOUND", "TIME_THRESHOLD",
+                      "REAL_DMD", "DTYPE_POLICY", "SVD_METHOD", "SVD_THRESHOLD", "AMPLITUDE_METHOD")
+
+def _config_snapshot():
+    # Values are kept as they would be read back from JSON, e.g. tuples as lists
+    snapshot = {}
+    for name in dir(config):
+        if name.isupper():
+            value = getattr(config, name)
+            if isinstance(value, range):
+                value = list(value)
+            snapshot[name] = json.loads(json.dumps(value, default=str))
+    return snapshot
+
+def _checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(2 ** 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class DMDModel:
+    def __init__(self, eig_val, phi, amplitudes, dt, t_steps, mask=None, real=True, config=None):
+        """
+        Class that holds the result of DMD, so that it can be saved once and reused by other processes.
+
+        A model is saved as a folder containing `meta.json`, with format version, time axis, configuration and
+        checksums, and one `.npy` file per tensor. Modes are stored one after the other, so that a model loaded
+        with memory mapping reads from disk only the modes that are used.
+
+        Parameters:
+            eig_val (torch.Tensor): Eigenvalues of the reduced operator.
+            phi (torch.Tensor): DMD modes, one column per mode.
+            amplitudes (torch.Tensor): Amplitudes of the modes at the first time step.
+            dt (float): Time interval between adjacent time steps.
+            t_steps (list): List of time steps used.
+            mask (torch.BoolTensor, optional): Matrix of 0s and 1s restricting data to the points of the modes.
+            real (bool, optional): If True, data are real-valued and so are predicted states.
+            config (dict, optional): Variables of DMD.config the model was computed with, the current ones if None.
+
+        Methods:
+            from_run(data, result): Builds a model from the input and output of `run_DMD`.
+            modes(indices): Returns the chosen modes.
+            predict(times, points, modes): Evaluates states at any times, also between snapshots or past the last one.
+            predict_chunks(times, points, modes, chunk_size): Yields predicted states a chunk of times at a time.
+            check_config(): Returns the differences between the configuration of the model and the current one.
+            save(directory): Saves the model.
+            load(directory, mmap, verify, strict): Loads a saved model.
+
+        Raises:
+            ValueError: If the number of modes, eigenvalues and amplitudes don't match.
+
+        """
+        if not (phi.size(1) == eig_val.size(0) == amplitudes.size(0)):
+            raise ValueError("Modes, eigenvalues and amplitudes must have the same number of modes.")
+
+        self.eig_val = eig_val
+        self.phi = phi
+        self.amplitudes = amplitudes
+        self.dt = float(dt)
+        self.t_steps = list(t_steps)
+        self.mask = mask
+        self.real = real
+        self.config = config if config is not None else _config_snapshot()
+
+    @classmethod
+    def from_run(cls, data, result):
+        """
+        Builds a model from the input and output of `run_DMD` or of its variants.
+
+        Parameters:
+            data (tuple): (mask, t_steps, dt, data_matrix) as returned by `process_data`.
+            result (tuple): Tuple returned by `run_DMD`.
+
+        Returns:
+            model (DMDModel): Model with the current configuration.
+
+        """
+        mask, t_steps, dt, data_matrix = data
+        _, eig_val, _, phi, dynamics, _, _ = result
+        return cls(eig_val, phi, dynamics[:, 0], dt, t_steps, mask, real=not data_matrix.is_complex())
+
+    @property
+    def rank(self):
+        return self.eig_val.size(0)
+
+    @property
+    def frequencies(self):
+        return pt.log(self.eig_val).imag / (2.0 * pi * self.dt)
+
+    @property
+    def continuous_eig_val(self):
+        # Eigenvalues of the continuous-time operator, exp(omega * dt) = eig_val
+        return pt.log(self.eig_val.to(pt.complex128)) / self.dt
+
+    def modes(self, indices=None):
+        """
+        Returns the chosen modes; for a memory-mapped model, only these are read from disk.
+
+        Parameters:
+            indices (list or torch.Tensor, optional): Indices of the modes, all of them if None.
+
+        Returns:
+            phi (torch.Tensor): Chosen modes, one column per mode.
+
+        """
+        if indices is None:
+            return self.phi
+        return self.phi.T[pt.as_tensor(indices)].T
+
+    def _predictor(self, points, modes):
+        phi = self.modes(modes)
+        if points is not None:
+            phi = phi[pt.as_tensor(points)]
+
+        omega = self.continuous_eig_val
+        amplitudes = self.amplitudes.to(pt.complex128)
+        if modes is not None:
+            modes = pt.as_tensor(modes)
+            omega, amplitudes = omega[modes], amplitudes[modes]
+
+        t0 = float(self.t_steps[0])
+
+        def predict(times):
+            # Exponentials are computed in double precision, long horizons would otherwise lose accuracy in the phase
+            times = pt.as_tensor(times, dtype=pt.float64).reshape(-1) - t0
+            dynamics = (amplitudes.unsqueeze(1) * pt.exp(omega.unsqueeze(1) * times.unsqueeze(0))).to(phi.dtype)
+            states = phi @ dynamics
+            return states.real if self.real else states
+
+        return predict
+
+    def predict(self, times, points=None, modes=None):
+        """
+        Evaluates states at any times through continuous-time eigenvalues, with a single product of modes and dynamics.
+        At the time steps of the model, it matches the reconstruction of `run_DMD`.
+
+        Parameters:
+            times (torch.Tensor or list): Times, in the same units as the time steps of the model.
+            points (torch.Tensor or list, optional): Indices of the points (rows of the modes) evaluated, all of them if None.
+            modes (torch.Tensor or list, optional): Indices of the modes used, all of them if None.
+
+        Returns:
+            states (torch.Tensor): Predicted states, one row per point and one column per time, real for real data.
+
+        """
+        return self._predictor(points, modes)(times)
+
+    def predict_chunks(self, times, points=None, modes=None, chunk_size=PREDICTION_CHUNK_SIZE):
+        """
+        Yields predicted states a chunk of times at a time, so that long horizons never exist in memory at once.
+
+        Parameters:
+            times (torch.Tensor or list): Times, in the same units as the time steps of the model.
+            points (torch.Tensor or list, optional): Indices of the points evaluated, all of them if None.
+            modes (torch.Tensor or list, optional): Indices of the modes used, all of them if None.
+            chunk_size (int, optional): Number of times of each chunk.
+
+        Yields:
+            times (torch.Tensor): Times of the chunk.
+            states (torch.Tensor): Predicted states at these times, see `predict`.
+
+        Raises:
+            ValueError: If `chunk_size` is not positive.
+
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive.")
+
+        predict = self._predictor(points, modes)
+        times = pt.as_tensor(times, dtype=pt.float64).reshape(-1)
+
+        for start in range(0, times.size(0), chunk_size):
+            chunk = times[start:start + chunk_size]
+            yield chunk, predict(chunk)
+
+    def check_config(self):
+        """
+        Returns the variables of DMD.config that change the result of DMD and differ from those of the model.
+
+        Returns:
+            differences (dict): (value of the model, current value) pairs keyed by variable name.
+
+        """
+        current = _config_snapshot()
+        return {name: (self.config.get(name), current.get(name)) for name in COMPATIBILITY_KEYS
+                if self.config.get(name) != current.get(name)}
+
+    def save(self, directory):
+        """
+        Saves the model in a folder, which is replaced if it exists already.
+
+        Parameters:
+            directory (str): Path of the folder.
+
+        """
+        tmp_directory = f"{directory}.tmp{os.getpid()}"
+        os.makedirs(tmp_directory, exist_ok=True)
+
+        tensors = {"eig_val": self.eig_val, "phi": self.phi.T, "amplitudes": self.amplitudes}
+        if self.mask is not None:
+            tensors["mask"] = self.mask
+
+        checksums = {}
+        for name, tensor in tensors.items():
+            path = os.path.join(tmp_directory, f"{name}.npy")
+            np.save(path, tensor.detach().contiguous().numpy())
+            checksums[f"{name}.npy"] = _checksum(path)
+
+        meta = {
+            "format": FORMAT_NAME,
+            "format_version": FORMAT_VERSION,
+            "n_points": self.phi.size(0),
+            "rank": self.rank,
+            "dtype": str(self.phi.dtype),
+            "real": self.real,
+            "dt": self.dt,
+            "t_steps": self.t_steps,
+            "config": self.config,
+            "checksums": checksums,
+        }
+        with open(os.path.join(tmp_directory, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+        # The model becomes visible only once it is complete
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_directory, directory)
+
+    @classmethod
+    def load(cls, directory, mmap=True, verify=False, strict=False):
+        """
+        Loads a model saved with `save`.
+
+        Parameters:
+            directory (str): Path of the folder.
+            mmap (bool, optional): If True, modes are memory-mapped and read from disk only when accessed.
+            verify (bool, optional): If True, checksums of all files are verified, which reads them entirely.
+            strict (bool, optional): If True, differences between the configuration of the model and the current one
+                are errors, otherwise they are logged as warnings.
+
+        Returns:
+            model (DMDModel): The loaded model.
+
+        Raises:
+            ValueError: If the folder doesn't contain a model or its format version is newer than the supported one.
+            ValueError: If `verify` is set and a checksum doesn't match.
+            ValueError: If `strict` is set and the configuration differs from the current one.
+
+        """
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+
+        if meta.get("format") != FORMAT_NAME:
+            raise ValueError(f"Folder '{directory}' doesn't contain a DMD model.")
+
+        if meta["format_version"] > FORMAT_VERSION:
+            raise ValueError(f"Model format version {meta['format_version']} is newer than the supported one ({FORMAT_VERSION}).")
+
+        if verify:
+            for name, checksum in meta["checksums"].items():
+                if _checksum(os.path.join(directory, name)) != checksum:
+                    raise ValueError(f"Checksum of '{name}' doesn't match, the model is corrupted.")
+
+        def tensor(name, mmap_mode=None):
+            return pt.from_numpy(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode))
+
+        # Copy-on-write mapping, as in SnapshotCache: pages are read from disk only when accessed
+        phi = tensor("phi", "c" if mmap else None).T
+        mask = tensor("mask") if "mask.npy" in meta["checksums"] else None
+        real = meta["real"] if meta["format_version"] >= 2 else True    # Not recorded by version 1, real data by default
+        model = cls(tensor("eig_val"), phi, tensor("amplitudes"), meta["dt"], meta["t_steps"], mask, real, meta["config"])
+
+        differences = model.check_config()
+        if differences:
+            message = "Configuration differs from the one of the model: " + ", ".join(
+                f"{name} {saved!r} (model) vs {current!r} (current)" for name, (saved, current) in differences.items())
+            if strict:
+                raise ValueError(message)
+            logger.warning(message)
+
+        return model
@@ -0,0 +1,80 @@
+import logging
+import torch as pt
+from DMD.config import OPTIMIZED_MAX_ITERATIONS, OPTIMIZED_TOLERANCE, OPTIMIZED_LAMBDA
+
+logger = logging.getLogger(__name__)
+
+def _fit(Y, t, alpha):
+    # For fixed eigenvalues the amplitudes are a linear least-squares problem, so they are eliminated (variable projection)
+    E = pt.exp(t * alpha)
+    B = pt.linalg.lstsq(E, Y).solution
+    return E, B, Y - E @ B
+
+def _jacobian(E, B, t):
+    # Kaufman's approximation: column j is -vec(P E'_j B), where P projects out the range of E and the
+    # derivative E'_j of E with respect to alpha_j is t * E[:, j] in column j and zero elsewhere
+    Q, _ = pt.linalg.qr(E)
+    D = t * E
+    PD = D - Q @ (Q.conj().T @ D)
+
+    # All columns at once: entry (i, c, j) is -PD[i, j] * B[j, c], flattened as the residual
+    return -(PD.unsqueeze(2) * B.unsqueeze(0)).permute(0, 2, 1).reshape(-1, B.size(0))
+
+def variable_projection(Y, times, alpha, max_iterations=OPTIMIZED_MAX_ITERATIONS, tol=OPTIMIZED_TOLERANCE, lam=OPTIMIZED_LAMBDA):
+    """
+    Function that fits Y ~ exp(times * alpha) @ B in least-squares sense over all snapshots (optimized DMD, Askham and Kutz),
+    through Levenberg-Marquardt iterations on the eigenvalues only, the amplitudes B being eliminated by variable projection.
+
+    Parameters:
+        Y (torch.Tensor): Complex matrix of data, one row per time step.
+        times (torch.Tensor): Times of the rows of Y.
+        alpha (torch.Tensor): Initial continuous-time eigenvalues, e.g. log(eig_val) / dt of exact DMD.
+        max_iterations (int, optional): Maximum number of iterations.
+        tol (float, optional): Iterations stop early when the relative residual, or its relative decrease, falls below `tol`.
+        lam (float, optional): Initial damping of Levenberg-Marquardt.
+
+    Returns:
+        alpha (torch.Tensor): Fitted continuous-time eigenvalues.
+        B (torch.Tensor): Fitted amplitudes, one row per eigenvalue.
+        info (dict): Number of iterations, relative residual and whether a stopping criterion was met.
+
+    """
+    t = times.to(Y.dtype).unsqueeze(1)
+    alpha = alpha.to(Y.dtype)
+    Y_norm = pt.linalg.matrix_norm(Y).item() or 1.0
+
+    E, B, R = _fit(Y, t, alpha)
+    error = pt.linalg.matrix_norm(R).item()
+    converged = error / Y_norm < tol
+    iteration = 0
+
+    while not converged and iteration < max_iterations:
+        iteration += 1
+
+        J = _jacobian(E, B, t)
+        JhJ = J.conj().T @ J
+        gradient = J.conj().T @ R.reshape(-1)
+        scaling = pt.diag(pt.diagonal(JhJ).real.clamp(min=pt.finfo(R.real.dtype).eps)).to(JhJ.dtype)
+
+        # Damping grows until the step decreases the residual, then shrinks again
+        for _ in range(16):
+            candidate = alpha + pt.linalg.solve(JhJ + lam * scaling, -gradient)
+            E_c, B_c, R_c = _fit(Y, t, candidate)
+            error_c = pt.linalg.matrix_norm(R_c).item()
+
+            if error_c < error:
+                break
+            lam *= 4.0
+        else:
+            logger.info(f"Optimized DMD stopped at iteration {iteration}: no step decreases the residual")
+            converged = True
+            break
+
+        improvement = (error - error_c) / error
+        alpha, E, B, R, error = candidate, E_c, B_c, R_c, error_c
+        lam = max(lam / 4.0, 1e-12)
+
+        converged = error / Y_norm < tol or improvement < tol
+
+    logger.info(f"Optimized DMD: {iteration} iterations, relative residual {error / Y_norm:.2e}")
+    return alpha, B, {"iterations": iteration, "residual": error / Y_norm, "converged": converged}
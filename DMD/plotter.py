@@ -1,7 +1,60 @@
-import matplotlib.pyplot as plt
+import os
+import hashlib
+import tempfile
+import importlib
 import torch as pt
 import numpy as np
-from DMD.data_processor import process_data
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from DMD.reconstruction import LazyReconstruction
+from DMD.functions import mask_indices
+from DMD.config import PLOT_TRIANGULATIONS
+
+class _LazyModule:
+    # Module imported on first attribute access, so that importing DMD.plotter doesn't load matplotlib
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+plt = _LazyModule("matplotlib.pyplot")
+tri = _LazyModule("matplotlib.tri")
+
+# Triangulations of the plotted points, keyed by a digest of their coordinates, so that
+# every Plotter on the same mask shares a single Delaunay triangulation; at most PLOT_TRIANGULATIONS are kept,
+# in order of use, so that plotting many masks in a long session doesn't keep all of them alive
+_triangulations = OrderedDict()
+
+# State of process-pool workers, set once by `_init_worker` so that the triangulation is not pickled for every frame
+_worker_state = {}
+
+def _plottable(data):
+    # Complex data are plotted through their real part, as the export functions always did, and half precision
+    # is converted to single precision, which numpy and matplotlib support; other types are left unchanged
+    data = data.detach()
+    data = data.real if data.is_complex() else data
+    return data.float() if data.dtype in (pt.float16, pt.bfloat16) else data
+
+def _draw(ax, triangulation, data, title, levels):
+    ax.tricontourf(triangulation, data, levels = levels, cmap = "jet")
+    ax.tricontour(triangulation, data, levels = levels, linewidths = 0.1, colors = 'k')
+    ax.add_patch(plt.Circle((0.2, 0.2), 0.05, color = 'k'))
+    ax.set_aspect('equal', 'box')
+    ax.set_title(title)
+
+def _init_worker(x, y, triangles):
+    # Workers only write files, the non-interactive backend avoids any display
+    plt.switch_backend("Agg")
+    _worker_state["triangulation"] = tri.Triangulation(x, y, triangles)
+
+def _render_frame(path, data, title, levels, dpi, triangulation=None):
+    fig, ax = plt.subplots(figsize = (7, 4))
+    _draw(ax, triangulation or _worker_state["triangulation"], data, title, levels)
+    fig.tight_layout()
+    fig.savefig(path, dpi = dpi)
+    plt.close(fig)
+    return path
 
 class Plotter:     
     def __init__(self, pts, mask):          
@@ -18,14 +71,46 @@ class Plotter:
             scatter_plot: Produces a scatter plot of the grid's vertices.
             plot_data(ax, data, title): Creates a filled contour plot with additional contour lines and a circle patch on the given axis.
             plot_DMD_modes(phi, mode_indices): Plots the found DMD modes.
+            plot_field_modes(phi, mode_indices, layout): Plots the DMD modes of stacked fields, one figure per field.
+            export_frames(frames, directory, prefix, workers, dpi, levels): Renders many plots to image files through a pool of processes.
+            export_modes(phi, mode_indices, directory, **kwargs): Renders real and imaginary parts of DMD modes to image files.
+            export_time_series(data_matrix, t_idx, time_steps, directory, **kwargs): Renders time steps of data to image files.
+            export_animation(data_matrix, t_idx, time_steps, path, fps, **kwargs): Renders time steps of data to an animated GIF.
             time_dynamics(optimal_rank, dynamics, time_steps): Plots the time evolution of each mode.
+            plot_spectrum(table): Plots amplitudes and growth rates of modes against their frequencies.
             data_reconstruction(data_matrix, reconstruction, t_idx, time_steps): Plots both original and reconstructed data for comparison.
-            reconstruction_error(time_steps, mse_dmd): Plots the Mean Square Error (MSE) of reconstructed data with respect to original ones.
+            reconstruction_error(time_steps, mse_dmd, data_matrix): Plots the Mean Square Error (MSE) of reconstructed data with respect to original ones.
 
         """
         self.pts = pts
         self.mask = mask
 
+        # Coordinates of masked points are gathered once and shared by every plot
+        index = mask_indices(mask)
+        self.x = pt.index_select(pts[:, 0], 0, index)
+        self.y = pt.index_select(pts[:, 1], 0, index)
+        self._triangulation = None
+
+    @property
+    def triangulation(self):
+        """
+        Delaunay triangulation of the masked points, built on first use and shared by every plot on the same mask.
+
+        """
+        if self._triangulation is None:
+            x, y = self.x.numpy().astype(np.float64), self.y.numpy().astype(np.float64)
+            key = hashlib.sha1(x.tobytes() + y.tobytes()).hexdigest()
+
+            if key not in _triangulations:
+                _triangulations[key] = tri.Triangulation(x, y)
+                while len(_triangulations) > PLOT_TRIANGULATIONS:
+                    _triangulations.popitem(last=False)
+
+            _triangulations.move_to_end(key)
+            self._triangulation = _triangulations[key]
+
+        return self._triangulation
+
     def scatter_plot(self):                   
         """
         Produces a scatter plot of the grid's vertices.
@@ -47,7 +132,7 @@ class Plotter:
         
         Parameters:
             ax (matplotlib.axes.Axes): Axis on which the plot is drawn
-            data (torch.Tensor): Data array to be visualized
+            data (torch.Tensor): Data array to be visualized, through its real part if complex
             title (str or Any): Title of the plot, will be converted to string if necessary
         
         Returns:
@@ -59,17 +144,10 @@ class Plotter:
         """
         contourf = None
 
-        x = pt.masked_select(self.pts[:, 0], self.mask)
-        y = pt.masked_select(self.pts[:, 1], self.mask)
-        
-        if data.size(0) != x.size(0):
+        if data.size(0) != self.x.size(0):
             raise ValueError("Size of data must match the number of points on plot's axes.")
 
-        ax.tricontourf(x, y, data, levels = 15, cmap = "jet")
-        ax.tricontour(x, y, data, levels = 15, linewidths = 0.1, colors = 'k')
-        ax.add_patch(plt.Circle((0.2, 0.2), 0.05, color = 'k'))
-        ax.set_aspect('equal', 'box')
-        ax.set_title(title)
+        _draw(ax, self.triangulation, _plottable(data), title, 15)
         plt.tight_layout()
     
     def plot_DMD_modes(self, phi, mode_indices):
@@ -105,6 +183,20 @@ class Plotter:
 
         plt.tight_layout()
 
+    def plot_field_modes(self, phi, mode_indices, layout):
+        """
+        Plots the DMD modes of stacked fields, splitting them back into one figure per field or component.
+
+        Parameters:
+            phi (torch.Tensor): Tensor containing DMD modes of a matrix built by `process_fields`.
+            mode_indices (list): List of modes indices to be plotted.
+            layout (FieldLayout): Layout of the stacked matrix.
+
+        """
+        for label, block in layout.split(phi).items():
+            self.plot_DMD_modes(block, mode_indices)
+            plt.gcf().suptitle(label)
+
     def time_dynamics(self, optimal_rank, dynamics, time_steps): 
         """
         Plots the time evolution of each mode.
@@ -134,13 +226,49 @@ class Plotter:
         axarr[-1].set_xlim(time_steps[0], time_steps[-1])
         axarr[0].set_title("time dynamics")
 
+    def plot_spectrum(self, table):
+        """
+        Plots amplitudes and growth rates of modes against their frequencies, the size of markers following their energy.
+
+        Parameters:
+            table (dict): Spectrum table, see `DMD.spectrum.spectrum`.
+
+        Raises:
+            ValueError: If `table` has no rows.
+
+        """
+        if table["mode"].numel() == 0:
+            raise ValueError("The spectrum table must contain at least one mode.")
+
+        frequency = table["frequency"].numpy()
+        energy = table["energy"].numpy()
+        sizes = 10 + 90 * energy / energy.max() if energy.max() > 0 else 20
+
+        fig, axarr = plt.subplots(1, 2, figsize = (14, 5), sharex = True)
+
+        axarr[0].stem(frequency, table["amplitude"].numpy())
+        axarr[0].set_xlabel("Frequency [Hz]")
+        axarr[0].set_ylabel("Amplitude")
+        axarr[0].set_title("Amplitude spectrum")
+
+        axarr[1].scatter(frequency, table["growth_rate"].numpy(), s = sizes, c = "k")
+        axarr[1].axhline(0.0, color = "gray", lw = 0.5)
+        axarr[1].set_xlabel("Frequency [Hz]")
+        axarr[1].set_ylabel("Growth rate [1/s]")
+        axarr[1].set_title("Growth rates")
+
+        for mode, x, y in zip(table["mode"].tolist(), frequency, table["growth_rate"].tolist()):
+            axarr[1].annotate(str(mode), (x, y), fontsize = 7)
+
+        plt.tight_layout()
+
     def data_reconstruction(self, data_matrix, reconstruction, t_idx, time_steps):
         """
         Plots both original and reconstructed data for comparison.
 
         Parameters:
             data_matrix (torch.Tensor): Original matrix of data
-            reconstruction (torch.Tensor): Reconstructed data tensor through found DMD modes
+            reconstruction (torch.Tensor or LazyReconstruction): Reconstructed data tensor through found DMD modes, only the plotted columns of a lazy one are computed
             t_idx (list): Indices of time steps to be plotted
             time_steps (list): Time steps available
 
@@ -157,9 +285,6 @@ class Plotter:
         if reconstruction.size() != data_matrix.size():
             raise ValueError("`reconstruction` and `data_matrix` must have the same shape.")
 
-        x = pt.masked_select(self.pts[:, 0], self.mask)
-        y = pt.masked_select(self.pts[:, 1], self.mask)
-
         fig, axarr = plt.subplots(len(t_idx), 2, figsize = (14, 8), sharex = True, sharey = True)
         axarr = np.atleast_2d(axarr)
     
@@ -169,19 +294,27 @@ class Plotter:
 
         plt.tight_layout()
 
-    def reconstruction_error(self, time_steps, mse_dmd):    
+    def reconstruction_error(self, time_steps, mse_dmd, data_matrix=None):    
         """
         Plots the Mean Square Error (MSE) of reconstructed data with respect to original ones.
 
         Parameters:
             times_steps (list): List of times available
-            mse_dmd (torch.Tensor): Tensor with the computed Mean Square Error for reconstructed and original data
+            mse_dmd (torch.Tensor or LazyReconstruction): Tensor with the computed Mean Square Error for reconstructed and original data,
+                or lazy reconstruction from which it is computed in blocks of time steps
+            data_matrix (torch.Tensor, optional): Original matrix of data, needed only if `mse_dmd` is a lazy reconstruction
 
         Raises:
+            ValueError: If `mse_dmd` is a lazy reconstruction and `data_matrix` is not given
             ValueError: If `mse_dmd` has not the same length as `time_steps`
         
         """      
         time_steps = [float(t) for t in time_steps]
+
+        if isinstance(mse_dmd, LazyReconstruction):
+            if data_matrix is None:
+                raise ValueError("`data_matrix` is needed to compute the error of a lazy reconstruction.")
+            mse_dmd = mse_dmd.mse(data_matrix)
         
         if mse_dmd.size(0) != len(time_steps):
             raise ValueError("`mse_dmd` must be of the same size as `time_steps`.")
@@ -193,4 +326,116 @@ class Plotter:
         plt.xlim(time_steps[0], time_steps[-1])
         plt.legend()
         plt.title('Mean Squared Error vs Time')
-        plt.tight_layout()          
+        plt.tight_layout()
+
+    def export_frames(self, frames, directory, prefix="frame", workers=None, dpi=100, levels=15):
+        """
+        Renders many plots to PNG files through a pool of processes with the non-interactive Agg backend.
+        The triangulation is built once and sent to each worker when it starts.
+
+        Parameters:
+            frames (list): List of (data, title) pairs, one per file.
+            directory (str): Folder where files are written, created if missing.
+            prefix (str, optional): Prefix of file names, followed by the index of the frame.
+            workers (int, optional): Number of processes, by default the number of cores. With 1 worker, frames are rendered in this process.
+            dpi (int, optional): Resolution of the images.
+            levels (int or array-like, optional): Contour levels, shared levels keep colors comparable between frames.
+
+        Returns:
+            paths (list): Paths of the written files, in the order of `frames`.
+
+        Raises:
+            ValueError: If the size of some data doesn't match the number of points of the mask.
+
+        """
+        if any(data.size(0) != self.x.size(0) for data, _ in frames):
+            raise ValueError("Size of data must match the number of points on plot's axes.")
+
+        os.makedirs(directory, exist_ok=True)
+        digits = len(str(max(len(frames) - 1, 0)))
+        tasks = [(os.path.join(directory, f"{prefix}_{i:0{digits}d}.png"), _plottable(data).cpu().numpy(), title, levels, dpi)
+                 for i, (data, title) in enumerate(frames)]
+
+        triangulation = self.triangulation
+        initargs = (triangulation.x, triangulation.y, triangulation.triangles)
+        workers = workers or os.cpu_count()
+
+        if workers == 1:
+            return [_render_frame(*task, triangulation) for task in tasks]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            return list(pool.map(_render_frame, *zip(*tasks)))
+
+    def export_modes(self, phi, mode_indices, directory, **kwargs):
+        """
+        Renders real and imaginary parts of DMD modes to PNG files, see `export_frames`.
+
+        Parameters:
+            phi (torch.Tensor): Tensor containing DMD modes.
+            mode_indices (list): List of modes indices to be rendered.
+            directory (str): Folder where files are written.
+            **kwargs: Additional arguments of `export_frames`.
+
+        Returns:
+            paths (list): Paths of the written files, real and imaginary part of each mode in turn.
+
+        """
+        frames = []
+        for idx in mode_indices:
+            frames.append((phi[:, idx].real, f"Mode {idx}, real"))
+            frames.append((phi[:, idx].imag if phi.is_complex() else pt.zeros_like(phi[:, idx]), f"Mode {idx}, imag"))
+
+        return self.export_frames(frames, directory, prefix="mode", **kwargs)
+
+    def export_time_series(self, data_matrix, t_idx, time_steps, directory, **kwargs):
+        """
+        Renders time steps of data, or of their reconstruction, to PNG files with contour levels shared by every frame.
+
+        Parameters:
+            data_matrix (torch.Tensor or LazyReconstruction): Data to be rendered, only the chosen columns of a lazy reconstruction are computed.
+            t_idx (list): Indices of time steps to be rendered.
+            time_steps (list): Time steps available.
+            directory (str): Folder where files are written.
+            **kwargs: Additional arguments of `export_frames`.
+
+        Returns:
+            paths (list): Paths of the written files, in the order of `t_idx`.
+
+        """
+        frames = [(data_matrix[:, idx].real, f"t = {time_steps[idx]}s") for idx in t_idx]
+
+        if "levels" not in kwargs and frames:
+            vmin = min(data.min().item() for data, _ in frames)
+            vmax = max(data.max().item() for data, _ in frames)
+            kwargs["levels"] = np.linspace(vmin, vmax, 16) if vmax > vmin else 15
+
+        return self.export_frames(frames, directory, prefix="time", **kwargs)
+
+    def export_animation(self, data_matrix, t_idx, time_steps, path, fps=10, **kwargs):
+        """
+        Renders time steps of data, or of their reconstruction, to an animated GIF.
+        Frames are rendered in parallel, see `export_time_series`, then joined by Pillow.
+
+        Parameters:
+            data_matrix (torch.Tensor or LazyReconstruction): Data to be rendered.
+            t_idx (list): Indices of time steps to be rendered.
+            time_steps (list): Time steps available.
+            path (str): Path of the GIF file.
+            fps (float, optional): Frames per second.
+            **kwargs: Additional arguments of `export_frames`.
+
+        Returns:
+            path (str): Path of the written file.
+
+        """
+        from PIL import Image    # Dependency of matplotlib
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = self.export_time_series(data_matrix, t_idx, time_steps, directory, **kwargs)
+            images = [Image.open(frame) for frame in paths]
+            images[0].save(path, save_all=True, append_images=images[1:], duration=1000 / fps, loop=0)
+
+            for image in images:
+                image.close()
+
+        return path
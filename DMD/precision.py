@@ -0,0 +1,136 @@
+import torch as pt
+
+_STORAGE_DTYPES = (pt.float16, pt.bfloat16, pt.float32, pt.float64)
+_COMPUTE_DTYPES = (pt.float32, pt.float64)
+_COMPLEX = {pt.float32: pt.complex64, pt.float64: pt.complex128}
+_PRECISION = {pt.float16: 0, pt.bfloat16: 0, pt.float32: 1, pt.complex64: 1, pt.float64: 2, pt.complex128: 2}
+
+def _at_least(tensor, dtype):
+    # Tensors are only ever converted to a higher precision, keeping them real or complex
+    target = _COMPLEX[dtype] if tensor.is_complex() else dtype
+    if _PRECISION.get(tensor.dtype, -1) >= _PRECISION[target]:
+        return tensor
+    return tensor.to(target)
+
+def complex_dtype(dtype):
+    """
+    Function that returns the complex type with the precision of a real or complex type.
+
+    """
+    return dtype if dtype.is_complex else _COMPLEX[dtype]
+
+class DtypePolicy:
+    def __init__(self, storage=pt.float32, compute=pt.float32, eig=pt.float32):
+        """
+        Class that sets the precision of each stage of the pipeline.
+
+        Data are loaded, stored and cached in the storage type; the SVD and the products with the data matrix
+        run in the compute type; the eigendecomposition of the reduced operator runs in the eig type.
+        Types are given as real, complex data use their complex counterparts. Compute and eig types are minimum precisions:
+        data that callers pass in a higher precision, e.g. float64 matrices with the "single" policy, are never downcast.
+
+        Parameters:
+            storage (torch.dtype, optional): float16, bfloat16, float32 or float64.
+            compute (torch.dtype, optional): float32 or float64.
+            eig (torch.dtype, optional): float32 or float64.
+
+        Methods:
+            storage_dtype(real): Returns the type of the data matrix.
+            compute_dtype(real): Returns the type of the SVD and of the products with the data matrix.
+            eig_dtype(real): Returns the type of the eigendecomposition.
+            to_compute(tensor): Converts a tensor to at least the compute type, keeping it real or complex.
+            to_eig(tensor): Converts a tensor to at least the eig type, keeping it real or complex.
+
+        Raises:
+            ValueError: If a type is not available for its stage.
+
+        """
+        if storage not in _STORAGE_DTYPES:
+            raise ValueError(f"Storage type must be one of {', '.join(str(dtype) for dtype in _STORAGE_DTYPES)}.")
+
+        if compute not in _COMPUTE_DTYPES or eig not in _COMPUTE_DTYPES:
+            raise ValueError("Compute and eig types must be float32 or float64.")
+
+        self.storage = storage
+        self.compute = compute
+        self.eig = eig
+
+    def __repr__(self):
+        return f"DtypePolicy(storage={self.storage}, compute={self.compute}, eig={self.eig})"
+
+    def __eq__(self, other):
+        return isinstance(other, DtypePolicy) and (self.storage, self.compute, self.eig) == (other.storage, other.compute, other.eig)
+
+    def storage_dtype(self, real=True):
+        """
+        Returns the type of the data matrix.
+
+        Raises:
+            ValueError: If complex data are requested in half precision, which torch doesn't support for linear algebra.
+
+        """
+        if real:
+            return self.storage
+
+        if self.storage not in _COMPLEX:
+            raise ValueError(f"Complex data can't be stored as {self.storage}, choose float32 or float64 or keep data real.")
+        return _COMPLEX[self.storage]
+
+    def compute_dtype(self, real=True):
+        """
+        Returns the type of the SVD and of the products with the data matrix.
+
+        """
+        return self.compute if real else _COMPLEX[self.compute]
+
+    def eig_dtype(self, real=True):
+        """
+        Returns the type of the eigendecomposition of the reduced operator.
+
+        """
+        return self.eig if real else _COMPLEX[self.eig]
+
+    def to_compute(self, tensor):
+        """
+        Converts a tensor to the compute type if its precision is lower, keeping it real or complex;
+        no copy is made if it has that precision or a higher one already.
+
+        """
+        return _at_least(tensor, self.compute)
+
+    def to_eig(self, tensor):
+        """
+        Converts a tensor to the eig type if its precision is lower, keeping it real or complex;
+        no copy is made if it has that precision or a higher one already.
+
+        """
+        return _at_least(tensor, self.eig)
+
+POLICIES = {
+    "half": DtypePolicy(pt.float16, pt.float32, pt.float64),
+    "bfloat16": DtypePolicy(pt.bfloat16, pt.float32, pt.float64),
+    "single": DtypePolicy(pt.float32, pt.float32, pt.float32),
+    "mixed": DtypePolicy(pt.float32, pt.float32, pt.float64),
+    "double": DtypePolicy(pt.float64, pt.float64, pt.float64),
+}
+
+def get_policy(policy):
+    """
+    Function that returns a dtype policy from its name, see `POLICIES`, or the policy itself.
+
+    Parameters:
+        policy (str or DtypePolicy): Name of a predefined policy or policy object.
+
+    Returns:
+        policy (DtypePolicy): The chosen policy.
+
+    Raises:
+        ValueError: If `policy` is not one of the predefined names.
+
+    """
+    if isinstance(policy, DtypePolicy):
+        return policy
+
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown dtype policy '{policy}', choose among {', '.join(POLICIES)}.")
+    return POLICIES[policy]
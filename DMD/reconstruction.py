@@ -0,0 +1,84 @@
+import torch as pt
+from DMD.config import MSE_BLOCK_SIZE
+
+class LazyReconstruction:
+    def __init__(self, phi, dynamics, real=False):
+        """
+        Class for reconstructing data through DMD modes only where needed, instead of building the full matrix phi @ dynamics.
+
+        It can be indexed as a tensor, e.g. `reconstruction[:, t_idx]` computes only the columns of the chosen time steps.
+
+        Parameters:
+            phi (torch.Tensor): Tensor containing DMD modes.
+            dynamics (torch.Tensor): Tensor whose rows represent each mode evolution.
+            real (bool, optional): If True, only the real part of the reconstruction is returned.
+
+        Methods:
+            size(dim): Returns the size of the reconstructed matrix, as `torch.Tensor.size`.
+            materialize(): Computes the full reconstructed matrix.
+            mse(data_matrix, block_size): Computes the Mean Squared Error for each time step, a block of time steps at a time.
+
+        """
+        self.phi = phi
+        self.dynamics = dynamics
+        self._real = real
+
+    @property
+    def real(self):
+        return LazyReconstruction(self.phi, self.dynamics, real=True)
+
+    @property
+    def shape(self):
+        return pt.Size((self.phi.size(0), self.dynamics.size(1)))
+
+    @property
+    def dtype(self):
+        return self.phi.real.dtype if self._real else self.phi.dtype
+
+    def size(self, dim=None):
+        return self.shape if dim is None else self.shape[dim]
+
+    def _output(self, values):
+        return values.real if self._real else values
+
+    def __getitem__(self, key):
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        return self._output(self.phi[rows] @ self.dynamics[:, cols])
+
+    def materialize(self):
+        """
+        Computes the full reconstructed matrix.
+
+        """
+        return self._output(self.phi @ self.dynamics)
+
+    def mse(self, data_matrix, block_size=MSE_BLOCK_SIZE):
+        """
+        Computes the Mean Squared Error between data and reconstruction for each time step.
+        Only `block_size` columns of the reconstruction exist at any time.
+
+        Parameters:
+            data_matrix (torch.Tensor): Original matrix of data.
+            block_size (int, optional): Number of time steps reconstructed at once.
+
+        Returns:
+            mse (torch.Tensor): Mean Squared Error of each time step, real for real data.
+
+        Raises:
+            ValueError: If `data_matrix` and the reconstruction have different shapes.
+
+        """
+        if data_matrix.size() != self.size():
+            raise ValueError("`reconstruction` and `data_matrix` must have the same shape.")
+
+        blocks = []
+        for start in range(0, data_matrix.size(1), block_size):
+            reconstruction = self.phi @ self.dynamics[:, start:start + block_size]
+
+            # Reconstruction of real data is real up to round-off, so the error stays real as well
+            if not data_matrix.is_complex():
+                reconstruction = reconstruction.real
+
+            blocks.append(((data_matrix[:, start:start + block_size] - reconstruction) ** 2).mean(axis = 0))
+
+        return pt.cat(blocks)
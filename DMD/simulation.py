@@ -1,18 +1,80 @@
+import time
 import logging
 import torch as pt
 from numpy import pi
-from DMD.functions import find_optimal_rank
-from flowtorch.analysis import SVD
-from DMD.data_loader import load_data
+from DMD.svd import compute_svd
+from DMD.functions import truncation_rank
 from DMD.data_processor import process_data
+from DMD.amplitudes import compute_amplitudes, adjoint_product
+from DMD.reconstruction import LazyReconstruction
+from DMD.instrumentation import span
+from DMD.optimized import variable_projection
+from DMD.spectrum import spectrum, format_spectrum
+from DMD.precision import get_policy, complex_dtype
+from DMD.execution import with_execution_settings
+from DMD.config import SVD_METHOD, SVD_THRESHOLD, LAZY_RECONSTRUCTION, AMPLITUDE_METHOD, COMPRESSION_METHOD, COMPRESSION_SAMPLES, COMPRESSION_BLOCK_SIZE
+from DMD.config import OPTIMIZED_MAX_ITERATIONS, OPTIMIZED_TOLERANCE, SPECTRUM_SUMMARY, SPECTRUM_SUMMARY_ROWS, DTYPE_POLICY
+from DMD.config import MSE_BLOCK_SIZE
 
-logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
-def run_DMD():
+def _reconstruct(phi, data_matrix, n_times, sr, Vr, eig_val, eig_vec, lazy=LAZY_RECONSTRUCTION, amplitude_method=None):
+    amplitude_method = AMPLITUDE_METHOD if amplitude_method is None else amplitude_method
+    with span("amplitudes", method=amplitude_method):
+        b = compute_amplitudes(amplitude_method, phi, data_matrix, sr, Vr, eig_val, eig_vec)    # b = (phi)^-1 * x_0 by default
+
+    # Eigenvalues may come from a higher precision than modes (see DMD.precision), dynamics follow the modes
+    b = b.to(phi.dtype)
+    vander_matrix = pt.vander(eig_val.to(phi.dtype), n_times, increasing = True)
+    dynamics = b.unsqueeze(1) * vander_matrix    # Same as diag(b) @ vander_matrix
+    reconstruction, mse = reconstruct_dynamics(phi, dynamics, data_matrix, lazy)
+
+    return dynamics, reconstruction, mse
+
+def reconstruct_dynamics(phi, dynamics, data_matrix, lazy=LAZY_RECONSTRUCTION):
+    """
+    Function that reconstructs data from DMD modes and their time dynamics, and computes the error of each time step.
+
+    Parameters:
+        phi (torch.Tensor): Tensor containing DMD modes.
+        dynamics (torch.Tensor): Time dynamics, one row per mode and one column per time step.
+        data_matrix (torch.Tensor): Matrix of data the reconstruction is compared with.
+        lazy (bool, optional): If True, the reconstruction is returned as a `LazyReconstruction`, otherwise it is materialized.
+
+    Returns:
+        reconstruction (LazyReconstruction or torch.Tensor): Reconstruction of data.
+        mse (torch.Tensor): Mean Squared Error of each time step.
+
+    """
+    reconstruction = LazyReconstruction(phi, dynamics)
+
+    # The full-size reconstruction and error matrices are never built, only blocks of time steps
+    with span("mse", data_matrix=data_matrix):
+        mse = reconstruction.mse(data_matrix, MSE_BLOCK_SIZE)    # Mean Squared Error
+
+    if not lazy:
+        with span("reconstruction", data_matrix=data_matrix):
+            reconstruction = reconstruction.materialize()
+
+    return reconstruction, mse
+
+@with_execution_settings
+def run_DMD(data=None, thr=SVD_THRESHOLD, policy=DTYPE_POLICY, keep_pairs=False, lazy=LAZY_RECONSTRUCTION, svd_method=None, amplitude_method=None):
     """
     Function that runs the DMD algorithm.
 
+    Parameters:
+        data (tuple, optional): (mask, t_steps, dt, data_matrix) as returned by `process_data`, which is called if None.
+        thr (float, optional): Percentage of singular values contribution kept, see `find_optimal_rank`.
+        policy (str or DtypePolicy, optional): Precision of the SVD, of the products with data and of the eigendecomposition, see `DMD.precision`.
+        keep_pairs (bool, optional): If True, the rank counts the singular value reaching `thr` and keeps pairs of singular values
+            together, see `truncation_rank`.
+        lazy (bool, optional): If True, the reconstruction is returned as a LazyReconstruction instead of being computed.
+        svd_method (str, optional): SVD engine, see `compute_svd`; SVD_METHOD of DMD.config, read when called, if None.
+        amplitude_method (str, optional): See `compute_amplitudes`; AMPLITUDE_METHOD of DMD.config, read when called, if None.
+
+    Threads and cores follow `ExecutionSettings`, either the ones of an enclosing context or the ones in DMD.config.
+
     Steps:
         1. Retrieves data
         2. Computes the SVD on data matrix X
@@ -24,15 +86,23 @@ def run_DMD():
 
     Returns:
         optimal_rank (int): Optimal rank computed to truncate matrices
-        eig_val (torch.Tensor): Eigenvalues of the reduced operator
-        eig_vec (torch.Tensor): Eigenvectors of the reduced operator
-        phi (torch.Tensor): Computed DMD modes
-        dynamics (torch.Tensor): Time dynamics
-        reconstruction (torch.Tensor): Data matrix reconstruction through DMD modes
+        eig_val (torch.Tensor): Eigenvalues of the reduced operator, in the eig precision of `policy`
+        eig_vec (torch.Tensor): Eigenvectors of the reduced operator, in the eig precision of `policy`
+        phi (torch.Tensor): Computed DMD modes, in the compute precision of `policy`
+        dynamics (torch.Tensor): Time dynamics, in the compute precision of `policy`
+        reconstruction (torch.Tensor or LazyReconstruction): Data matrix reconstruction through DMD modes, lazy if LAZY_RECONSTRUCTION is set
         mse (torch.Tensor): Computed Mean Squared Error in data reconstruction
 
     """    
-    _, t_steps, dt, data_matrix = process_data() 
+    if data is None:
+        with span("process_data"):
+            data = process_data()
+
+    _, t_steps, dt, data_matrix = data
+
+    # Data stored in lower precision are converted once, all products below run in the compute precision
+    policy = get_policy(policy)
+    data_matrix = policy.to_compute(data_matrix)
     
     # Matrices X (= data_matrix[:, :-1]) and X' (= data_matrix[1:, :]) won't be defined
     # Slicing will be used instead
@@ -42,11 +112,14 @@ def run_DMD():
     logger.info("Computing Singular Value Decomposition of data matrix X...\n")
   
     # In truncated SVD, we keep the greatest r = rank (of 'data_matrix') singular values
-    U, s, Vh = pt.linalg.svd(data_matrix[:, :-1], full_matrices=False)
-    
     # To further reduce the computational effort, we keep a certain % of singular values contribution 
-    thr = 99.5
-    optimal_rank = find_optimal_rank(s, thr)
+    # The randomized engine computes only as many singular values as this criterion needs
+    svd_method = SVD_METHOD if svd_method is None else svd_method
+    with span("svd", X=data_matrix[:, :-1], method=svd_method) as stage:
+        U, s, Vh, optimal_rank = compute_svd(data_matrix[:, :-1], thr, svd_method)
+        if keep_pairs:
+            optimal_rank = truncation_rank(s, thr)
+        stage.set(U=U, optimal_rank=optimal_rank)
     logger.info(f"The optimal rank to keep {thr}% of the singular values contribution is {optimal_rank}")
     logger.info(f"We discarded the {rank - optimal_rank} smallest singular values\n")
 
@@ -57,27 +130,263 @@ def run_DMD():
     
     logger.info("Proceeding with Dynamic Mode Decomposition, seek of DMD modes...\n")   
     
-    sr_inv = pt.diag(1.0 / sr)    
-    At = Ur.conj().T @ data_matrix[:,1:] @ Vr.conj().T @ sr_inv    # Reduced linear operator    
-    eig_val, eig_vec = pt.linalg.eig(At)
+    # For real data (see REAL_DMD in DMD.config) everything up to here is real arithmetic,
+    # complex values only appear with the eigendecomposition of the small r x r operator
+    with span("operator", Ur=Ur, Vr=Vr) as stage:
+        sr_inv = pt.diag(1.0 / sr)    
+        At = Ur.conj().T @ data_matrix[:,1:] @ Vr.conj().T @ sr_inv    # Reduced linear operator    
+        stage.set(At=At)
+
+    with span("eig", At=At):
+        eig_val, eig_vec = pt.linalg.eig(policy.to_eig(At))
     
-    phi = data_matrix[:, 1:] @ Vr.conj().T @ sr_inv @ eig_vec
+    with span("modes") as stage:
+        eig_vec_c = eig_vec.to(complex_dtype(data_matrix.dtype))
+        phi = (data_matrix[:, 1:] @ Vr.conj().T @ sr_inv).type(eig_vec_c.dtype) @ eig_vec_c
+        stage.set(phi=phi)
 
     logger.info(f"{phi.size(1)} modes have been collected.\n")
-        
-    for i in range(eig_val.size(0)):
-        logger.info(f"Frequency of mode {i} is {round(pt.log(eig_val[i]).imag.item() / (2.0 * pi * dt), 2)} Hz")
 
     logger.info("Reconstructing data through DMD modes and computing the error...\n")
 
-    b = pt.linalg.pinv(phi) @ data_matrix[:, 0]    # b = (phi)^-1 * x_0
-    vander_matrix = pt.vander(eig_val, len(t_steps), increasing = True)
-    dynamics = pt.diag(b) @ vander_matrix
-    reconstruction = phi @ dynamics
+    dynamics, reconstruction, mse = _reconstruct(phi, data_matrix, len(t_steps), sr, Vr, eig_val, eig_vec, lazy, amplitude_method)
 
-    reconstruction_error = (data_matrix - reconstruction) ** 2
-    mse = reconstruction_error.mean(axis = 0)    # Mean Squared Error
+    # One summary of the strongest modes instead of a line per mode
+    if SPECTRUM_SUMMARY:
+        # Modes of complex data don't come in conjugate pairs, so every one of them is listed
+        # The whole table is passed, so that the summary tells how many modes are not listed
+        table = spectrum(eig_val, phi, dynamics, dt, conjugates=data_matrix.is_complex())
+        logger.info(f"Spectrum of the strongest modes:\n{format_spectrum(table, SPECTRUM_SUMMARY_ROWS)}\n")
 
     logger.info("Reconstruction completed. \n")
 
     return optimal_rank, eig_val, eig_vec, phi, dynamics, reconstruction, mse
+
+def compress_data(data_matrix, n_samples=COMPRESSION_SAMPLES, method=COMPRESSION_METHOD, generator=None, block_size=COMPRESSION_BLOCK_SIZE):
+    """
+    Function that compresses the spatial dimension of the data matrix, keeping its time dynamics.
+
+    Parameters:
+        data_matrix (torch.Tensor): Matrix of data, one row per point and one column per time step.
+        n_samples (int, optional): Number of rows of the compressed matrix, namely points or random projections.
+        method (str, optional): "subsample" keeps randomly chosen points, "projection" combines all of them through a Gaussian matrix.
+        generator (torch.Generator, optional): Generator of the random points or projections.
+        block_size (int, optional): Points whose columns of the Gaussian matrix exist at once, so that the n_samples x n_points
+            matrix is never built and memory doesn't grow with the number of points beyond the data.
+
+    Returns:
+        compressed (torch.Tensor): Compressed matrix, of shape (n_samples, number of time steps).
+
+    Raises:
+        ValueError: If `method` is not one of the available ones.
+        ValueError: If `n_samples` is not positive.
+
+    """
+    if method not in ("subsample", "projection"):
+        raise ValueError(f"Unknown compression method '{method}', choose among 'subsample' and 'projection'.")
+
+    if n_samples < 1:
+        raise ValueError("Number of samples must be positive.")
+
+    n_points = data_matrix.size(0)
+
+    if method == "subsample":
+        if n_samples >= n_points:
+            return data_matrix
+        index = pt.randperm(n_points, generator=generator)[:n_samples].sort().values
+        return pt.index_select(data_matrix, 0, index)
+
+    # The Gaussian matrix is drawn and applied a block of points at a time: P @ X = sum of P_block @ X_block
+    compressed = pt.zeros(n_samples, data_matrix.size(1), dtype=data_matrix.dtype)
+    for start in range(0, n_points, block_size):
+        stop = min(start + block_size, n_points)
+        projection = pt.randn(n_samples, stop - start, generator=generator) / n_samples ** 0.5    # Keeps the norm of snapshots on average
+        compressed += projection.to(data_matrix.dtype) @ data_matrix[start:stop]
+
+    return compressed
+
+@with_execution_settings
+def run_compressed_DMD(data=None, thr=SVD_THRESHOLD, n_samples=COMPRESSION_SAMPLES, method=COMPRESSION_METHOD, seed=0, policy=DTYPE_POLICY,
+                       keep_pairs=False, lazy=LAZY_RECONSTRUCTION):
+    """
+    Function that runs DMD on spatially compressed data, then lifts modes back to every masked point (compressed DMD).
+
+    Eigenvalues and right singular vectors of the compressed matrix approximate those of the full one, so full-resolution
+    modes are recovered as phi = X' V S^-1 W, with a single product of the full matrix X' by a small one.
+
+    Parameters:
+        data (tuple, optional): (mask, t_steps, dt, data_matrix) as returned by `process_data`, which is called if None.
+        thr (float, optional): Percentage of singular values contribution kept, see `find_optimal_rank`.
+        n_samples (int, optional): Number of points or projections, see `compress_data`.
+        method (str, optional): "subsample" or "projection", see `compress_data`.
+        seed (int, optional): Seed of the random points or projections.
+        policy (str or DtypePolicy, optional): See `run_DMD`.
+        keep_pairs (bool, optional): See `run_DMD`.
+        lazy (bool, optional): See `run_DMD`.
+
+    Returns:
+        The same tuple as `run_DMD`, with modes and reconstruction at full resolution.
+
+    """
+    if data is None:
+        with span("process_data"):
+            data = process_data()
+
+    _, t_steps, dt, data_matrix = data
+
+    policy = get_policy(policy)
+    data_matrix = policy.to_compute(data_matrix)
+
+    with span("compression", data_matrix=data_matrix, method=method) as stage:
+        compressed = compress_data(data_matrix, n_samples, method, pt.Generator().manual_seed(seed))
+        stage.set(compressed=compressed)
+    logger.info(f"Data compressed from {data_matrix.size(0)} to {compressed.size(0)} rows through {method}\n")
+
+    with span("svd", X=compressed[:, :-1], method=SVD_METHOD) as stage:
+        U, s, Vh, optimal_rank = compute_svd(compressed[:, :-1], thr, SVD_METHOD)
+        if keep_pairs:
+            optimal_rank = truncation_rank(s, thr)
+        stage.set(U=U, optimal_rank=optimal_rank)
+    logger.info(f"The optimal rank to keep {thr}% of the singular values contribution is {optimal_rank}")
+
+    Ur = U[:, :optimal_rank].to(data_matrix.dtype)
+    sr = s[:optimal_rank].to(data_matrix.dtype)
+    Vr = Vh[:optimal_rank, :].to(data_matrix.dtype)
+
+    with span("operator", Ur=Ur, Vr=Vr) as stage:
+        sr_inv = pt.diag(1.0 / sr)
+        At = Ur.conj().T @ compressed[:, 1:] @ Vr.conj().T @ sr_inv
+        stage.set(At=At)
+
+    with span("eig", At=At):
+        eig_val, eig_vec = pt.linalg.eig(policy.to_eig(At))
+
+    # The only pass over the full matrix: modes are lifted back to every masked point
+    with span("modes") as stage:
+        eig_vec_c = eig_vec.to(complex_dtype(data_matrix.dtype))
+        phi = (data_matrix[:, 1:] @ (Vr.conj().T @ sr_inv)).type(eig_vec_c.dtype) @ eig_vec_c
+        stage.set(phi=phi)
+
+    logger.info(f"{phi.size(1)} modes have been collected.\n")
+
+    dynamics, reconstruction, mse = _reconstruct(phi, data_matrix, len(t_steps), sr, Vr, eig_val, eig_vec, lazy)
+
+    return optimal_rank, eig_val, eig_vec, phi, dynamics, reconstruction, mse
+
+def compare_compressed_DMD(data=None, thr=SVD_THRESHOLD, n_samples=COMPRESSION_SAMPLES, method=COMPRESSION_METHOD, seed=0, keep_pairs=False):
+    """
+    Function that compares compressed DMD with full DMD, both for runtime and accuracy.
+
+    Parameters:
+        data (tuple, optional): (mask, t_steps, dt, data_matrix) as returned by `process_data`, which is called if None.
+        thr (float, optional): Percentage of singular values contribution kept.
+        n_samples (int, optional): Number of points or projections, see `compress_data`.
+        method (str, optional): "subsample" or "projection", see `compress_data`.
+        seed (int, optional): Seed of the random points or projections.
+        keep_pairs (bool, optional): See `run_DMD`, applied to both runs.
+
+    Returns:
+        report (dict): Runtimes, speedup, optimal ranks, maximum distance of the compressed eigenvalues from the full ones,
+            maximum frequency error in Hz, relative norm of the full modes outside the span of the compressed ones, and mean MSE of both.
+
+    """
+    if data is None:
+        data = process_data()
+    dt = data[2]
+
+    start = time.perf_counter()
+    rank_f, eig_val_f, _, phi_f, _, _, mse_f = run_DMD(data, thr, keep_pairs=keep_pairs)
+    time_full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rank_c, eig_val_c, _, phi_c, _, _, mse_c = run_compressed_DMD(data, thr, n_samples, method, seed, keep_pairs=keep_pairs)
+    time_compressed = time.perf_counter() - start
+
+    # Each compressed eigenvalue is matched with the nearest full one
+    nearest = (eig_val_c.unsqueeze(1) - eig_val_f.unsqueeze(0)).abs().argmin(dim=1)
+    frequencies_f = pt.log(eig_val_f).imag / (2.0 * pi * dt)
+    frequencies_c = pt.log(eig_val_c).imag / (2.0 * pi * dt)
+
+    Q, _ = pt.linalg.qr(phi_c)
+    residual = phi_f - Q @ (Q.conj().T @ phi_f)
+
+    report = {
+        "method": method,
+        "samples": n_samples,
+        "time_full": time_full,
+        "time_compressed": time_compressed,
+        "speedup": time_full / time_compressed,
+        "rank_full": rank_f,
+        "rank_compressed": rank_c,
+        "eigenvalues_error": (eig_val_c - eig_val_f[nearest]).abs().max().item() if rank_c > 0 else 0.0,
+        "frequencies_error": (frequencies_c - frequencies_f[nearest]).abs().max().item() if rank_c > 0 else 0.0,
+        "modes_error": (pt.linalg.matrix_norm(residual) / pt.linalg.matrix_norm(phi_f)).item() if rank_f > 0 else 0.0,
+        "mse_full": mse_f.mean().item(),
+        "mse_compressed": mse_c.mean().item(),
+    }
+
+    logger.info(f"Compressed DMD ({method}, {n_samples} samples): {report['speedup']:.2f}x speedup over full DMD, "
+                f"eigenvalues error {report['eigenvalues_error']:.2e}, modes error {report['modes_error']:.2e}")
+
+    return report
+
+@with_execution_settings
+def run_optimized_DMD(data=None, thr=SVD_THRESHOLD, warm_start=None, max_iterations=OPTIMIZED_MAX_ITERATIONS, tol=OPTIMIZED_TOLERANCE,
+                      policy=DTYPE_POLICY, lazy=LAZY_RECONSTRUCTION):
+    """
+    Function that runs optimized DMD: eigenvalues and modes are fitted to all snapshots at once through variable projection,
+    which is far less biased by noise than exact DMD, whose operator only links adjacent snapshots.
+
+    The fit runs on the projection of data onto the modes of exact DMD, so its cost doesn't depend on the number of points.
+
+    Parameters:
+        data (tuple, optional): (mask, t_steps, dt, data_matrix) as returned by `process_data`, which is called if None.
+        thr (float, optional): Percentage of singular values contribution kept, it sets the number of modes.
+        warm_start (tuple, optional): Outputs of `run_DMD` on the same data, which is called if None. Its eigenvalues
+            start the iterations and its modes span the space onto which data are projected.
+        max_iterations (int, optional): See `variable_projection`.
+        tol (float, optional): See `variable_projection`.
+        policy (str or DtypePolicy, optional): See `run_DMD`, the fit itself always runs in double precision.
+        lazy (bool, optional): See `run_DMD`.
+
+    Returns:
+        The same tuple as `run_DMD`; eigenvectors are the coordinates of modes on an orthonormal basis of the exact DMD modes.
+
+    """
+    if data is None:
+        with span("process_data"):
+            data = process_data()
+
+    _, t_steps, dt, data_matrix = data
+
+    policy = get_policy(policy)
+    data_matrix = policy.to_compute(data_matrix)
+
+    if warm_start is None:
+        warm_start = run_DMD(data, thr, policy)
+    optimal_rank, eig_val, phi = warm_start[0], warm_start[1], warm_start[3]
+
+    # Orthonormal basis of the exact DMD modes, no further SVD is needed
+    with span("projection", phi=phi) as stage:
+        Q, _ = pt.linalg.qr(phi)
+        Y = adjoint_product(Q, data_matrix).T.type(pt.complex128)    # Complex double precision keeps exponentials of the fit accurate
+        stage.set(Y=Y)
+
+    times = pt.arange(len(t_steps), dtype=pt.float64) * dt
+
+    with span("variable_projection", Y=Y) as stage:
+        alpha, B, info = variable_projection(Y, times, pt.log(eig_val.type(pt.complex128)) / dt, max_iterations, tol)
+        stage.set(**info)
+
+    dtype = pt.promote_types(data_matrix.dtype, pt.complex64)
+
+    # Modes have unit norm, their norms in the fit are the amplitudes
+    b = pt.linalg.vector_norm(B, dim=1)
+    eig_vec = (B.T / b.clamp(min=pt.finfo(b.dtype).tiny)).type(dtype)
+    eig_val = pt.exp(alpha * dt).type(dtype)
+    phi = Q.type(dtype) @ eig_vec
+
+    dynamics = b.type(dtype).unsqueeze(1) * pt.vander(eig_val, len(t_steps), increasing = True)
+    reconstruction, mse = reconstruct_dynamics(phi, dynamics, data_matrix, lazy)
+
+    return optimal_rank, eig_val, eig_vec, phi, dynamics, reconstruction, mse
@@ -0,0 +1,81 @@
+import torch as pt
+from numpy import pi
+
+COLUMNS = ("mode", "eig_val", "frequency", "growth_rate", "amplitude", "energy")
+
+def spectrum(eig_val, phi, dynamics, dt, sort_by="energy", descending=True, top_k=None, conjugates=True):
+    """
+    Function that computes the spectrum of DMD modes as a table, with every column computed for all modes at once.
+
+    Parameters:
+        eig_val (torch.Tensor): Eigenvalues of the reduced operator.
+        phi (torch.Tensor): Tensor containing DMD modes.
+        dynamics (torch.Tensor): Time dynamics, one row per mode.
+        dt (float): Time interval between adjacent snapshots.
+        sort_by (str, optional): Column by which rows are sorted, or None to keep the order of modes.
+        descending (bool, optional): If True, rows are sorted in descending order.
+        top_k (int, optional): Number of rows kept after sorting, all of them if None.
+        conjugates (bool, optional): If False, only the mode with non-negative frequency of each conjugate pair is kept
+            and its energy accounts for both. Meaningful for real data, whose modes come in conjugate pairs.
+
+    Returns:
+        table (dict): Columns of the table, one entry per mode: "mode" (index), "eig_val", "frequency" (Hz),
+            "growth_rate" (1/s), "amplitude" (magnitude at the first time step) and "energy" (summed over all time steps).
+
+    Raises:
+        ValueError: If `sort_by` is not one of the columns.
+
+    """
+    if sort_by is not None and sort_by not in COLUMNS:
+        raise ValueError(f"Unknown column '{sort_by}', choose among {', '.join(COLUMNS)}.")
+
+    log_eig_val = pt.log(eig_val)
+    energy = pt.linalg.vector_norm(phi, dim=0) ** 2 * (dynamics.abs() ** 2).sum(dim=1)
+
+    table = {
+        "mode": pt.arange(eig_val.size(0)),
+        "eig_val": eig_val,
+        "frequency": log_eig_val.imag / (2.0 * pi * dt),
+        "growth_rate": log_eig_val.real / dt,
+        "amplitude": dynamics[:, 0].abs(),
+        "energy": energy,
+    }
+
+    if not conjugates:
+        keep = eig_val.imag >= 0
+        table["energy"] = pt.where(eig_val.imag > 0, 2.0 * energy, energy)
+        table = {name: column[keep] for name, column in table.items()}
+
+    if sort_by is not None:
+        key = table[sort_by].abs() if sort_by == "eig_val" else table[sort_by]
+        order = pt.argsort(key, descending=descending, stable=True)
+        table = {name: column[order] for name, column in table.items()}
+
+    if top_k is not None:
+        table = {name: column[:top_k] for name, column in table.items()}
+
+    return table
+
+def format_spectrum(table, max_rows=10):
+    """
+    Function that formats a spectrum table as text, e.g. for a single summary line in logs.
+
+    Parameters:
+        table (dict): Table returned by `spectrum`.
+        max_rows (int, optional): Maximum number of rows printed.
+
+    Returns:
+        text (str): Header and one line per row.
+
+    """
+    n_rows = table["mode"].size(0)
+    lines = [f"{'mode':>5} {'frequency [Hz]':>15} {'growth rate [1/s]':>18} {'amplitude':>12} {'energy':>12}"]
+
+    columns = [table[name][:max_rows].tolist() for name in ("mode", "frequency", "growth_rate", "amplitude", "energy")]
+    for mode, frequency, growth_rate, amplitude, energy in zip(*columns):
+        lines.append(f"{mode:>5} {frequency:>15.3f} {growth_rate:>18.3e} {amplitude:>12.3e} {energy:>12.3e}")
+
+    if n_rows > max_rows:
+        lines.append(f"... {n_rows - max_rows} more modes")
+
+    return "\n".join(lines)
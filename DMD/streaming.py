@@ -0,0 +1,168 @@
+import torch as pt
+from numpy import pi
+from DMD.functions import find_optimal_rank
+from DMD.config import SVD_THRESHOLD, STREAMING_MAX_RANK, STREAMING_BASIS_THRESHOLD
+
+class StreamingDMD:
+    def __init__(self, dt, thr=SVD_THRESHOLD, max_rank=STREAMING_MAX_RANK, basis_thr=STREAMING_BASIS_THRESHOLD, tol=1.0e-10, dtype=pt.float64):
+        """
+        Class for computing DMD incrementally, while new snapshots arrive.
+
+        Snapshots are projected onto an orthonormal basis U that grows with new directions and is compressed when
+        it exceeds `max_rank` columns. Only two small matrices are accumulated in the basis coordinates:
+        Gx = sum(x x^H) and Gyx = sum(y x^H), for each pair of consecutive snapshots (x, y).
+        The eigenvectors of Gx are the left singular vectors of X and its eigenvalues the squared singular values,
+        so the reduced operator of exact DMD is At = Ur^H Gyx Ur diag(1 / sr^2).
+        Each update costs O(m * k + k^3), with m points and k <= max_rank + 1, independently of the number of snapshots.
+
+        Parameters:
+            dt (float): Time interval between adjacent snapshots.
+            thr (float, optional): Percentage of singular values contribution kept by the reduced operator, see `find_optimal_rank`.
+            max_rank (int, optional): Maximum number of basis vectors kept between updates.
+            basis_thr (float, optional): Percentage of singular values contribution kept when the basis is compressed.
+            tol (float, optional): Relative norm below which the part of a snapshot orthogonal to the basis is neglected.
+            dtype (torch.dtype, optional): Type of the basis and of the accumulated matrices.
+
+        Methods:
+            update(snapshots): Adds one snapshot or a batch of snapshots (as columns).
+            eigvals(): Returns the current eigenvalues of the reduced operator.
+            frequencies(): Returns the current frequencies of the modes in Hz.
+            modes(): Returns the current DMD modes.
+
+        """
+        self.dt = dt
+        self.thr = thr
+        self.max_rank = max_rank
+        self.basis_thr = basis_thr
+        self.tol = tol
+        self.dtype = dtype
+
+        self.U = None
+        self.Gx = None
+        self.Gyx = None
+        self.n_snapshots = 0
+        self._last = None
+        self._eig = None
+
+    def _expand_basis(self, y):
+        # Gram-Schmidt is repeated twice to keep the basis orthonormal in finite precision
+        e = y - self.U @ (self.U.conj().T @ y)
+        e = e - self.U @ (self.U.conj().T @ e)
+        e_norm = pt.linalg.vector_norm(e)
+
+        if e_norm > self.tol * pt.linalg.vector_norm(y):
+            self.U = pt.cat([self.U, (e / e_norm).unsqueeze(1)], dim=1)
+            self.Gx = pt.nn.functional.pad(self.Gx, (0, 1, 0, 1))
+            self.Gyx = pt.nn.functional.pad(self.Gyx, (0, 1, 0, 1))
+
+    def _svd(self):
+        # Gx is Hermitian and positive semi-definite, eigh returns eigenvalues in ascending order
+        sigma_sq, W = pt.linalg.eigh(self.Gx)
+        sigma = sigma_sq.flip(0).clamp(min=0).sqrt()
+        return sigma, W.flip(1)
+
+    def _compress(self):
+        sigma, W = self._svd()
+        keep = min(find_optimal_rank(sigma, self.basis_thr) + 1, self.max_rank)
+        W = W[:, :keep]
+
+        self.U = self.U @ W
+        self.Gx = W.conj().T @ self.Gx @ W
+        self.Gyx = W.conj().T @ self.Gyx @ W
+
+    def update(self, snapshots):
+        """
+        Adds one snapshot or a batch of snapshots, in chronological order.
+
+        Parameters:
+            snapshots (torch.Tensor): Snapshot of shape (m,) or batch of snapshots of shape (m, b).
+
+        Returns:
+            self (StreamingDMD): The updated object, so that calls can be chained.
+
+        Raises:
+            ValueError: If the number of points differs from the one of previous snapshots.
+
+        """
+        snapshots = snapshots.to(self.dtype)
+        if snapshots.dim() == 1:
+            snapshots = snapshots.unsqueeze(1)
+
+        if self._last is not None and snapshots.size(0) != self._last.size(0):
+            raise ValueError("Snapshots must have the same number of points as the previous ones.")
+
+        for y in snapshots.T:
+            if self.U is None:
+                # The basis starts with the first non-zero snapshot, e.g. after an initial field at rest:
+                # pairs with a zero snapshot add nothing to Gx and Gyx
+                y_norm = pt.linalg.vector_norm(y)
+                if y_norm > 0:
+                    self.U = (y / y_norm).unsqueeze(1)
+                    self.Gx = pt.zeros(1, 1, dtype=self.dtype)
+                    self.Gyx = pt.zeros(1, 1, dtype=self.dtype)
+            else:
+                self._expand_basis(y)
+                x_tilde = self.U.conj().T @ self._last
+                y_tilde = self.U.conj().T @ y
+
+                self.Gx += pt.outer(x_tilde, x_tilde.conj())
+                self.Gyx += pt.outer(y_tilde, x_tilde.conj())
+
+                if self.U.size(1) > self.max_rank:
+                    self._compress()
+
+            self._last = y
+            self.n_snapshots += 1
+
+        self._eig = None
+        return self
+
+    def _eigendecomposition(self):
+        if self.n_snapshots < 2:
+            raise ValueError("At least two snapshots are needed to compute DMD.")
+
+        if self.U is None or not self.Gx.any():
+            raise ValueError("At least one non-zero snapshot followed by another one is needed to compute DMD.")
+
+        if self._eig is None:
+            sigma, W = self._svd()
+            rank = max(find_optimal_rank(sigma, self.thr), 1)
+
+            # Subscript "r" represents reduced quantities, as in run_DMD
+            Wr, sr = W[:, :rank], sigma[:rank]
+            At = (Wr.conj().T @ self.Gyx @ Wr) / (sr ** 2).to(self.dtype)    # Reduced linear operator
+            eig_val, eig_vec = pt.linalg.eig(At)
+
+            self._eig = (eig_val, (self.U @ Wr).type(eig_vec.dtype) @ eig_vec)
+
+        return self._eig
+
+    def eigvals(self):
+        """
+        Returns the current eigenvalues of the reduced operator.
+
+        Raises:
+            ValueError: If less than two snapshots have been added, or all of them but the last are zero.
+
+        """
+        return self._eigendecomposition()[0]
+
+    def frequencies(self):
+        """
+        Returns the current frequencies of the modes in Hz.
+
+        Raises:
+            ValueError: If less than two snapshots have been added, or all of them but the last are zero.
+
+        """
+        return pt.log(self.eigvals()).imag / (2.0 * pi * self.dt)
+
+    def modes(self):
+        """
+        Returns the current DMD modes, projected onto the basis of snapshots.
+
+        Raises:
+            ValueError: If less than two snapshots have been added, or all of them but the last are zero.
+
+        """
+        return self._eigendecomposition()[1]
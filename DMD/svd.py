@@ -0,0 +1,235 @@
+import time
+import logging
+import torch as pt
+from DMD.functions import find_optimal_rank
+from DMD.instrumentation import span
+from DMD.config import SVD_OVERSAMPLING, SVD_POWER_ITERATIONS, SVD_INITIAL_RANK
+
+logger = logging.getLogger(__name__)
+
+def exact_svd(X):
+    """
+    Function that computes the reduced SVD of a matrix through LAPACK.
+
+    Parameters:
+        X (torch.Tensor): Matrix to be decomposed.
+
+    Returns:
+        U (torch.Tensor): Left singular vectors.
+        s (torch.Tensor): Singular values, in descending order.
+        Vh (torch.Tensor): Conjugate transpose of the right singular vectors.
+
+    """
+    return pt.linalg.svd(X, full_matrices=False)
+
+def snapshots_svd(X):
+    """
+    Function that computes the SVD with the method of snapshots, namely through the eigendecomposition of the small Gram matrix X^H X.
+
+    Squaring the matrix squares its condition number as well, so singular values below roughly sqrt(eps) * s_max
+    lose accuracy; they are discarded if they vanish in the chosen precision.
+
+    Parameters:
+        X (torch.Tensor): Matrix to be decomposed, tall and skinny.
+
+    Returns:
+        U (torch.Tensor): Left singular vectors.
+        s (torch.Tensor): Singular values, in descending order.
+        Vh (torch.Tensor): Conjugate transpose of the right singular vectors.
+
+    """
+    eig_val, V = pt.linalg.eigh(X.conj().T @ X)
+
+    # eigh returns eigenvalues in ascending order
+    eig_val, V = eig_val.flip(0), V.flip(1)
+    s = eig_val.clamp(min=0).sqrt()
+
+    keep = s > s[0] * pt.finfo(s.dtype).eps * max(X.shape)
+    s, V = s[keep], V[:, keep]
+
+    U = (X @ V) / s.to(X.dtype)
+    return U, s, V.conj().T
+
+def randomized_svd(X, rank, oversampling=SVD_OVERSAMPLING, power_iterations=SVD_POWER_ITERATIONS, generator=None):
+    """
+    Function that computes a truncated SVD through random projections (Halko, Martinsson and Tropp).
+
+    Parameters:
+        X (torch.Tensor or HankelOperator): Matrix to be decomposed.
+        rank (int): Number of singular triplets to keep.
+        oversampling (int, optional): Additional random directions that improve accuracy of the kept triplets.
+        power_iterations (int, optional): Number of subspace iterations, useful when singular values decay slowly.
+        generator (torch.Generator, optional): Generator of the random test matrix.
+
+    Returns:
+        U (torch.Tensor): Left singular vectors.
+        s (torch.Tensor): Singular values, in descending order.
+        Vh (torch.Tensor): Conjugate transpose of the right singular vectors.
+
+    """
+    n_cols = min(rank + oversampling, min(X.shape))
+    omega = pt.randn(X.size(1), n_cols, dtype=X.dtype, generator=generator)
+
+    Q, _ = pt.linalg.qr(X @ omega)
+
+    # Orthonormalization at every step avoids that round-off wipes out the smallest directions
+    for _ in range(power_iterations):
+        Z, _ = pt.linalg.qr(X.mH @ Q)
+        Q, _ = pt.linalg.qr(X @ Z)
+
+    # Q^H @ X written as (X^H @ Q)^H, so that X can also be a linear operator, see DMD.hankel
+    Ub, s, Vh = pt.linalg.svd((X.mH @ Q).mH, full_matrices=False)
+    U = Q @ Ub
+
+    return U[:, :rank], s[:rank], Vh[:rank, :]
+
+def tail_bound(X_norm_sq, s, n_tail):
+    """
+    Function that bounds the sum of the singular values not computed by a truncated SVD.
+
+    Singular values not computed satisfy sum(s_i^2) = ||X||_F^2 - sum(s_k^2), so by Cauchy-Schwarz
+    their sum is at most sqrt(n_tail * residual energy).
+
+    Parameters:
+        X_norm_sq (torch.Tensor): Squared Frobenius norm of the decomposed matrix.
+        s (torch.Tensor): Singular values computed.
+        n_tail (int): Number of singular values not computed.
+
+    Returns:
+        bound (torch.Tensor): Upper bound of the sum of the singular values not computed.
+
+    """
+    residual = (X_norm_sq - (s ** 2).sum()).clamp(min=0)
+    return (n_tail * residual).sqrt()
+
+def adaptive_randomized_svd(X, thr, initial_rank=SVD_INITIAL_RANK, oversampling=SVD_OVERSAMPLING,
+                            power_iterations=SVD_POWER_ITERATIONS, generator=None):
+    """
+    Function that computes a randomized SVD, doubling its rank until the threshold criterion of `find_optimal_rank` is met.
+
+    The contribution of the singular values not computed is replaced by an upper bound obtained from the Frobenius norm of X,
+    so the returned optimal rank is never smaller than the one the exact SVD would give, up to the randomized approximation.
+
+    Parameters:
+        X (torch.Tensor): Matrix to be decomposed.
+        thr (float): Percentage of singular values contribution to keep.
+        initial_rank (int, optional): Rank of the first attempt.
+        oversampling (int, optional): See `randomized_svd`.
+        power_iterations (int, optional): See `randomized_svd`.
+        generator (torch.Generator, optional): See `randomized_svd`.
+
+    Returns:
+        U (torch.Tensor): Left singular vectors.
+        s (torch.Tensor): Singular values, in descending order.
+        Vh (torch.Tensor): Conjugate transpose of the right singular vectors.
+        optimal_rank (int): Optimal rank for the chosen threshold.
+
+    """
+    full_rank = min(X.shape)
+    X_norm_sq = pt.linalg.matrix_norm(X) ** 2
+    rank = min(initial_rank, full_rank)
+
+    while rank < full_rank:
+        U, s, Vh = randomized_svd(X, rank, oversampling, power_iterations, generator)
+        tail = tail_bound(X_norm_sq, s, full_rank - rank)
+        optimal_rank = find_optimal_rank(pt.cat([s, tail.reshape(1).to(s.dtype)]), thr)
+
+        if optimal_rank < rank:
+            logger.info(f"Randomized SVD reached the {thr}% threshold with {rank} singular values")
+            return U, s, Vh, optimal_rank
+
+        rank *= 2
+
+    # Threshold not reached before the full rank, the exact decomposition is cheaper at this point
+    U, s, Vh = exact_svd(X)
+    return U, s, Vh, find_optimal_rank(s, thr)
+
+def compute_svd(X, thr, method="exact", **kwargs):
+    """
+    Function that computes the SVD of a matrix with the chosen engine, together with the optimal rank for truncation.
+
+    Parameters:
+        X (torch.Tensor): Matrix to be decomposed.
+        thr (float): Percentage of singular values contribution to keep, see `find_optimal_rank`.
+        method (str, optional): "exact", "randomized" or "snapshots".
+        **kwargs: Additional arguments of `adaptive_randomized_svd`.
+
+    Returns:
+        U (torch.Tensor): Left singular vectors.
+        s (torch.Tensor): Singular values, in descending order.
+        Vh (torch.Tensor): Conjugate transpose of the right singular vectors.
+        optimal_rank (int): Optimal rank for the chosen threshold.
+
+    Raises:
+        ValueError: If `method` is not one of the available ones.
+
+    """
+    if method == "exact":
+        U, s, Vh = exact_svd(X)
+
+    elif method == "snapshots":
+        U, s, Vh = snapshots_svd(X)
+
+    elif method == "randomized":
+        # Settings of DMD.config read when called, unless given, so that values set after import are used
+        options = {"initial_rank": SVD_INITIAL_RANK, "oversampling": SVD_OVERSAMPLING, "power_iterations": SVD_POWER_ITERATIONS}
+        return adaptive_randomized_svd(X, thr, **{**options, **kwargs})
+
+    else:
+        raise ValueError(f"Unknown SVD method '{method}', choose among 'exact', 'randomized' and 'snapshots'.")
+
+    with span("rank_selection", s=s):
+        optimal_rank = find_optimal_rank(s, thr)
+
+    return U, s, Vh, optimal_rank
+
+def compare_with_exact(X, thr, method, **kwargs):
+    """
+    Function that compares an SVD engine with the exact SVD, both for runtime and accuracy.
+
+    Parameters:
+        X (torch.Tensor): Matrix to be decomposed.
+        thr (float): Percentage of singular values contribution to keep.
+        method (str): Engine to be compared, see `compute_svd`.
+        **kwargs: Additional arguments of `compute_svd`.
+
+    Returns:
+        report (dict): Runtimes, speedup, optimal ranks, maximum relative error on the kept singular values,
+            distance between the kept left singular subspaces and relative error of the truncated reconstructions.
+
+    """
+    start = time.perf_counter()
+    U_e, s_e, Vh_e, rank_e = compute_svd(X, thr, "exact")
+    time_exact = time.perf_counter() - start
+
+    start = time.perf_counter()
+    U_m, s_m, Vh_m, rank_m = compute_svd(X, thr, method, **kwargs)
+    time_method = time.perf_counter() - start
+
+    r = min(rank_e, rank_m)
+    X_norm = pt.linalg.matrix_norm(X)
+
+    def truncation_error(U, s, Vh, rank):
+        return (pt.linalg.matrix_norm(X - (U[:, :rank] * s[:rank].to(X.dtype)) @ Vh[:rank, :]) / X_norm).item()
+
+    # Distance between subspaces: norm of the part of exact U_r not captured by U_r of the engine
+    U_er, U_mr = U_e[:, :r], U_m[:, :r]
+    subspace_error = pt.linalg.matrix_norm(U_er - U_mr @ (U_mr.conj().T @ U_er), ord=2).item() if r > 0 else 0.0
+
+    report = {
+        "method": method,
+        "time_exact": time_exact,
+        "time_method": time_method,
+        "speedup": time_exact / time_method,
+        "rank_exact": rank_e,
+        "rank_method": rank_m,
+        "singular_values_error": ((s_m[:r] - s_e[:r]).abs().max() / s_e[0]).item() if r > 0 else 0.0,
+        "subspace_error": subspace_error,
+        "truncation_error_exact": truncation_error(U_e, s_e, Vh_e, rank_e),
+        "truncation_error_method": truncation_error(U_m, s_m, Vh_m, rank_m),
+    }
+
+    logger.info(f"SVD '{method}': {report['speedup']:.2f}x speedup over exact SVD, "
+                f"singular values error {report['singular_values_error']:.2e}, subspace error {report['subspace_error']:.2e}")
+
+    return report
@@ -0,0 +1,174 @@
+import logging
+import torch as pt
+from numpy import pi
+from concurrent.futures import ThreadPoolExecutor
+from DMD.svd import compute_svd, tail_bound, exact_svd, snapshots_svd, randomized_svd
+from DMD.functions import find_optimal_rank
+from DMD.amplitudes import projected_amplitudes
+from DMD.instrumentation import span
+from DMD.precision import get_policy
+from DMD.execution import with_execution_settings
+from DMD.config import SVD_METHOD, SVD_OVERSAMPLING, SVD_POWER_ITERATIONS, AMPLITUDE_METHOD, SWEEP_WORKERS, DTYPE_POLICY
+
+logger = logging.getLogger(__name__)
+
+def _candidate_ranks(s, spectrum, thresholds, ranks):
+    # Candidates keyed by rank, so that thresholds leading to the same rank share one evaluation;
+    # thresholds are evaluated on the spectrum, which bounds the singular values a truncated SVD didn't compute
+    candidates = []
+    for thr in thresholds or []:
+        candidates.append((thr, find_optimal_rank(spectrum, thr)))
+    for rank in ranks or []:
+        candidates.append((None, rank))
+
+    for thr, rank in candidates:
+        if rank < 1 or rank > s.size(0):
+            source = f"Threshold {thr}" if thr is not None else f"Rank {rank}"
+            raise ValueError(f"{source} leads to rank {rank}, which must be between 1 and {s.size(0)}.")
+
+    return candidates
+
+def _rank_svd(X, rank):
+    # Explicit ranks need no threshold-based rank selection, only as many singular triplets as the largest of them
+    if SVD_METHOD == "randomized" and rank < min(X.shape):
+        return randomized_svd(X, rank, SVD_OVERSAMPLING, SVD_POWER_ITERATIONS)
+
+    return snapshots_svd(X) if SVD_METHOD == "snapshots" else exact_svd(X)
+
+def _amplitudes(method, A, EG, sr, Vr, eig_val, eig_vec, vander_matrix):
+    # Amplitudes of `compute_amplitudes` written with A = phi^H phi and EG = phi^H X, so that phi is never built
+    if method == "pinv":
+        return pt.linalg.pinv(A) @ EG[:, 0]    # pinv(phi) = pinv(phi^H phi) phi^H
+
+    elif method == "projected":
+        return projected_amplitudes(sr, Vr, eig_val, eig_vec).to(pt.complex128)
+
+    P = A * (vander_matrix @ vander_matrix.conj().T).conj()
+    q = (vander_matrix * EG.conj()).sum(dim=1).conj()
+    return pt.linalg.solve(P, q)
+
+def _evaluate(r, M, G, BB, sr, Vr, x_norms, n_points, n_times, dt, real, policy):
+    eig_val, eig_vec = pt.linalg.eig(policy.to_eig(M[:r, :r]))    # Leading block: the operator truncated at rank r
+
+    # phi = B[:, :r] @ E, so that only the small Gram matrices of B are needed
+    E = eig_vec.to(pt.complex128)
+    A = E.conj().T @ BB[:r, :r] @ E
+    EG = E.conj().T @ G[:r]
+    vander_matrix = pt.vander(eig_val.to(pt.complex128), n_times, increasing=True)
+
+    b = _amplitudes(AMPLITUDE_METHOD, A, EG, sr[:r], Vr[:r], eig_val, eig_vec, vander_matrix)
+    D = b.unsqueeze(1) * vander_matrix
+
+    # ||x_t - phi d_t||^2 = ||x_t||^2 - 2 Re(d_t^H phi^H x_t) + d_t^H phi^H phi d_t
+    cross = (D.conj() * EG).sum(dim=0).real
+    quadratic = (D.conj() * (A @ D)).sum(dim=0).real
+
+    if real:
+        # Only the real part of the reconstruction is compared with real data: ||Re(y)||^2 = (||y||^2 + Re(y^T y)) / 2
+        quadratic = (quadratic + (D * ((E.T @ BB[:r, :r] @ E) @ D)).sum(dim=0).real) / 2
+
+    mse = (x_norms - 2 * cross + quadratic).clamp(min=0) / n_points
+
+    return {
+        "optimal_rank": r,
+        "eig_val": eig_val,
+        "frequencies": pt.log(eig_val).imag / (2.0 * pi * dt),
+        "amplitudes": b.to(eig_vec.dtype),
+        "mse": mse,
+    }
+
+@with_execution_settings
+def sweep_DMD(data, thresholds=None, ranks=None, workers=SWEEP_WORKERS, policy=DTYPE_POLICY):
+    """
+    Function that evaluates DMD for many thresholds or ranks together, computing the SVD of data once.
+
+    The reduced operator of rank r is the leading r x r block of M = U_R^H X' V_R S_R^-1, with R the largest rank,
+    so M is computed once for all candidates. Reconstruction errors come from the Gram matrices of B = X' V_R S_R^-1
+    with itself and with data, so every candidate costs O(R^2 * number of time steps) operations, independently of
+    the number of points, and the whole sweep costs little more than a single `run_DMD`.
+
+    Amplitudes follow AMPLITUDE_METHOD of DMD.config as in `run_DMD`, written in terms of the same Gram matrices,
+    so with the exact SVD engine candidates match `run_DMD`. With the randomized engine, thresholds are evaluated with
+    the same bound of the singular values not computed as in `adaptive_randomized_svd`, so ranks are never smaller than
+    those of the exact SVD. Errors come from a difference of squared norms, so they are accurate down to about the
+    precision of the compute type relative to the energy of data.
+
+    Parameters:
+        data (tuple): (mask, t_steps, dt, data_matrix) as returned by `process_data`.
+        thresholds (list, optional): Percentages of singular values contribution, see `find_optimal_rank`.
+        ranks (list, optional): Ranks at which the SVD is truncated.
+        workers (int, optional): Number of threads evaluating candidates, one after the other if None.
+        policy (str or DtypePolicy, optional): Precision of each stage, see `DMD.precision`.
+
+    Returns:
+        results (list): One dict per candidate, thresholds first, with "threshold" (None for ranks), "optimal_rank",
+            "eig_val", "frequencies" (Hz), "amplitudes" and "mse" (Mean Squared Error of each time step).
+
+    Raises:
+        ValueError: If neither thresholds nor ranks are given.
+        ValueError: If AMPLITUDE_METHOD is not one of the available ones.
+        ValueError: If a candidate leads to a rank that is not positive or exceeds the rank of data.
+
+    """
+    if not thresholds and not ranks:
+        raise ValueError("At least one threshold or rank must be given.")
+
+    if AMPLITUDE_METHOD not in ("pinv", "projected", "optimal"):
+        raise ValueError(f"Unknown amplitude method '{AMPLITUDE_METHOD}', choose among 'pinv', 'projected' and 'optimal'.")
+
+    _, t_steps, dt, data_matrix = data
+
+    policy = get_policy(policy)
+    data_matrix = policy.to_compute(data_matrix)
+    n_points, n_times = data_matrix.shape
+
+    with span("svd", X=data_matrix[:, :-1], method=SVD_METHOD):
+        if thresholds:
+            U, s, Vh, _ = compute_svd(data_matrix[:, :-1], max(thresholds), SVD_METHOD)
+
+        # Explicit ranks may need more singular values than any threshold
+        if ranks and (not thresholds or s.size(0) < max(ranks)):
+            U, s, Vh = _rank_svd(data_matrix[:, :-1], max(ranks))
+
+    # As in `adaptive_randomized_svd`, singular values not computed by the randomized engine count through an upper
+    # bound of their sum, otherwise thresholds would be reached with fewer singular values than in `run_DMD`
+    spectrum = s
+    full_rank = min(data_matrix[:, :-1].shape)
+    if s.size(0) < full_rank:
+        X_norm_sq = pt.linalg.matrix_norm(data_matrix[:, :-1]) ** 2
+        spectrum = pt.cat([s, tail_bound(X_norm_sq, s, full_rank - s.size(0)).reshape(1).to(s.dtype)])
+
+    candidates = _candidate_ranks(s, spectrum, thresholds, ranks)
+    R = max(rank for _, rank in candidates)
+
+    with span("operator", rank=R):
+        Ur = U[:, :R].to(data_matrix.dtype)
+        sr = s[:R].to(data_matrix.dtype)
+        Vr = Vh[:R, :].to(data_matrix.dtype)
+
+        B = data_matrix[:, 1:] @ Vr.conj().T / sr
+        M = Ur.conj().T @ B
+
+        # Small matrices in double precision, where the errors of all candidates are computed
+        G = (B.conj().T @ data_matrix).to(pt.complex128)
+        BB = (B.conj().T @ B).to(pt.complex128)
+        x_norms = pt.linalg.vector_norm(data_matrix, dim=0).to(pt.float64) ** 2
+
+    def evaluate(r):
+        return _evaluate(r, M, G, BB, sr, Vr, x_norms, n_points, n_times, dt, not data_matrix.is_complex(), policy)
+
+    distinct = sorted({rank for _, rank in candidates})
+    with span("candidates", n_candidates=len(distinct)):
+        if workers is None or workers == 1:
+            evaluated = dict(zip(distinct, map(evaluate, distinct)))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                evaluated = dict(zip(distinct, pool.map(evaluate, distinct)))
+
+    results = [{"threshold": thr, **evaluated[rank]} for thr, rank in candidates]
+
+    for result in results:
+        source = f"threshold {result['threshold']}" if result["threshold"] is not None else "fixed rank"
+        logger.info(f"Rank {result['optimal_rank']:>4} ({source}): mean MSE {result['mse'].mean().item():.3e}")
+
+    return results
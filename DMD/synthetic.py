@@ -0,0 +1,154 @@
+import math
+import torch as pt
+from numpy import pi
+
+def grid_points(n_points, lower=(0.0, -1.0), upper=(1.0, 1.0)):
+    """
+    Function that builds a regular 2D grid with approximately the requested number of points.
+
+    Parameters:
+        n_points (int): Approximate number of points.
+        lower (tuple, optional): Lower corner of the grid.
+        upper (tuple, optional): Upper corner of the grid.
+
+    Returns:
+        pts (torch.FloatTensor): Points of the grid, of shape (number of points, 2).
+
+    """
+    aspect = (upper[0] - lower[0]) / (upper[1] - lower[1])
+    n_y = max(2, round((n_points / aspect) ** 0.5))
+    n_x = max(2, round(n_points / n_y))
+
+    x, y = pt.meshgrid(pt.linspace(lower[0], upper[0], n_x), pt.linspace(lower[1], upper[1], n_y), indexing="ij")
+    return pt.stack([x.flatten(), y.flatten()], dim=1)
+
+def travelling_waves(pts, times, rank, noise=0.0, seed=0):
+    """
+    Function that builds snapshots of travelling waves, each of them contributing with rank 2.
+
+    Parameters:
+        pts (torch.FloatTensor): Points of the grid.
+        times (torch.Tensor): Times of the snapshots.
+        rank (int): Rank of data, the number of waves is rank // 2.
+        noise (float, optional): Standard deviation of the added Gaussian noise.
+        seed (int, optional): Seed of random wave parameters and noise.
+
+    Returns:
+        data_matrix (torch.FloatTensor): Matrix of data, one row per point and one column per time step.
+
+    """
+    generator = pt.Generator().manual_seed(seed)
+    x, y, t = pts[:, :1], pts[:, 1:2], times.unsqueeze(0)
+    data_matrix = pt.zeros(pts.size(0), times.size(0))
+
+    for k in range(max(1, rank // 2)):
+        wave_number = 1.0 + k + pt.rand(1, generator=generator).item()
+        frequency = 0.5 + 0.7 * k + 0.1 * pt.rand(1, generator=generator).item()
+        angle = pi * pt.rand(1, generator=generator).item()
+        amplitude = 0.8 ** k
+
+        direction = x * math.cos(angle) + y * math.sin(angle)
+        data_matrix += amplitude * pt.sin(2 * pi * (wave_number * direction - frequency * t))
+
+    return data_matrix + noise * pt.randn(data_matrix.shape, generator=generator)
+
+def vortex_shedding(pts, times, rank, frequency=1.0, noise=0.0, seed=0):
+    """
+    Function that builds snapshots resembling the vorticity of a von Karman vortex street behind a cylinder.
+    Harmonics of the shedding frequency are advected downstream, odd ones antisymmetric and even ones symmetric in y.
+
+    Parameters:
+        pts (torch.FloatTensor): Points of the grid.
+        times (torch.Tensor): Times of the snapshots.
+        rank (int): Rank of data, the number of harmonics is rank // 2.
+        frequency (float, optional): Shedding frequency.
+        noise (float, optional): Standard deviation of the added Gaussian noise.
+        seed (int, optional): Seed of noise.
+
+    Returns:
+        data_matrix (torch.FloatTensor): Matrix of data, one row per point and one column per time step.
+
+    """
+    generator = pt.Generator().manual_seed(seed)
+    x, y, t = pts[:, :1], pts[:, 1:2], times.unsqueeze(0)
+    data_matrix = pt.zeros(pts.size(0), times.size(0))
+
+    wavelength = 0.4
+    for k in range(1, max(1, rank // 2) + 1):
+        envelope = pt.exp(-(y / (0.2 + 0.05 * k)) ** 2) * (1.0 - pt.exp(-4.0 * x))
+        symmetry = pt.tanh(y / 0.05) if k % 2 == 1 else 1.0
+        data_matrix += (0.6 ** (k - 1)) * envelope * symmetry * pt.sin(2 * pi * k * (x / wavelength - frequency * t))
+
+    return data_matrix + noise * pt.randn(data_matrix.shape, generator=generator)
+
+# Waves of the small 1D test case, as (amplitude, wave number, frequency, phase)
+TWO_WAVES = ((1.0, 1.0, 0.5, 0.0), (0.5, 3.0, -0.9, pi / 2))
+
+def wave_superposition(n_points, times, waves=TWO_WAVES):
+    """
+    Function that builds snapshots of 1D travelling waves on equally spaced points in [0, 1], each of them contributing with rank 2.
+
+    Parameters:
+        n_points (int): Number of points.
+        times (torch.Tensor): Times of the snapshots, their dtype is used for data.
+        waves (tuple, optional): Waves as (amplitude, wave number, frequency, phase), the frequency can also be a tensor with one value per time.
+
+    Returns:
+        data_matrix (torch.Tensor): Matrix of data, one row per point and one column per time step.
+
+    """
+    x, t = pt.linspace(0, 1, n_points, dtype=times.dtype).unsqueeze(1), times.unsqueeze(0)
+    return sum(amplitude * pt.sin(2 * pi * (wave_number * x - frequency * t) + phase) for amplitude, wave_number, frequency, phase in waves)
+
+GENERATORS = {
+    "travelling_waves": travelling_waves,
+    "vortex_shedding": vortex_shedding,
+}
+
+class SyntheticLoader:
+    def __init__(self, generator="vortex_shedding", n_points=10000, n_times=200, rank=10, dt=0.025, noise=0.0, seed=0):
+        """
+        Class that mimics FOAMDataloader with synthetic snapshots, so that the pipeline runs without any dataset.
+
+        The field is stored as z-component of a vector field, as vorticity in the flowtorch datasets.
+
+        Parameters:
+            generator (str, optional): "travelling_waves" or "vortex_shedding".
+            n_points (int, optional): Approximate number of grid points.
+            n_times (int, optional): Number of snapshots.
+            rank (int, optional): Rank of data.
+            dt (float, optional): Time interval between adjacent snapshots.
+            noise (float, optional): Standard deviation of the added Gaussian noise.
+            seed (int, optional): Seed of random quantities.
+
+        Raises:
+            ValueError: If `generator` is not one of the available ones.
+
+        """
+        if generator not in GENERATORS:
+            raise ValueError(f"Unknown generator '{generator}', choose among {', '.join(GENERATORS)}.")
+
+        pts = grid_points(n_points)
+        times = pt.arange(n_times, dtype=pt.float64) * dt
+
+        self.write_times = [str(round(float(t), 6)) for t in times]
+        self.vertices = pt.cat([pts, pt.zeros(pts.size(0), 1)], dim=1)
+        self.field_names = {t: ["vorticity"] for t in self.write_times}
+        self.data_matrix = GENERATORS[generator](pts, times.float(), rank, noise=noise, seed=seed)
+        self._columns = {t: i for i, t in enumerate(self.write_times)}
+
+    def load_snapshot(self, field_name, time):
+        """
+        Returns the snapshot of the given time step, with zero x- and y-components.
+
+        Parameters:
+            field_name (str): Name of the field, only "vorticity" is available.
+            time (str): Time step.
+
+        Returns:
+            snapshot (torch.FloatTensor): Tensor of shape (number of points, 3).
+
+        """
+        snapshot = pt.zeros(self.data_matrix.size(0), 3)
+        snapshot[:, 2] = self.data_matrix[:, self._columns[time]]
+        return snapshot
@@ -0,0 +1,134 @@
+import math
+import torch as pt
+from numpy import pi
+from DMD.functions import find_optimal_rank
+from DMD.instrumentation import span
+from DMD.config import SVD_THRESHOLD, WINDOW_LENGTH, WINDOW_STRIDE
+
+def banded_gram(data_matrix, width, dtype=pt.float64):
+    """
+    Function that computes the inner products between every pair of snapshots less than `width` time steps apart.
+
+    Every window of `width` snapshots finds its whole Gram matrix in the band, so overlapping windows share
+    the only computation proportional to the number of points. Products are computed through matrix multiplications
+    over blocks of `width` columns, each against the following 2 * width - 1 columns.
+
+    Parameters:
+        data_matrix (torch.Tensor): Matrix of data, one row per point and one column per time step.
+        width (int): Width of the band.
+        dtype (torch.dtype, optional): Real type of the products, double precision by default since the Gram matrix squares condition numbers.
+
+    Returns:
+        band (torch.Tensor): Tensor of shape (width, number of time steps), band[d, i] = x_i^H x_(i + d), zero where i + d is out of range.
+
+    """
+    if data_matrix.is_complex():
+        dtype = pt.promote_types(dtype, pt.complex64)
+
+    n_times = data_matrix.size(1)
+    band = pt.zeros(width, n_times, dtype=dtype)
+
+    for start in range(0, n_times, width):
+        stop = min(start + width, n_times)
+        end = min(stop + width - 1, n_times)
+
+        X = data_matrix[:, start:end].to(dtype)
+        G = X[:, :stop - start].conj().T @ X    # G[i, j] = x_(start + i)^H x_(start + j)
+
+        for d in range(min(width, end - start)):
+            diagonal = pt.diagonal(G, offset=d)
+            band[d, start:start + diagonal.size(0)] = diagonal
+
+    return band
+
+def window_gram(band, start, length):
+    """
+    Function that extracts the Gram matrix of a window of snapshots from the band computed by `banded_gram`.
+
+    Parameters:
+        band (torch.Tensor): Band of inner products.
+        start (int): Index of the first snapshot of the window.
+        length (int): Number of snapshots of the window, at most the width of the band.
+
+    Returns:
+        G (torch.Tensor): Gram matrix of the window, G[i, j] = x_(start + i)^H x_(start + j).
+
+    """
+    i = pt.arange(length).unsqueeze(1)
+    j = pt.arange(length).unsqueeze(0)
+
+    G = band[(j - i).abs(), start + pt.minimum(i, j)]
+    return pt.where(j >= i, G, G.conj())
+
+def _window_eigvals(G, thr, rank, n_points):
+    # Exact DMD through the method of snapshots: with X^H X = V S^2 V^H, the reduced operator
+    # Ur^H Y V S^-1 (Ur = X V S^-1) only needs the blocks X^H X and X^H Y of the window Gram matrix
+    XhX, XhY = G[:-1, :-1], G[:-1, 1:]
+
+    sigma_sq, V = pt.linalg.eigh(XhX)
+    sigma_sq, V = sigma_sq.flip(0), V.flip(1)
+    s = sigma_sq.clamp(min=0).sqrt()
+
+    keep = s > s[0] * pt.finfo(s.dtype).eps * max(n_points, G.size(0))
+    s, V = s[keep], V[:, keep]
+
+    r = min(rank if rank is not None else find_optimal_rank(s, thr), s.size(0))
+    Vr, s_inv = V[:, :r], (1.0 / s[:r]).to(V.dtype)
+
+    At = s_inv.unsqueeze(1) * (Vr.conj().T @ XhY @ Vr) * s_inv.unsqueeze(0)
+    return pt.linalg.eigvals(At)
+
+def run_windowed_DMD(data, window=WINDOW_LENGTH, stride=WINDOW_STRIDE, thr=SVD_THRESHOLD, rank=None):
+    """
+    Function that runs exact DMD on sliding windows of snapshots, to follow how frequencies drift over time.
+
+    The inner products of snapshots are computed once for all windows (see `banded_gram`), after which
+    each window costs O(window^3) operations, independently of the number of points.
+
+    Parameters:
+        data (tuple): (mask, t_steps, dt, data_matrix) as returned by `process_data`.
+        window (int, optional): Number of snapshots of each window.
+        stride (int, optional): Number of time steps between the first snapshots of consecutive windows.
+        thr (float, optional): Percentage of singular values contribution kept in each window, see `find_optimal_rank`.
+        rank (int, optional): Fixed number of modes of every window, instead of the one given by `thr`.
+
+    Returns:
+        times (torch.Tensor): Time of the first snapshot of each window.
+        eig_val (torch.Tensor): Eigenvalues of each window, one row per window, sorted by frequency and padded with NaN.
+        frequencies (torch.Tensor): Frequencies in Hz of the eigenvalues, with the same layout.
+
+    Raises:
+        ValueError: If `window` is smaller than 3 or larger than the number of time steps, or `stride` is not positive.
+
+    """
+    _, t_steps, dt, data_matrix = data
+    n_points, n_times = data_matrix.shape
+
+    if window < 3 or window > n_times:
+        raise ValueError("Window must contain at least 3 snapshots and no more than the available ones.")
+
+    if stride < 1:
+        raise ValueError("Stride must be positive.")
+
+    with span("banded_gram", data_matrix=data_matrix, window=window):
+        band = banded_gram(data_matrix, window)
+
+    starts = list(range(0, n_times - window + 1, stride))
+    windows = []
+
+    with span("windows", n_windows=len(starts)):
+        for start in starts:
+            windows.append(_window_eigvals(window_gram(band, start, window), thr, rank, n_points))
+
+    width = max([w.size(0) for w in windows] + [1])
+    eig_val = pt.full((len(starts), width), complex(math.nan, math.nan), dtype=pt.complex128)
+    frequencies = pt.full((len(starts), width), math.nan, dtype=pt.float64)
+
+    for k, w in enumerate(windows):
+        f = pt.log(w.to(pt.complex128)).imag / (2.0 * pi * dt)
+        order = pt.argsort(f)
+        eig_val[k, :w.size(0)] = w.to(pt.complex128)[order]
+        frequencies[k, :w.size(0)] = f[order]
+
+    times = pt.tensor([float(t_steps[start]) for start in starts], dtype=pt.float64)
+    return times, eig_val, frequencies
@@ -0,0 +1,176 @@
+"""
+Benchmark of the whole DMD pipeline on synthetic data, stage by stage.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_pipeline --points 20000 --snapshots 200 --rank 10 --output results.json
+    python -m benchmarks.bench_pipeline --compare old.json new.json
+
+"""
+import json
+import time
+import argparse
+import platform
+import subprocess
+import matplotlib
+matplotlib.use("Agg")
+
+import torch as pt
+import matplotlib.pyplot as plt
+import DMD.instrumentation as instrumentation
+from DMD.data_loader import load_data
+from DMD.data_processor import process_data
+from DMD.simulation import run_DMD
+from DMD.plotter import Plotter
+from DMD.instrumentation import PeakMemory
+from DMD.synthetic import SyntheticLoader, GENERATORS
+
+def _timed(stages, name, function, *args, **kwargs):
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+
+    _record(stages, name, elapsed, memory.peak)
+    return result
+
+def _record(stages, name, elapsed, peak_memory):
+    stages.setdefault(name, {"time": [], "peak_memory": []})
+    stages[name]["time"].append(elapsed)
+    stages[name]["peak_memory"].append(peak_memory)
+
+def _timed_run_DMD(stages, data):
+    # run_DMD itself is timed, its stages come from the records of DMD.instrumentation
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        result = _timed(stages, "run_DMD", run_DMD, data, lazy=False)
+    finally:
+        instrumentation.disable()
+
+    for record in instrumentation.records():
+        _record(stages, record["name"], record["wall_time"], record["peak_memory"])
+    instrumentation.reset()
+
+    return result
+
+def run_case(generator, n_points, n_times, rank, repeat=3, plot=True):
+    """
+    Function that runs the pipeline on synthetic data, timing each stage separately.
+    Stages of `run_DMD` (SVD, operator, eigendecomposition, modes, amplitudes, MSE, reconstruction) are those recorded
+    by DMD.instrumentation, so the pipeline measured is the one that ships.
+
+    Parameters:
+        generator (str): Synthetic data generator, see DMD.synthetic.
+        n_points (int): Approximate number of grid points.
+        n_times (int): Number of snapshots.
+        rank (int): Rank of data.
+        repeat (int, optional): Number of repetitions, the minimum time is reported.
+        plot (bool, optional): If True, Plotter rendering is timed as well.
+
+    Returns:
+        case (dict): Parameters of the case and, for each stage, minimum time in seconds and maximum peak memory in bytes.
+
+    """
+    loader = SyntheticLoader(generator, n_points, n_times, rank)
+    stages = {}
+
+    for _ in range(repeat):
+        _, pts, _ = _timed(stages, "load_data", load_data, loader)
+        mask, t_steps, dt, data_matrix = _timed(stages, "process_data", process_data, use_cache=False, lower=[-1.0, -1.0],
+                                                upper=[2.0, 1.0], min_time=0.0, loader=loader)
+
+        optimal_rank, _, _, phi, _, _, _ = _timed_run_DMD(stages, (mask, t_steps, dt, data_matrix))
+
+        if plot:
+            plotter = Plotter(pts, mask)
+            _timed(stages, "plotter", plotter.plot_DMD_modes, phi, [0])
+            plt.close("all")
+
+    return {
+        "generator": generator,
+        "points": data_matrix.size(0),
+        "snapshots": n_times,
+        "rank": rank,
+        "optimal_rank": optimal_rank,
+        "stages": {name: {"time": min(values["time"]), "peak_memory": max(values["peak_memory"])} for name, values in stages.items()},
+    }
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(old_path, new_path):
+    """
+    Function that compares two result files, printing the ratio new / old of time and peak memory of each stage.
+
+    Parameters:
+        old_path (str): Path of the reference results.
+        new_path (str): Path of the new results.
+
+    """
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    key = lambda case: (case["generator"], case["points"], case["snapshots"], case["rank"])
+    old_cases = {key(case): case for case in old["cases"]}
+
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    for case in new["cases"]:
+        if key(case) not in old_cases:
+            continue
+
+        print(f"{case['generator']}: {case['points']} points x {case['snapshots']} snapshots, rank {case['rank']}")
+        for name, stage in case["stages"].items():
+            reference = old_cases[key(case)]["stages"].get(name)
+            if reference:
+                time_ratio = stage["time"] / reference["time"] if reference["time"] else float("nan")
+                memory_ratio = stage["peak_memory"] / reference["peak_memory"] if reference["peak_memory"] else float("nan")
+                print(f"  {name:<20} time x{time_ratio:6.2f}   ({reference['time']:.4f}s -> {stage['time']:.4f}s)   "
+                      f"peak memory x{memory_ratio:6.2f}   ({reference['peak_memory'] / 2 ** 20:.1f} -> {stage['peak_memory'] / 2 ** 20:.1f} MiB)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark of the DMD pipeline on synthetic data.")
+    parser.add_argument("--generator", choices=list(GENERATORS), nargs="+", default=list(GENERATORS))
+    parser.add_argument("--points", type=int, nargs="+", default=[20000])
+    parser.add_argument("--snapshots", type=int, nargs="+", default=[200])
+    parser.add_argument("--rank", type=int, nargs="+", default=[10])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-plot", action="store_true", help="Skip Plotter rendering")
+    parser.add_argument("--output", help="Path of the JSON file with results")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two JSON files instead of running")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "torch": pt.__version__,
+        "threads": pt.get_num_threads(),
+        "cases": [],
+    }
+
+    for generator in args.generator:
+        for n_points in args.points:
+            for n_times in args.snapshots:
+                for rank in args.rank:
+                    case = run_case(generator, n_points, n_times, rank, args.repeat, not args.no_plot)
+                    results["cases"].append(case)
+
+                    print(f"{generator}: {case['points']} points x {n_times} snapshots, rank {rank}")
+                    for name, stage in case["stages"].items():
+                        print(f"  {name:<20} {stage['time']:.4f}s   peak {stage['peak_memory'] / 2 ** 20:8.1f} MiB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
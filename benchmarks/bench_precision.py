@@ -0,0 +1,129 @@
+"""
+Benchmark of accuracy and throughput of each dtype policy, see DMD.precision.
+
+Eigenvalues, modes and reconstruction error of every policy are compared with the "double" policy on the same synthetic data.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_precision --points 20000 --snapshots 200 --rank 10 --output precision.json
+
+"""
+import json
+import time
+import argparse
+import platform
+import torch as pt
+from DMD.data_processor import process_data
+from DMD.simulation import run_DMD
+from DMD.precision import POLICIES
+from DMD.instrumentation import PeakMemory
+from DMD.synthetic import SyntheticLoader, GENERATORS
+from benchmarks.bench_pipeline import _commit
+
+def _run(loader, policy, repeat):
+    kwargs = dict(use_cache=False, lower=[-1.0, -1.0], upper=[2.0, 1.0], min_time=0.0, loader=loader, policy=policy)
+    load_times, dmd_times, peaks = [], [], []
+
+    for _ in range(repeat):
+        with PeakMemory() as memory:
+            start = time.perf_counter()
+            data = process_data(**kwargs)
+            loaded = time.perf_counter()
+            result = run_DMD(data, policy=policy)
+            finished = time.perf_counter()
+
+        load_times.append(loaded - start)
+        dmd_times.append(finished - loaded)
+        peaks.append(memory.peak)
+
+    return data[3], result, min(load_times), min(dmd_times), max(peaks)
+
+def _eigenvalues_error(eig_val, reference):
+    # Each eigenvalue is matched with the nearest one of the reference
+    eig_val, reference = eig_val.to(pt.complex128), reference.to(pt.complex128)
+    return (eig_val.unsqueeze(1) - reference.unsqueeze(0)).abs().min(dim=1).values.max().item()
+
+def _modes_error(phi, reference):
+    # Norm of the reference modes outside the span of the compared ones
+    Q, _ = pt.linalg.qr(phi.to(pt.complex128))
+    reference = reference.to(pt.complex128)
+    return (pt.linalg.matrix_norm(reference - Q @ (Q.conj().T @ reference)) / pt.linalg.matrix_norm(reference)).item()
+
+def run_case(generator, n_points, n_times, rank, policies, repeat=3):
+    """
+    Function that runs loading and DMD with each policy, measuring throughput and accuracy with respect to the "double" policy.
+
+    Parameters:
+        generator (str): Synthetic data generator, see DMD.synthetic.
+        n_points (int): Approximate number of grid points.
+        n_times (int): Number of snapshots.
+        rank (int): Rank of data.
+        policies (list): Names of the policies, see DMD.precision.POLICIES.
+        repeat (int, optional): Number of repetitions, the minimum time is reported.
+
+    Returns:
+        case (dict): Parameters of the case and, for each policy, times, snapshots loaded per second, size of the data matrix,
+            peak memory, optimal rank and errors of eigenvalues, modes and mean MSE with respect to the "double" policy.
+
+    """
+    loader = SyntheticLoader(generator, n_points, n_times, rank)
+    _, reference, _, _, _ = _run(loader, "double", 1)
+
+    case = {"generator": generator, "points": loader.data_matrix.size(0), "snapshots": n_times, "rank": rank, "policies": {}}
+
+    for name in policies:
+        data_matrix, result, load_time, dmd_time, peak = _run(loader, name, repeat)
+        rank_p, eig_val, _, phi, _, _, mse = result
+        r = min(rank_p, reference[0])
+
+        case["policies"][name] = {
+            "load_time": load_time,
+            "dmd_time": dmd_time,
+            "snapshots_per_second": n_times / load_time,
+            "data_matrix_bytes": data_matrix.numel() * data_matrix.element_size(),
+            "peak_memory": peak,
+            "optimal_rank": rank_p,
+            "eigenvalues_error": _eigenvalues_error(eig_val, reference[1]),
+            "modes_error": _modes_error(phi[:, :r], reference[3][:, :r]) if r > 0 else 0.0,
+            "mse": mse.mean().item(),
+            "mse_reference": reference[6].mean().item(),
+        }
+
+    return case
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark of accuracy and throughput of dtype policies.")
+    parser.add_argument("--generator", choices=list(GENERATORS), default="vortex_shedding")
+    parser.add_argument("--points", type=int, nargs="+", default=[20000])
+    parser.add_argument("--snapshots", type=int, nargs="+", default=[200])
+    parser.add_argument("--rank", type=int, default=10)
+    parser.add_argument("--policy", choices=list(POLICIES), nargs="+", default=list(POLICIES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Path of the JSON file with results")
+    args = parser.parse_args(argv)
+
+    results = {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "torch": pt.__version__,
+        "threads": pt.get_num_threads(),
+        "cases": [],
+    }
+
+    for n_points in args.points:
+        for n_times in args.snapshots:
+            case = run_case(args.generator, n_points, n_times, args.rank, args.policy, args.repeat)
+            results["cases"].append(case)
+
+            print(f"{args.generator}: {case['points']} points x {n_times} snapshots, rank {args.rank}")
+            for name, policy in case["policies"].items():
+                print(f"  {name:<9} load {policy['load_time']:.4f}s ({policy['snapshots_per_second']:8.1f} snapshots/s)   "
+                      f"DMD {policy['dmd_time']:.4f}s   matrix {policy['data_matrix_bytes'] / 2 ** 20:8.1f} MiB   "
+                      f"eigenvalues error {policy['eigenvalues_error']:.2e}   modes error {policy['modes_error']:.2e}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
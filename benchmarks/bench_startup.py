@@ -0,0 +1,107 @@
+"""
+Benchmark of cold-start time: imports of the main modules and a whole headless run, each in a fresh interpreter.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_startup --repeat 5 --output startup.json
+
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+from DMD.synthetic import GENERATORS
+from benchmarks.bench_pipeline import _commit
+
+# Modules that must not be loaded by the imports of the pipeline, they are only needed by dataset loading and plots
+HEAVY_MODULES = ("flowtorch", "matplotlib")
+
+IMPORTS = ("DMD.functions", "DMD.data_processor", "DMD.simulation", "DMD.plotter", "DMD.cli")
+
+def _python(*args):
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, completed.stdout
+
+def _import_case(module, repeat):
+    check = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    times = []
+    for _ in range(repeat):
+        elapsed, stdout = _python("-c", check)
+        times.append(elapsed)
+
+    loaded = [name for name in stdout.strip().split(",") if name]
+    return {"name": f"import {module}", "min": min(times), "median": statistics.median(times), "heavy_modules": loaded}
+
+def _run_case(generator, n_points, n_times, rank, repeat):
+    times = []
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "results.pt")
+        arguments = ["--synthetic", generator, "--points", str(n_points), "--snapshots", str(n_times),
+                     "--rank", str(rank), "--output", output, "--log-level", "WARNING"]
+
+        # Same as `python -m DMD`, and heavy modules loaded by the whole run are reported, not only those of imports
+        run = f"import sys, DMD.cli; DMD.cli.main({arguments!r}); print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        for _ in range(repeat):
+            elapsed, stdout = _python("-c", run)
+            times.append(elapsed)
+
+    loaded = [name for name in stdout.strip().split(",") if name]
+    return {"name": f"python -m DMD --synthetic {generator}", "min": min(times), "median": statistics.median(times), "heavy_modules": loaded}
+
+def run_case(generator, n_points, n_times, rank, repeat=5):
+    """
+    Function that measures the wall time of each import and of a whole headless run, each of them in a fresh interpreter.
+
+    Parameters:
+        generator (str): Synthetic data generator of the headless run, see DMD.synthetic.
+        n_points (int): Approximate number of grid points.
+        n_times (int): Number of snapshots.
+        rank (int): Rank of data.
+        repeat (int, optional): Number of interpreters started for each measurement.
+
+    Returns:
+        cases (list): Name, minimum and median wall time in seconds of each measurement and, for imports and the
+            headless run, heavy modules loaded by them.
+
+    """
+    baseline = min(_python("-c", "pass")[0] for _ in range(repeat))
+    cases = [{"name": "python -c pass", "min": baseline, "median": baseline}]
+
+    cases += [_import_case(module, repeat) for module in IMPORTS]
+    cases.append(_run_case(generator, n_points, n_times, rank, repeat))
+
+    return cases
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark of cold-start time of imports and of the command-line entry point.")
+    parser.add_argument("--generator", choices=list(GENERATORS), default="vortex_shedding")
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--snapshots", type=int, default=50)
+    parser.add_argument("--rank", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Path of the JSON file with results")
+    args = parser.parse_args(argv)
+
+    results = {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cases": run_case(args.generator, args.points, args.snapshots, args.rank, args.repeat),
+    }
+
+    for case in results["cases"]:
+        heavy = f"   loads {', '.join(case['heavy_modules'])}" if case.get("heavy_modules") else ""
+        print(f"  {case['name']:<45} min {case['min']:.3f}s   median {case['median']:.3f}s{heavy}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
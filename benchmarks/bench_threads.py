@@ -0,0 +1,123 @@
+"""
+Benchmark of DMD throughput against the number of threads, for a single job and for several concurrent jobs.
+
+Every job runs `run_DMD` on the same synthetic data within its own process, limited through DMD.execution.ExecutionSettings;
+with --pin, concurrent jobs are pinned to disjoint sets of cores.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_threads --points 20000 --snapshots 200 --threads 1 2 4 8 --jobs 1 2 4 --output threads.json
+
+"""
+import os
+import json
+import time
+import logging
+import argparse
+import platform
+import torch as pt
+from concurrent.futures import ProcessPoolExecutor
+from DMD.simulation import run_DMD
+from DMD.execution import ExecutionSettings
+from DMD.synthetic import SyntheticLoader, GENERATORS
+from benchmarks.bench_pipeline import _commit
+
+def _data(generator, n_points, n_times, rank):
+    loader = SyntheticLoader(generator, n_points, n_times, rank)
+    return (None, loader.write_times, float(loader.write_times[1]) - float(loader.write_times[0]), loader.data_matrix)
+
+def _job(generator, n_points, n_times, rank, threads, cpus, repeat):
+    # Logs of run_DMD would dominate the time of small cases
+    logging.getLogger("DMD").setLevel(logging.WARNING)
+    data = _data(generator, n_points, n_times, rank)
+
+    with ExecutionSettings(threads=threads, blas_threads=threads, cpus=cpus):
+        run_DMD(data)    # Warm-up, not timed
+
+        start = time.time()
+        for _ in range(repeat):
+            run_DMD(data)
+        end = time.time()
+
+    return start, end
+
+def _cpus(job, threads, pin):
+    available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count()))
+    if not pin or (job + 1) * threads > len(available):
+        return None
+    return available[job * threads:(job + 1) * threads]
+
+def run_case(generator, n_points, n_times, rank, threads, jobs, repeat=3, pin=False):
+    """
+    Function that runs concurrent DMD jobs, each in its own process, and measures their overall throughput.
+
+    Parameters:
+        generator (str): Synthetic data generator, see DMD.synthetic.
+        n_points (int): Approximate number of grid points.
+        n_times (int): Number of snapshots.
+        rank (int): Rank of data.
+        threads (int): Intra-op and BLAS threads of each job.
+        jobs (int): Number of concurrent jobs.
+        repeat (int, optional): Number of DMD runs of each job.
+        pin (bool, optional): If True, jobs are pinned to disjoint cores, when there are enough of them.
+
+    Returns:
+        case (dict): Parameters of the case, wall time from the first start to the last end, and DMD runs per second.
+
+    """
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_job, generator, n_points, n_times, rank, threads, _cpus(job, threads, pin), repeat) for job in range(jobs)]
+        spans = [future.result() for future in futures]
+
+    wall = max(end for _, end in spans) - min(start for start, _ in spans)
+
+    return {
+        "generator": generator,
+        "points": n_points,
+        "snapshots": n_times,
+        "rank": rank,
+        "threads": threads,
+        "jobs": jobs,
+        "pinned": pin,
+        "wall_time": wall,
+        "runs_per_second": jobs * repeat / wall,
+    }
+
+def main(argv=None):
+    cores = os.cpu_count()
+
+    parser = argparse.ArgumentParser(description="Benchmark of DMD throughput against the number of threads.")
+    parser.add_argument("--generator", choices=list(GENERATORS), default="vortex_shedding")
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--snapshots", type=int, default=200)
+    parser.add_argument("--rank", type=int, default=10)
+    parser.add_argument("--threads", type=int, nargs="+", default=sorted({1, 2, 4, cores}))
+    parser.add_argument("--jobs", type=int, nargs="+", default=sorted({1, max(1, cores // 2), cores}))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--pin", action="store_true", help="Pin concurrent jobs to disjoint cores")
+    parser.add_argument("--output", help="Path of the JSON file with results")
+    args = parser.parse_args(argv)
+
+    results = {
+        "commit": _commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "torch": pt.__version__,
+        "cores": cores,
+        "cases": [],
+    }
+
+    print(f"{args.generator}: {args.points} points x {args.snapshots} snapshots, rank {args.rank}, {cores} cores")
+    for jobs in args.jobs:
+        for threads in args.threads:
+            case = run_case(args.generator, args.points, args.snapshots, args.rank, threads, jobs, args.repeat, args.pin)
+            results["cases"].append(case)
+
+            oversubscribed = " (oversubscribed)" if jobs * threads > cores else ""
+            print(f"  {jobs:>3} jobs x {threads:>3} threads   {case['runs_per_second']:8.2f} runs/s{oversubscribed}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import torch as pt
+import pytest
+import sys
+import os
+from DMD.amplitudes import compute_amplitudes, benchmark_amplitudes
+from DMD.synthetic import wave_superposition
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def dmd_quantities():
+    """
+    Fixture that computes DMD of two travelling waves, without truncation, and returns what amplitude strategies need.
+
+    """
+    data_matrix = wave_superposition(200, pt.arange(50, dtype=pt.float64) * 0.1)
+
+    U, s, Vh = pt.linalg.svd(data_matrix[:, :-1], full_matrices=False)
+    Ur, sr, Vr = U[:, :4], s[:4], Vh[:4, :]
+
+    At = Ur.T @ data_matrix[:, 1:] @ Vr.T / sr
+    eig_val, eig_vec = pt.linalg.eig(At)
+    phi = (data_matrix[:, 1:] @ Vr.T / sr).type(eig_vec.dtype) @ eig_vec
+
+    return phi, data_matrix, sr, Vr, eig_val, eig_vec
+
+@pytest.mark.parametrize("method", ["projected", "optimal"])
+def test_amplitudes_match_pinv(dmd_quantities, method):
+    """
+    Test that verifies every strategy gives the same amplitudes as the pseudo-inverse on data that DMD represents exactly.
+
+    """
+    b_pinv = compute_amplitudes("pinv", *dmd_quantities)
+    b = compute_amplitudes(method, *dmd_quantities)
+
+    assert pt.allclose(b, b_pinv, atol=1e-8), "Amplitudes are different from the expected"
+
+def test_benchmark_amplitudes(dmd_quantities):
+    """
+    Test that verifies the benchmark reports runtime, speedup and error of each strategy.
+
+    """
+    results = benchmark_amplitudes(*dmd_quantities)
+
+    assert set(results) == {"pinv", "projected", "optimal"}
+    assert all(result["time"] > 0 and result["speedup"] > 0 for result in results.values())
+    assert results["optimal"]["mse"] <= results["pinv"]["mse"] + 1e-12
+
+def test_amplitudes_invalid_method(dmd_quantities):
+    """
+    Test that verifies the correct raise of an error if an unknown strategy is chosen.
+
+    """
+    with pytest.raises(ValueError, match="Unknown amplitude method"):
+        compute_amplitudes("exact", *dmd_quantities)
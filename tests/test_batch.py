@@ -0,0 +1,69 @@
+import torch as pt
+import pytest
+import sys
+import os
+from numpy import pi
+import DMD.batch as batch
+from DMD.batch import CaseSpec, run_case, run_batch, load_results
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def synthetic_field():
+    """
+    Fixture that builds a travelling wave at 0.5 Hz on a regular grid, as returned by `load_field`.
+
+    """
+    x, y = pt.meshgrid(pt.linspace(0, 1, 30), pt.linspace(-1, 1, 10), indexing="ij")
+    pts = pt.stack([x.flatten(), y.flatten()], dim=1)
+    times = [str(round(0.1 * i, 1)) for i in range(40)]
+    t = pt.tensor([float(time) for time in times])
+
+    field_matrix = pt.sin(2 * pi * (pts[:, :1] - 0.5 * t)) * pt.exp(-pts[:, 1:] ** 2)
+    return pts, times, field_matrix
+
+def test_run_case(synthetic_field):
+    """
+    Test that verifies a case applies its mask and time window and recovers the frequency of data.
+
+    """
+    spec = CaseSpec("case", lower=[0.2, -0.5], upper=[0.8, 0.5], min_time=1.0, thr=99.9, keep_pairs=True)
+    result = run_case(spec, *synthetic_field)
+
+    assert result["mse"].size(0) == 30, "Time window was not applied"
+    assert result["spec"]["name"] == "case"
+    assert result["optimal_rank"] == 2, "Both waves of the conjugate pair must be kept"
+    assert (result["frequencies"].abs() - 0.5).abs().min() < 1e-3, "Frequency is different from the expected"
+
+    single = run_case(spec._replace(keep_pairs=False), *synthetic_field)
+    assert single["optimal_rank"] == 1, "Rank is not the one run_DMD selects by default"
+
+def test_run_batch_shares_loaded_field(synthetic_field, tmp_path, monkeypatch):
+    """
+    Test that verifies cases with the same dataset and field load snapshots once, and results are saved.
+
+    """
+    calls = []
+
+    def fake_load_field(dataset, field, min_time):
+        calls.append((dataset, field, min_time))
+        return synthetic_field
+
+    monkeypatch.setattr(batch, "load_field", fake_load_field)
+
+    specs = [CaseSpec("a", min_time=0.0), CaseSpec("b", min_time=2.0, thr=99.0), CaseSpec("c", field="p", min_time=1.0)]
+    path = str(tmp_path / "results.pt")
+    results = run_batch(specs, results_path=path, workers=2)
+
+    assert len(calls) == 2, "Snapshots were loaded more than once per dataset and field"
+    assert calls[0][2] == 0.0, "Minimum time of a group must be the smallest one of its cases"
+    assert set(results) == {"a", "b", "c"}
+    assert set(load_results(path)) == {"a", "b", "c"}
+
+def test_run_batch_duplicate_names():
+    """
+    Test that verifies the correct raise of an error if two cases have the same name.
+
+    """
+    with pytest.raises(ValueError, match="Case names must be unique."):
+        run_batch([CaseSpec("a"), CaseSpec("a")])
@@ -0,0 +1,89 @@
+import os
+import torch as pt
+import pytest
+import sys
+from DMD.cache import SnapshotCache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def dataset_dir(tmp_path):
+    """
+    Fixture that creates a minimal dataset folder with two time steps.
+
+    """
+    dataset = tmp_path / "dataset"
+    for t in ["0.5", "1"]:
+        (dataset / t).mkdir(parents=True)
+        (dataset / t / "vorticity").write_text(f"values at {t}")
+    return dataset
+
+@pytest.fixture
+def entry():
+    """
+    Fixture that provides the outputs of `process_data` for a small dataset.
+
+    """
+    mask = pt.tensor([True, False, True])
+    data_matrix = pt.rand(2, 4).type(pt.cfloat)
+    return mask, ["0.5", "1"], 0.5, data_matrix
+
+def test_cache_roundtrip(tmp_path, entry):
+    """
+    Test that verifies a stored entry is loaded back unchanged.
+
+    """
+    cache = SnapshotCache(tmp_path / "cache")
+    cache.store("abc", *entry)
+
+    mask, t_steps, dt, data_matrix = cache.load("abc")
+
+    assert pt.equal(mask, entry[0])
+    assert t_steps == entry[1] and dt == entry[2]
+    assert pt.equal(data_matrix, entry[3])
+    assert cache.load("missing") is None
+
+def test_cache_key_changes_with_sources(tmp_path, dataset_dir):
+    """
+    Test that verifies the key depends on processing parameters and on source files.
+
+    """
+    cache = SnapshotCache(tmp_path / "cache")
+    key = cache.key(dataset_dir, "vorticity", [0, 0], [1, 1], 0.0)
+
+    assert key == cache.key(dataset_dir, "vorticity", [0, 0], [1, 1], 0.0)
+    assert key != cache.key(dataset_dir, "vorticity", [0, 0], [1, 2], 0.0)
+
+    (dataset_dir / "1" / "p").write_text("pressure")
+    assert key == cache.key(dataset_dir, "vorticity", [0, 0], [1, 1], 0.0), "Key must depend only on the chosen field and the mesh"
+
+    os.utime(dataset_dir / "1" / "vorticity", ns=(0, 0))
+    assert key != cache.key(dataset_dir, "vorticity", [0, 0], [1, 1], 0.0), "Key must change when a source file is modified"
+
+    key = cache.key(dataset_dir, "vorticity", [0, 0], [1, 1], 0.0)
+    (dataset_dir / "constant" / "polyMesh").mkdir(parents=True)
+    (dataset_dir / "constant" / "polyMesh" / "points").write_text("points")
+    assert key != cache.key(dataset_dir, "vorticity", [0, 0], [1, 1], 0.0), "Key must change with the mesh"
+
+def test_cache_lru_eviction_and_invalidate(tmp_path, entry):
+    """
+    Test that verifies least recently used entries are evicted beyond the size cap, and that entries can be invalidated.
+
+    """
+    cache = SnapshotCache(tmp_path / "cache")
+    cache.store("first", *entry)
+    cache.max_bytes = int(cache.size() * 2.5)    # Room for two entries
+
+    cache.store("second", *entry)
+    os.utime(os.path.join(cache.directory, "second"), (0, 0))    # "second" becomes the least recently used
+    cache.load("first")
+    cache.store("third", *entry)
+
+    assert cache.load("second") is None, "Least recently used entry was not evicted"
+    assert cache.load("third") is not None
+
+    cache.invalidate("third")
+    assert cache.load("third") is None
+
+    cache.invalidate()
+    assert cache.size() == 0
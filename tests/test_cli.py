@@ -0,0 +1,105 @@
+import pytest
+import subprocess
+import sys
+import os
+import DMD.config as config
+import DMD.data_processor as data_processor
+import DMD.simulation as simulation
+from DMD.cli import parse_override, main
+from DMD.batch import load_results
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def test_parse_override():
+    """
+    Test that verifies overrides are read as Python literals, falling back to strings.
+
+    """
+    assert parse_override("SVD_THRESHOLD=99.9") == ("SVD_THRESHOLD", 99.9)
+    assert parse_override("MASK_LOWER_BOUND=[0.2, -0.5]") == ("MASK_LOWER_BOUND", [0.2, -0.5])
+    assert parse_override("DTYPE_POLICY=double") == ("DTYPE_POLICY", "double")
+
+@pytest.mark.parametrize("text", ["SVD_THRESHOLD", "UNKNOWN=1", "os=1", "PLOT_TRIANGULATIONS=2"])
+def test_parse_override_invalid(text):
+    """
+    Test that verifies overrides without a value, of unknown variables or of variables not passed to the pipeline are rejected.
+
+    """
+    with pytest.raises(ValueError):
+        parse_override(text)
+
+def test_main_synthetic(tmp_path):
+    """
+    Test that verifies a headless run on synthetic data saves its results, and overrides change the run and are restored.
+
+    """
+    path = str(tmp_path / "out" / "results.pt")
+    arguments = ["--synthetic", "travelling_waves", "--points", "400", "--snapshots", "40", "--rank", "4",
+                 "--output", path, "--keep-modes", "--log-level", "WARNING"]
+    threshold, upper_bound = config.SVD_THRESHOLD, config.MASK_UPPER_BOUND
+
+    default = main(arguments)
+    main(arguments + ["--set", "SVD_THRESHOLD=50.0", "--set", "MASK_UPPER_BOUND=[0.5, 1.0]", "--set", "TIME_THRESHOLD=0.5"])
+    results = load_results(path)
+
+    assert results["overrides"] == {"SVD_THRESHOLD": 50.0, "MASK_UPPER_BOUND": [0.5, 1.0], "TIME_THRESHOLD": 0.5}
+    assert results["optimal_rank"] < default["optimal_rank"], "Threshold override was ignored"
+    assert results["mask"].sum() < default["mask"].sum(), "Mask override was ignored"
+    assert len(results["t_steps"]) < len(default["t_steps"]), "Time threshold override was ignored"
+    assert results["phi"].size(1) == results["eig_val"].size(0) == results["optimal_rank"]
+    assert results["mse"].size(0) == len(results["t_steps"])
+    assert config.SVD_THRESHOLD == threshold and config.MASK_UPPER_BOUND == upper_bound, "Overrides were not restored"
+
+def test_main_overrides_scoped(tmp_path, monkeypatch):
+    """
+    Test that verifies overrides of settings used deep in the pipeline take effect through arguments,
+    while DMD.config, the modules importing its variables and the imported modules themselves are left untouched.
+
+    """
+    modes, methods = [], []
+    load_fields = data_processor.load_fields
+    def spy(*args):
+        modes.append(args[5])
+        return load_fields(*args)
+    monkeypatch.setattr(data_processor, "load_fields", spy)
+
+    compute_svd = simulation.compute_svd
+    def svd_spy(X, thr, method):
+        methods.append(method)
+        return compute_svd(X, thr, method)
+    monkeypatch.setattr(simulation, "compute_svd", svd_spy)
+
+    mode, modules = config.LOADER_MODE, dict(sys.modules)
+    main(["--synthetic", "travelling_waves", "--points", "400", "--snapshots", "20", "--rank", "4",
+          "--output", str(tmp_path / "results.pt"), "--set", "LOADER_MODE=sequential", "--set", "SVD_METHOD=snapshots",
+          "--log-level", "WARNING"])
+
+    assert modes == ["sequential"], "Override of the loader mode was ignored"
+    assert methods == ["snapshots"], "Override of the SVD method was ignored"
+    assert config.LOADER_MODE == data_processor.LOADER_MODE == mode, "Override leaked after the run"
+    assert all(sys.modules.get(name) is module for name, module in modules.items()), "Imported modules were replaced"
+
+def test_main_synthetic_without_flowtorch(tmp_path, monkeypatch):
+    """
+    Test that verifies a headless run on synthetic data doesn't need flowtorch.
+
+    """
+    monkeypatch.setitem(sys.modules, "flowtorch", None)    # Any import of flowtorch raises ImportError
+
+    results = main(["--synthetic", "travelling_waves", "--points", "200", "--snapshots", "30", "--rank", "4",
+                    "--output", str(tmp_path / "results.pt"), "--log-level", "WARNING"])
+
+    assert results["mask"].all(), "Points of the synthetic grid were masked out"
+    assert len(results["t_steps"]) == 30
+
+def test_import_is_light():
+    """
+    Test that verifies importing the pipeline and the plotter doesn't load flowtorch or matplotlib.
+
+    """
+    check = "import sys, DMD.simulation, DMD.plotter, DMD.cli; print(any(m in sys.modules for m in ('flowtorch', 'matplotlib')))"
+    completed = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, cwd=ROOT, check=True)
+
+    assert completed.stdout.strip() == "False", "Heavy modules are loaded at import time"
@@ -3,7 +3,8 @@ import sys
 import os
 import torch as pt
 from unittest.mock import MagicMock
-from DMD.data_loader import load_data
+from DMD.data_loader import load_data, load_snapshots, load_fields
+from DMD.synthetic import SyntheticLoader
 from flowtorch.data import FOAMDataloader
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -46,6 +47,35 @@ def empty_pts_loader():
     mock_loader.vertices = pt.Tensor([])
     return mock_loader
 
+@pytest.fixture
+def snapshots_loader():
+    """
+    Fixture that simulates a loader whose snapshots depend on the time step, using mocking.
+
+    """
+    mock_loader = MagicMock()
+    mock_loader.write_times = [str(0.5 * i) for i in range(12)]
+    mock_loader.vertices = pt.rand(6, 3)
+    mock_loader.load_snapshot.side_effect = lambda field, t: pt.arange(18, dtype=pt.float32).view(6, 3) * float(t)
+    return mock_loader
+
+
+@pytest.fixture
+def fields_loader():
+    """
+    Fixture that simulates a loader with a vector field "U" and a scalar field "p", using mocking.
+
+    """
+    snapshots = {
+        "U": lambda t: pt.arange(18, dtype=pt.float32).view(6, 3) * float(t),
+        "p": lambda t: -pt.arange(6, dtype=pt.float32) * float(t),
+    }
+
+    mock_loader = MagicMock()
+    mock_loader.write_times = [str(0.5 * i) for i in range(12)]
+    mock_loader.vertices = pt.rand(6, 3)
+    mock_loader.load_snapshot.side_effect = lambda field, t: snapshots[field](t)
+    return mock_loader
 
 # ---------------------  TESTS  ---------------------------
 
@@ -75,3 +105,63 @@ def test_load_data_empty_pts(empty_pts_loader):
     """
     with pytest.raises(ValueError, match="Vertices are empty."):
         load_data(loader=empty_pts_loader)
+
+def test_load_snapshots_thread_matches_sequential(snapshots_loader):
+    """
+    Test that verifies the thread-pool engine fills the data matrix exactly as the sequential one.
+    It is paired with snapshots_loader fixture.
+
+    """
+    times = snapshots_loader.write_times
+    mask = pt.tensor([True, False, True, True, False, True])
+
+    sequential = load_snapshots(snapshots_loader, "vorticity", times, mask, pt.zeros(4, len(times)), mode="sequential")
+    threaded = load_snapshots(snapshots_loader, "vorticity", times, mask, pt.zeros(4, len(times)), mode="thread", workers=3, prefetch=1)
+
+    assert pt.equal(sequential, threaded), "Thread-pool loading differs from sequential loading"
+    assert pt.equal(sequential[:, -1], pt.masked_select(pt.arange(2, 18, 3, dtype=pt.float32), mask) * float(times[-1]))
+
+def test_load_snapshots_process_matches_data():
+    """
+    Test that verifies the process-pool engine fills every column of the data matrix, in its own precision.
+    The loader is synthetic, since mocks can't be sent to other processes.
+
+    """
+    loader = SyntheticLoader("travelling_waves", n_points=200, n_times=10, rank=4)
+    times = loader.write_times
+    mask = pt.arange(loader.data_matrix.size(0)) % 3 == 0
+
+    data_matrix = pt.zeros(int(mask.sum()), len(times), dtype=pt.float64)
+    load_snapshots(loader, "vorticity", times, mask, data_matrix, mode="process", workers=2, prefetch=1)
+
+    assert pt.equal(data_matrix, loader.data_matrix[mask].double()), "Process-pool loading differs from the data"
+
+def test_load_snapshots_invalid_mode(snapshots_loader):
+    """
+    Test that verifies the correct raise of an error if an unknown loading mode is chosen.
+    It is paired with snapshots_loader fixture.
+
+    """
+    times = snapshots_loader.write_times
+    mask = pt.ones(6, dtype=pt.bool)
+
+    with pytest.raises(ValueError, match="Unknown loader mode"):
+        load_snapshots(snapshots_loader, "vorticity", times, mask, pt.zeros(6, len(times)), mode="async")
+
+def test_load_fields_stacks_components(fields_loader):
+    """
+    Test that verifies components of several fields are stacked in blocks of rows, reading each field once per time step.
+    It is paired with fields_loader fixture.
+
+    """
+    times = fields_loader.write_times
+    mask = pt.tensor([True, False, True, True, False, True])
+    components = [("U", 0), ("U", 1), ("p", None)]
+
+    data_matrix = load_fields(fields_loader, components, times, mask, pt.zeros(len(times), 12).T, mode="thread", workers=3, prefetch=1)
+
+    t = float(times[-1])
+    expected = pt.cat([pt.arange(0, 18, 3)[mask] * t, pt.arange(1, 18, 3)[mask] * t, -pt.arange(6)[mask] * t]).float()
+
+    assert pt.equal(data_matrix[:, -1], expected), "Stacked components are different from the expected"
+    assert fields_loader.load_snapshot.call_count == 2 * len(times), "Fields are read more than once per time step"
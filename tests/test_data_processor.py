@@ -2,8 +2,9 @@ import torch as pt
 import pytest
 import sys
 import os
+import DMD.data_processor as data_processor
 from DMD.data_loader import load_data
-from DMD.data_processor import process_data
+from DMD.data_processor import process_data, allocate_data_matrix, open_data_matrix, select_time_steps
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -56,3 +57,51 @@ def test_data_matrix_shape():
     )
 
     assert not pt.isnan(data_matrix).any(), "data_matrix contains NaN values"
+
+def test_memmap_data_matrix_column_major(tmp_path, monkeypatch):
+    """
+    Test that verifies memory-mapped data matrices store each snapshot contiguously and share memory with their file.
+    
+    """
+    monkeypatch.setattr(data_processor, "MEMMAP_DIR", str(tmp_path / "memmap"))    # Nothing written to the home folder
+    data_matrix = allocate_data_matrix(5, 3, storage="memmap", dtype=pt.cfloat)
+
+    assert data_matrix.shape == (5, 3) and data_matrix.dtype == pt.cfloat
+    assert data_matrix[:, 1].is_contiguous(), "Columns of the memory-mapped matrix are not contiguous"
+    assert os.listdir(tmp_path / "memmap") == [], "Temporary file of the memory-mapped matrix was left behind"
+
+    data_matrix[:, 1] = 1j
+    assert pt.equal(data_matrix[:, 1], pt.full((5,), 1j, dtype=pt.cfloat)), "Memory-mapped matrix is not writable"
+
+    path = str(tmp_path / "data_matrix.dat")
+    written = open_data_matrix(path, 5, 3, mode="w+")
+    written[:, 2] = pt.arange(5, dtype=pt.float32)
+
+    reopened = open_data_matrix(path, 5, 3)
+    assert pt.equal(reopened, written), "Memory-mapped file doesn't contain the written data"
+
+def test_memory_data_matrix_column_major():
+    """
+    Test that verifies in-memory data matrices store each snapshot contiguously, as memory-mapped ones.
+    
+    """
+    data_matrix = allocate_data_matrix(5, 3, storage="memory")
+
+    assert data_matrix.shape == (5, 3)
+    assert data_matrix[:, 1].is_contiguous(), "Columns of the in-memory matrix are not contiguous"
+
+def test_allocate_data_matrix_invalid_storage():
+    """
+    Test that verifies the correct raise of an error if an unknown storage is chosen.
+    
+    """
+    with pytest.raises(ValueError, match="Unknown storage"):
+        allocate_data_matrix(5, 3, storage="disk")
+
+def test_select_time_steps_too_few():
+    """
+    Test that verifies the correct raise of an error if fewer than two time steps come after the minimum time.
+
+    """
+    with pytest.raises(ValueError, match="at least 2 are needed"):
+        select_time_steps(["0.0", "0.1", "0.2"], min_time=0.2)
@@ -0,0 +1,145 @@
+import torch as pt
+import pytest
+import sys
+import os
+import threading
+from DMD.execution import ExecutionSettings, with_execution_settings
+from DMD.simulation import run_DMD
+from DMD.synthetic import SyntheticLoader
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def test_settings_restored():
+    """
+    Test that verifies threads and BLAS variables are set inside the context and restored on exit.
+
+    """
+    threads = pt.get_num_threads()
+    variable = os.environ.get("OPENBLAS_NUM_THREADS")
+
+    with ExecutionSettings(threads=1, blas_threads=1):
+        assert pt.get_num_threads() == 1
+        assert os.environ["OPENBLAS_NUM_THREADS"] == "1"
+
+    assert pt.get_num_threads() == threads, "Threads are not restored"
+    assert os.environ.get("OPENBLAS_NUM_THREADS") == variable, "Environment variables are not restored"
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="Core pinning is not supported on this platform")
+def test_settings_pinning():
+    """
+    Test that verifies the process is pinned to the given cores inside the context only.
+
+    """
+    cpus = os.sched_getaffinity(0)
+    core = min(cpus)
+
+    with ExecutionSettings(cpus=[core]):
+        assert os.sched_getaffinity(0) == {core}
+
+    assert os.sched_getaffinity(0) == cpus, "Affinity is not restored"
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="Core pinning is not supported on this platform")
+def test_settings_pinning_all_threads():
+    """
+    Test that verifies threads already running are pinned as well as the calling one, and restored on exit.
+
+    """
+    cpus = os.sched_getaffinity(0)
+    core = min(cpus)
+    started, done = threading.Event(), threading.Event()
+    thread = threading.Thread(target=lambda: (started.set(), done.wait()))
+    thread.start()
+    started.wait()
+
+    try:
+        with ExecutionSettings(cpus=[core]):
+            assert os.sched_getaffinity(thread.native_id) == {core}, "Other threads are not pinned"
+
+        assert os.sched_getaffinity(thread.native_id) == cpus, "Affinity of other threads is not restored"
+    finally:
+        done.set()
+        thread.join()
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="Core pinning is not supported on this platform")
+def test_default_settings_untouched():
+    """
+    Test that verifies the affinity of a thread bound to its own core is left alone by a default run of DMD,
+    and by contexts that don't pin cores.
+
+    """
+    core = max(os.sched_getaffinity(0))
+    loader = SyntheticLoader("travelling_waves", n_points=300, n_times=20, rank=4)
+    bound, done = threading.Event(), threading.Event()
+
+    def worker():
+        os.sched_setaffinity(0, {core})
+        bound.set()
+        done.wait()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    bound.wait()
+
+    try:
+        run_DMD((None, loader.write_times, 0.025, loader.data_matrix))
+        assert os.sched_getaffinity(thread.native_id) == {core}, "Default settings changed the affinity of a thread"
+
+        with ExecutionSettings(threads=1):
+            pass
+        assert os.sched_getaffinity(thread.native_id) == {core}, "Settings without cores changed the affinity of a thread"
+    finally:
+        done.set()
+        thread.join()
+
+def test_settings_interleaved_threads():
+    """
+    Test that verifies threads of torch are set per thread, so that contexts entered by two threads exiting in a
+    different order restore each its own thread.
+
+    """
+    threads = pt.get_num_threads()
+    entered, exited = threading.Event(), threading.Event()
+    seen = {}
+
+    def inner():
+        with ExecutionSettings(threads=2):
+            entered.set()
+            exited.wait()
+            seen["inner"] = pt.get_num_threads()
+
+    thread = threading.Thread(target=inner, daemon=True)
+    outer = ExecutionSettings(threads=1)
+    outer.__enter__()
+
+    try:
+        thread.start()
+        entered.wait()
+
+        assert pt.get_num_threads() == 1, "Settings of another thread changed the calling one"
+        outer.__exit__(None, None, None)
+        assert pt.get_num_threads() == threads, "Threads are not restored"
+    finally:
+        exited.set()
+        thread.join()
+
+    assert seen["inner"] == 2, "Settings of the context still active are lost"
+
+def test_enclosing_settings_kept():
+    """
+    Test that verifies decorated functions keep the settings of an enclosing context instead of the ones in config.
+
+    """
+    @with_execution_settings
+    def threads():
+        return pt.get_num_threads()
+
+    with ExecutionSettings(threads=1):
+        assert threads() == 1
+
+def test_settings_invalid():
+    """
+    Test that verifies the correct raise of an error if a number of threads is not positive.
+
+    """
+    with pytest.raises(ValueError, match="must be positive"):
+        ExecutionSettings(threads=0)
@@ -0,0 +1,36 @@
+import torch as pt
+import pytest
+import sys
+import os
+from DMD.fields import FieldLayout
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def test_normalize_and_split_roundtrip():
+    """
+    Test that verifies each field is scaled to unit root mean square, components of a vector field sharing the scale,
+    and that splitting recovers the original blocks in physical units.
+
+    """
+    layout = FieldLayout([("U", 0), ("U", 1), ("p", None)], n_points=4)
+    data_matrix = pt.cat([pt.full((4, 5), 3.0), pt.full((4, 5), 4.0), pt.full((4, 5), 1.0e5)])
+    original = data_matrix.clone()
+
+    layout.normalize(data_matrix)
+
+    assert layout.labels() == ["U_x", "U_y", "p"]
+    assert abs(layout.scales["U"] - (12.5 ** 0.5)) < 1e-4, "Components of U don't share their root mean square"
+    assert pt.allclose(data_matrix[layout.block(2)], pt.ones(4, 5)), "Pressure is not normalized"
+
+    blocks = layout.split(data_matrix)
+    assert pt.allclose(blocks["U_y"], original[4:8]) and pt.allclose(blocks["p"], original[8:]), "Blocks are different from the original ones"
+
+def test_split_wrong_shape():
+    """
+    Test that verifies the correct raise of an error if the matrix hasn't one block of rows per component.
+
+    """
+    layout = FieldLayout([("U", 0), ("p", None)], n_points=4)
+
+    with pytest.raises(ValueError, match="one block of rows per component"):
+        layout.split(pt.zeros(6, 2))
@@ -3,7 +3,7 @@ import pytest
 import sys
 import os
 from DMD.data_processor import process_data
-from DMD.functions import find_optimal_rank
+from DMD.functions import find_optimal_rank, truncation_rank, mask_indices, box_mask
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -31,3 +31,36 @@ def test_find_optimal_rank():
     assert find_optimal_rank(s, 99) == 3  
     assert find_optimal_rank(s, 80) == 2 
     assert find_optimal_rank(s, 60) == 1  
+
+def test_truncation_rank_keeps_pairs():
+    """
+    Test that verifies the singular value reaching the threshold is counted, and pairs of singular values are kept together.
+
+    """
+    s = pt.tensor([5.0, 3.0, 2.0, 1.0])
+    assert truncation_rank(s, 60) == 2
+    assert truncation_rank(s, 99) == 4
+
+    s = pt.tensor([4.0, 3.0, 2.9, 0.1])
+    assert truncation_rank(s, 50) == 3, "The pair (3.0, 2.9) must not be split"
+    assert truncation_rank(s, 50, pair_tolerance=0.0) == 2
+
+def test_mask_indices_gather():
+    """
+    Test that verifies gathering through mask indices selects the same values, in the same order, as masked_select.
+
+    """
+    mask = pt.tensor([True, False, True, True, False])
+    values = pt.tensor([1.0, 2.0, 3.0, 4.0, 5.0])
+
+    assert mask_indices(mask).tolist() == [0, 2, 3]
+    assert pt.equal(pt.index_select(values, 0, mask_indices(mask)), pt.masked_select(values, mask))
+
+def test_box_mask_bounds_included():
+    """
+    Test that verifies points inside the box are selected, those on its bounds included.
+
+    """
+    pts = pt.tensor([[0.0, 0.0], [1.0, 0.5], [1.5, 0.0], [0.5, -1.0]])
+
+    assert pt.equal(box_mask(pts, [0.0, -0.5], [1.0, 0.5]), pt.tensor([True, True, False, False]))
@@ -0,0 +1,88 @@
+import torch as pt
+import pytest
+import sys
+import os
+from numpy import pi
+import DMD.hankel as hankel
+from DMD.hankel import delay_embedding, HankelOperator, run_hankel_DMD
+from DMD.reconstruction import LazyReconstruction
+from DMD.simulation import run_DMD
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def probe_data():
+    """
+    Fixture that builds the signals of two probes, each the sum of two oscillations at 1 Hz and 2.5 Hz, in column-major storage.
+
+    """
+    dt = 0.05
+    t = pt.arange(200, dtype=pt.float64) * dt
+    signals = [pt.sin(2 * pi * t) + 0.5 * pt.cos(2 * pi * 2.5 * t), 0.3 * pt.cos(2 * pi * t) - pt.sin(2 * pi * 2.5 * t + 0.4)]
+
+    data_matrix = pt.stack(signals, dim=1).T    # Column-major, as allocated by `allocate_data_matrix`
+    t_steps = [str(round(float(time), 2)) for time in t]
+    return (None, t_steps, dt, data_matrix)
+
+def _stacked(data_matrix, delays):
+    n_cols = data_matrix.size(1) - delays + 1
+    return pt.cat([data_matrix[:, k:k + n_cols] for k in range(delays)], dim=0)
+
+def test_delay_embedding_is_view():
+    """
+    Test that verifies the embedding equals the stacked shifted copies of data and shares their storage.
+
+    """
+    data_matrix = pt.randn(40, 5, dtype=pt.float64).T
+    embedding = delay_embedding(data_matrix, 4)
+
+    assert pt.equal(embedding, _stacked(data_matrix, 4))
+    assert embedding.data_ptr() == data_matrix.data_ptr(), "Embedding is a copy"
+
+    with pytest.raises(ValueError):
+        delay_embedding(data_matrix.contiguous(), 4)
+
+def test_hankel_operator_products():
+    """
+    Test that verifies products with the operator and its adjoint equal those with the explicit Hankel matrix.
+
+    """
+    data_matrix = pt.randn(30, 7, dtype=pt.float64).T
+    H = _stacked(data_matrix, 5)[:, 2:20]
+    operator = HankelOperator(data_matrix, 5).columns(2, 20)
+    V, W = pt.randn(18, 3, dtype=pt.float64), pt.randn(35, 3, dtype=pt.float64)
+
+    assert operator.shape == H.shape and operator.mH.shape == H.T.shape
+    assert pt.allclose(operator @ V, H @ V) and pt.allclose(operator @ V[:, 0], H @ V[:, 0])
+    assert pt.allclose(operator.mH @ W, H.T @ W)
+    assert pt.allclose(operator.norm_sq(), pt.linalg.matrix_norm(H) ** 2)
+    assert pt.equal(operator.view(), H)
+
+def test_hankel_DMD_recovers_frequencies(probe_data):
+    """
+    Test that verifies Hankel DMD recovers both frequencies from two probes, where plain DMD can find at most two modes.
+
+    """
+    optimal_rank, eig_val, _, phi, _, _, mse = run_hankel_DMD(probe_data, delays=20, rank=4)
+    frequencies = pt.log(eig_val).imag / (2.0 * pi * probe_data[2])
+
+    assert phi.shape == (2, 4), "Modes are not on the points of data"
+    for f in (1.0, 2.5):
+        assert (frequencies.abs() - f).abs().min() < 1e-3, f"Frequency {f} Hz was not recovered"
+    assert mse.max() < 1e-8
+
+    _, eig_val, _, _, _, _, mse_plain = run_DMD(probe_data, thr=99.9)
+    assert eig_val.size(0) <= 2 and mse_plain.mean() > 1e-3
+
+def test_hankel_DMD_lazy_and_amplitude_method(probe_data, monkeypatch, caplog):
+    """
+    Test that verifies Hankel DMD returns a lazy reconstruction on request, and warns that other amplitude methods are not used.
+
+    """
+    monkeypatch.setattr(hankel, "AMPLITUDE_METHOD", "optimal")
+
+    with caplog.at_level("WARNING", logger="DMD.hankel"):
+        reconstruction = run_hankel_DMD(probe_data, delays=20, rank=4, lazy=True)[5]
+
+    assert isinstance(reconstruction, LazyReconstruction), "Reconstruction is not lazy"
+    assert "projected amplitudes are used instead" in caplog.text
@@ -0,0 +1,118 @@
+import json
+import torch as pt
+import pytest
+import sys
+import os
+import DMD.instrumentation as instrumentation
+from DMD.simulation import run_DMD
+from DMD.synthetic import SyntheticLoader
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def enabled():
+    """
+    Fixture that enables instrumentation for a test, and disables it afterwards.
+
+    """
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+@pytest.fixture
+def data():
+    """
+    Fixture that provides synthetic data as returned by `process_data`.
+
+    """
+    loader = SyntheticLoader("travelling_waves", n_points=500, n_times=30, rank=4)
+    return None, loader.write_times, 0.025, loader.data_matrix
+
+def test_run_DMD_stages(enabled, data):
+    """
+    Test that verifies every stage of run_DMD is recorded, with times, memory and shapes, and passed to callbacks.
+
+    """
+    received = []
+    instrumentation.add_callback(received.append)
+    try:
+        run_DMD(data)
+    finally:
+        instrumentation.remove_callback(received.append)
+
+    records = {record["name"]: record for record in instrumentation.records()}
+
+    assert {"svd", "rank_selection", "operator", "eig", "modes", "amplitudes", "mse"} <= set(records)
+    assert records["rank_selection"]["parent"] == "svd"
+    assert records["svd"]["X"] == [data[3].size(0), 29]
+    assert all(record["wall_time"] >= 0 and record["cpu_time"] >= 0 and record["peak_memory"] >= 0 for record in records.values())
+    assert len(received) == len(instrumentation.records())
+    assert json.loads(instrumentation.export_json())[0]["name"] == instrumentation.records()[0]["name"]
+
+def test_disabled_instrumentation(data):
+    """
+    Test that verifies nothing is recorded when instrumentation is disabled.
+
+    """
+    instrumentation.reset()
+
+    with instrumentation.span("stage", X=pt.zeros(3)) as stage:
+        stage.set(result=1)
+
+    assert instrumentation.records() == []
+
+def test_cuda_peak_propagated(enabled, monkeypatch):
+    """
+    Test that verifies CUDA peaks are recorded without resetting the statistics of the allocator, and reach enclosing stages.
+
+    """
+    memory = {"allocated": 10, "peak": 10}
+
+    def allocate(size):
+        memory["allocated"] += size
+        memory["peak"] = max(memory["peak"], memory["allocated"])
+
+    def reset():
+        raise AssertionError("Peak statistics of CUDA were reset")
+
+    monkeypatch.setattr(pt.cuda, "is_available", lambda: True)
+    monkeypatch.setattr(pt.cuda, "memory_allocated", lambda: memory["allocated"])
+    monkeypatch.setattr(pt.cuda, "max_memory_allocated", lambda: memory["peak"])
+    monkeypatch.setattr(pt.cuda, "reset_peak_memory_stats", reset)
+
+    with instrumentation.span("outer"):
+        with instrumentation.span("inner"):
+            allocate(80)
+            allocate(-80)
+        allocate(5)
+
+    records = {record["name"]: record for record in instrumentation.records()}
+
+    assert records["inner"]["cuda_peak_memory"] == 90
+    assert records["outer"]["cuda_peak_memory"] == 90
+    assert memory["peak"] == 90
+
+def test_tensor_memory_and_records_capped(enabled, monkeypatch):
+    """
+    Test that verifies stages record the size of their tensors, nested peaks reach enclosing stages,
+    and only the last records are kept.
+
+    """
+    monkeypatch.setattr(instrumentation, "_records", instrumentation.deque(maxlen=2))
+
+    with instrumentation.span("outer", X=pt.zeros(10)):
+        with instrumentation.span("inner") as stage:
+            stage.set(result=pt.zeros(100, dtype=pt.float64))
+
+    records = {record["name"]: record for record in instrumentation.records()}
+
+    assert records["inner"]["peak_memory"] == 800
+    assert records["outer"]["peak_memory"] == 800
+    assert "peak_rss" not in records["outer"], "Resident memory was sampled without being enabled"
+
+    with instrumentation.span("last"):
+        pass
+
+    assert [record["name"] for record in instrumentation.records()] == ["outer", "last"]
@@ -0,0 +1,133 @@
+import torch as pt
+import pytest
+import json
+import sys
+import os
+import DMD.config as config
+from DMD.model import DMDModel
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def model():
+    """
+    Fixture that builds a model with random modes and eigenvalues on the unit circle.
+
+    """
+    generator = pt.Generator().manual_seed(0)
+    phi = pt.randn(200, 6, dtype=pt.cfloat, generator=generator)
+    eig_val = pt.exp(1j * pt.linspace(-1.0, 1.0, 6, dtype=pt.float64)).to(pt.cfloat)
+    mask = pt.rand(300, generator=generator) > 0.3
+    return DMDModel(eig_val, phi, pt.ones(6, dtype=pt.cfloat), 0.1, [str(0.1 * i) for i in range(20)], mask)
+
+def _mapped_file(tensor):
+    # File whose mapping holds the memory of the tensor, None for anonymous memory
+    address = tensor.data_ptr()
+    with open("/proc/self/maps") as f:
+        for line in f:
+            fields = line.split(maxsplit=5)
+            start, end = (int(value, 16) for value in fields[0].split("-"))
+            if start <= address < end:
+                return fields[5].strip() if len(fields) > 5 and fields[5].startswith("/") else None
+    return None
+
+def test_model_roundtrip(model, tmp_path):
+    """
+    Test that verifies a saved model is loaded back with modes backed by the mapped file, and the same content.
+
+    """
+    path = str(tmp_path / "model")
+    model.save(path)
+    loaded = DMDModel.load(path, verify=True)
+
+    if os.path.exists("/proc/self/maps"):
+        assert _mapped_file(loaded.phi) == os.path.realpath(os.path.join(path, "phi.npy")), "Modes are not memory-mapped"
+        assert _mapped_file(DMDModel.load(path, mmap=False).phi) is None
+    assert pt.equal(loaded.phi, model.phi)
+    assert pt.equal(loaded.modes([1, 4]), model.phi[:, [1, 4]])
+    assert pt.equal(loaded.eig_val, model.eig_val) and pt.equal(loaded.mask, model.mask)
+    assert loaded.t_steps == model.t_steps and loaded.dt == model.dt
+    assert pt.allclose(loaded.frequencies, model.frequencies)
+
+def test_model_checksum(model, tmp_path):
+    """
+    Test that verifies a corrupted file is detected when checksums are verified.
+
+    """
+    path = str(tmp_path / "model")
+    model.save(path)
+
+    with open(os.path.join(path, "phi.npy"), "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        f.write(b"\x00" if f.read(1) != b"\x00" else b"\x01")
+
+    DMDModel.load(path)    # Not verified by default
+    with pytest.raises(ValueError):
+        DMDModel.load(path, verify=True)
+
+def test_model_version(model, tmp_path):
+    """
+    Test that verifies models of a newer format version are rejected, and those of version 1 are loaded as real ones.
+
+    """
+    path = str(tmp_path / "model")
+    model.save(path)
+
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    meta["format_version"] += 1
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    with pytest.raises(ValueError):
+        DMDModel.load(path)
+
+    meta["format_version"] = 1
+    del meta["real"]
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    assert DMDModel.load(path).real
+
+def test_model_config(model, tmp_path, monkeypatch):
+    """
+    Test that verifies differences with the current configuration are reported, and are errors in strict mode.
+
+    """
+    path = str(tmp_path / "model")
+    model.save(path)
+    monkeypatch.setattr(config, "SVD_THRESHOLD", config.SVD_THRESHOLD - 1.0)
+
+    loaded = DMDModel.load(path)
+    assert list(loaded.check_config()) == ["SVD_THRESHOLD"]
+
+    with pytest.raises(ValueError):
+        DMDModel.load(path, strict=True)
+
+def test_predict_matches_reconstruction(model):
+    """
+    Test that verifies predictions at the time steps of the model match the reconstruction through powers of eigenvalues.
+
+    """
+    t = pt.tensor([float(t) for t in model.t_steps])
+    dynamics = model.amplitudes.unsqueeze(1) * pt.vander(model.eig_val, N=len(model.t_steps), increasing=True)
+
+    assert pt.allclose(model.predict(t), (model.phi @ dynamics).real, atol=1e-4)
+
+def test_predict_selection_and_chunks(model):
+    """
+    Test that verifies predictions past the last snapshot on chosen points and modes, whole and in chunks.
+
+    """
+    times = pt.linspace(0.0, 10.0, 101)
+    points, modes = [0, 7, 42], [1, 2, 5]
+    expected = model.predict(times)
+
+    assert pt.allclose(model.predict(times, points=points), expected[points], atol=1e-5)
+
+    partial = DMDModel(model.eig_val[modes], model.phi[:, modes], model.amplitudes[modes], model.dt, model.t_steps)
+    assert pt.allclose(model.predict(times, points=points, modes=modes), partial.predict(times)[points], atol=1e-5)
+
+    chunks = list(model.predict_chunks(times, chunk_size=30))
+    assert [chunk.size(0) for chunk, _ in chunks] == [30, 30, 30, 11]
+    assert pt.allclose(pt.cat([states for _, states in chunks], dim=1), expected, atol=1e-5)
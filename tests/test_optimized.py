@@ -0,0 +1,34 @@
+import torch as pt
+import sys
+import os
+from numpy import pi
+from DMD.optimized import variable_projection
+from DMD.synthetic import wave_superposition
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def test_variable_projection_removes_noise_bias():
+    """
+    Test that verifies optimized DMD recovers the eigenvalues of two undamped oscillations from noisy data,
+    starting from exact DMD, whose eigenvalues are biased towards damping by noise.
+
+    """
+    generator = pt.Generator().manual_seed(0)
+    dt = 0.1
+    times = pt.arange(80, dtype=pt.float64) * dt
+    data_matrix = wave_superposition(100, times)
+    data_matrix += 0.2 * pt.randn(data_matrix.shape, generator=generator, dtype=pt.float64)
+
+    U, s, Vh = pt.linalg.svd(data_matrix[:, :-1], full_matrices=False)
+    Ur, sr, Vr = U[:, :4], s[:4], Vh[:4, :]
+    eig_val, _ = pt.linalg.eig(Ur.T @ data_matrix[:, 1:] @ Vr.T / sr)
+    alpha_exact = pt.log(eig_val) / dt
+
+    Y = (Ur.T @ data_matrix).T.type(pt.complex128)
+    alpha, B, info = variable_projection(Y, times, alpha_exact)
+
+    true_frequencies = pt.tensor([-0.9, -0.5, 0.5, 0.9], dtype=pt.float64) * 2 * pi
+
+    assert info["iterations"] > 0 and B.shape == (4, 4)
+    assert alpha.real.abs().max() < alpha_exact.real.abs().max(), "Growth rates are not closer to zero than exact DMD"
+    assert (pt.sort(alpha.imag).values - true_frequencies).abs().max() < 0.05, "Frequencies are different from the expected"
@@ -8,8 +8,11 @@ import sys
 import os
 from DMD.data_loader import load_data
 from DMD.data_processor import process_data
+import DMD.plotter as plotter_module
 from DMD.plotter import Plotter
 from DMD.simulation import run_DMD
+from DMD.synthetic import grid_points
+from DMD.spectrum import spectrum
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -19,6 +22,16 @@ def plotter():
     mask, _, _, _ = process_data()
     return Plotter(pts, mask)
 
+@pytest.fixture
+def synthetic_plotter():
+    """
+    Fixture that builds a Plotter on a small regular grid, so that no dataset is needed.
+
+    """
+    pts = grid_points(200, lower=(0.0, -0.5), upper=(1.0, 0.5))
+    mask = pts[:, 0] > 0.1
+    return Plotter(pts, mask)
+
 @pytest.fixture
 def data_fixture():
     _, _, _, _, _, reconstruction, _ = run_DMD()
@@ -122,3 +135,93 @@ def test_reconstruction_error_wrong_shapes(plotter):
 
     with pytest.raises(ValueError, match="`mse_dmd` must be of the same size as `time_steps`."):
         plotter.reconstruction_error(time_steps, mse_dmd)
+
+def test_triangulation_shared(synthetic_plotter):
+    """
+    Test that verifies the triangulation is built once per mask and shared by Plotters on the same points.
+
+    """
+    other = Plotter(synthetic_plotter.pts, synthetic_plotter.mask)
+
+    assert synthetic_plotter.triangulation is other.triangulation, "Triangulation is built again for the same mask"
+    assert synthetic_plotter.triangulation.x.shape[0] == synthetic_plotter.x.size(0)
+
+def test_triangulations_bounded(synthetic_plotter, monkeypatch):
+    """
+    Test that verifies only the most recently used triangulations are kept when many masks are plotted.
+
+    """
+    monkeypatch.setattr(plotter_module, "PLOT_TRIANGULATIONS", 2)
+    plotters = [Plotter(synthetic_plotter.pts, synthetic_plotter.pts[:, 0] > bound) for bound in (0.2, 0.3, 0.4)]
+
+    first = plotters[0].triangulation
+    plotters[1].triangulation
+    assert Plotter(plotters[0].pts, plotters[0].mask).triangulation is first    # Used again, so it is the most recent
+    plotters[2].triangulation
+
+    assert len(plotter_module._triangulations) == 2
+    assert Plotter(plotters[0].pts, plotters[0].mask).triangulation is first, "Most recently used triangulation was dropped"
+    assert Plotter(plotters[1].pts, plotters[1].mask).triangulation is not plotters[1].triangulation, "Least recently used triangulation was kept"
+
+def test_plot_data_types(synthetic_plotter, monkeypatch):
+    """
+    Test that verifies complex data are plotted through their real part and only half precision is converted.
+
+    """
+    drawn = []
+    monkeypatch.setattr(plotter_module, "_draw", lambda ax, triangulation, data, title, levels: drawn.append(data))
+    n_points = synthetic_plotter.x.size(0)
+    data = pt.randn(n_points, dtype=pt.complex128)
+
+    synthetic_plotter.plot_data(None, data, "complex")
+    synthetic_plotter.plot_data(None, data.real.half(), "half")
+    synthetic_plotter.plot_data(None, data.real, "double")
+
+    assert drawn[0].dtype == pt.float64 and pt.equal(drawn[0], data.real), "Complex data must be plotted through their real part"
+    assert drawn[1].dtype == pt.float32
+    assert drawn[2].dtype == pt.float64, "Double precision must not be downcast"
+    plt.close("all")
+
+def test_export_time_series(synthetic_plotter, tmp_path):
+    """
+    Test that verifies frames rendered by a pool of processes are written in the order of time steps.
+
+    """
+    data_matrix = pt.rand(synthetic_plotter.x.size(0), 6)
+    time_steps = [str(0.1 * i) for i in range(6)]
+
+    paths = synthetic_plotter.export_time_series(data_matrix, [0, 2, 4], time_steps, str(tmp_path), workers=2)
+
+    assert [os.path.basename(path) for path in paths] == ["time_0.png", "time_1.png", "time_2.png"]
+    assert all(os.path.getsize(path) > 0 for path in paths), "One or more frames are empty"
+
+def test_export_animation(synthetic_plotter, tmp_path):
+    """
+    Test that verifies an animation with one frame per time step is written.
+
+    """
+    from PIL import Image
+
+    data_matrix = pt.rand(synthetic_plotter.x.size(0), 4)
+    time_steps = [str(0.1 * i) for i in range(4)]
+    path = str(tmp_path / "animation.gif")
+
+    synthetic_plotter.export_animation(data_matrix, range(4), time_steps, path, workers=1)
+
+    with Image.open(path) as image:
+        assert image.n_frames == 4, "Animation doesn't contain one frame per time step"
+
+def test_plot_spectrum(synthetic_plotter):
+    """
+    Test that verifies the spectrum plot is built from a spectrum table, and that an empty table raises an error.
+
+    """
+    eig_val = pt.exp(0.1j * pt.tensor([1.0, -1.0, 3.0]))
+    phi = pt.rand(10, 3, dtype=pt.cfloat)
+    dynamics = pt.vander(eig_val, 8, increasing=True)
+
+    synthetic_plotter.plot_spectrum(spectrum(eig_val, phi, dynamics, 0.1, conjugates=False))
+    plt.close("all")
+
+    with pytest.raises(ValueError, match="at least one mode"):
+        synthetic_plotter.plot_spectrum(spectrum(eig_val, phi, dynamics, 0.1, top_k=0))
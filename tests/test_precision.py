@@ -0,0 +1,83 @@
+import torch as pt
+import pytest
+import sys
+import os
+from DMD.precision import DtypePolicy, get_policy
+from DMD.data_processor import process_data
+from DMD.simulation import run_DMD
+from DMD.synthetic import SyntheticLoader, TWO_WAVES, wave_superposition
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def test_policy_dtypes():
+    """
+    Test that verifies each stage gets its type, with complex counterparts for complex data.
+
+    """
+    policy = get_policy("half")
+
+    assert policy.storage_dtype() == pt.float16
+    assert policy.compute_dtype(real=False) == pt.complex64
+    assert policy.eig_dtype(real=False) == pt.complex128
+    assert policy.to_compute(pt.zeros(2, dtype=pt.float16)).dtype == pt.float32
+
+def test_policy_never_downcasts():
+    """
+    Test that verifies data passed in a precision higher than the one of the policy are kept, e.g. by run_DMD.
+
+    """
+    policy = get_policy("single")
+    data = pt.zeros(2, dtype=pt.float64)
+
+    assert policy.to_compute(data) is data
+    assert policy.to_eig(pt.zeros(2, dtype=pt.complex128)).dtype == pt.complex128
+
+    t = pt.arange(30, dtype=pt.float64) * 0.1
+    data_matrix = wave_superposition(100, t, TWO_WAVES[:1])
+    _, eig_val, _, phi, _, _, _ = run_DMD((None, [str(time) for time in t.tolist()], 0.1, data_matrix))
+
+    assert eig_val.dtype == pt.complex128 and phi.dtype == pt.complex128, "Double-precision data were downcast"
+
+def test_policy_invalid():
+    """
+    Test that verifies the correct raise of errors for unknown policies, unsupported types and complex half-precision data.
+
+    """
+    with pytest.raises(ValueError, match="Unknown dtype policy"):
+        get_policy("quad")
+
+    with pytest.raises(ValueError, match="Compute and eig types"):
+        DtypePolicy(compute=pt.float16)
+
+    with pytest.raises(ValueError, match="Complex data can't be stored"):
+        get_policy("bfloat16").storage_dtype(real=False)
+
+def test_process_data_half_storage():
+    """
+    Test that verifies data are loaded and stored in half precision, close to single-precision ones.
+
+    """
+    loader = SyntheticLoader("travelling_waves", n_points=400, n_times=20, rank=4)
+    kwargs = dict(use_cache=False, lower=[-1.0, -1.0], upper=[2.0, 1.0], min_time=0.0, loader=loader)
+
+    _, _, _, half = process_data(policy="half", **kwargs)
+    _, _, _, single = process_data(policy="single", **kwargs)
+
+    assert half.dtype == pt.float16 and half[:, 3].is_contiguous()
+    assert pt.allclose(half.float(), single, atol=2e-3), "Half-precision data are different from single-precision ones"
+
+def test_run_DMD_mixed_precision():
+    """
+    Test that verifies the eigendecomposition runs in double precision with the mixed policy, while modes stay in single precision,
+    and that results agree with the single policy.
+
+    """
+    t = pt.arange(40) * 0.1
+    data = (None, [str(round(float(time), 1)) for time in t], 0.1, wave_superposition(200, t))
+
+    _, eig_val_m, _, phi_m, _, _, mse_m = run_DMD(data, policy="mixed")
+    _, eig_val_s, _, _, _, _, mse_s = run_DMD(data, policy="single")
+
+    assert eig_val_m.dtype == pt.complex128 and phi_m.dtype == pt.complex64
+    assert pt.allclose(pt.sort(eig_val_m.imag).values, pt.sort(eig_val_s.imag).values.double(), atol=1e-4)
+    assert pt.allclose(mse_m, mse_s, atol=1e-5)
@@ -0,0 +1,54 @@
+import torch as pt
+import pytest
+import sys
+import os
+from DMD.reconstruction import LazyReconstruction
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def lazy():
+    """
+    Fixture that builds a lazy reconstruction from random modes and dynamics.
+
+    """
+    generator = pt.Generator().manual_seed(0)
+    phi = pt.randn(50, 4, dtype=pt.cfloat, generator=generator)
+    dynamics = pt.randn(4, 30, dtype=pt.cfloat, generator=generator)
+    return LazyReconstruction(phi, dynamics)
+
+def test_lazy_reconstruction_indexing(lazy):
+    """
+    Test that verifies indexing a lazy reconstruction gives the same values as the full matrix.
+
+    """
+    full = lazy.phi @ lazy.dynamics
+
+    assert lazy.size() == full.size() and lazy.size(1) == 30
+    # Columns are computed as matrix-vector products, whose rounding differs from the full product in single precision
+    assert pt.allclose(lazy[:, 3], full[:, 3], atol=1e-6)
+    assert pt.allclose(lazy[5:9, [0, 7]], full[5:9, [0, 7]], atol=1e-6)
+    assert pt.allclose(lazy.real[:, 10], full[:, 10].real, atol=1e-6)
+    assert pt.allclose(lazy.materialize(), full, atol=1e-6)
+
+@pytest.mark.parametrize("block_size", [1, 7, 64])
+def test_lazy_reconstruction_mse(lazy, block_size):
+    """
+    Test that verifies the MSE computed in blocks of time steps matches the one computed on the full matrix.
+
+    """
+    full = lazy.phi @ lazy.dynamics
+    data_matrix = pt.randn(50, 30)
+
+    expected = ((data_matrix - full.real) ** 2).mean(axis = 0)
+
+    assert pt.allclose(lazy.mse(data_matrix, block_size), expected, rtol=1e-5)
+    assert pt.allclose(lazy.mse(data_matrix.type(pt.cfloat), block_size), ((data_matrix - full) ** 2).mean(axis = 0), rtol=1e-5)
+
+def test_lazy_reconstruction_mse_wrong_shape(lazy):
+    """
+    Test that verifies the correct raise of an error if data and reconstruction have different shapes.
+
+    """
+    with pytest.raises(ValueError, match="`reconstruction` and `data_matrix` must have the same shape."):
+        lazy.mse(pt.randn(50, 29))
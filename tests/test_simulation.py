@@ -1,13 +1,28 @@
 import sys
 import os
 from flowtorch.analysis import DMD
-from DMD.simulation import run_DMD
+import DMD.simulation as simulation
+from DMD.simulation import run_DMD, run_compressed_DMD, compare_compressed_DMD, compress_data, run_optimized_DMD
 from DMD.data_processor import process_data
-from numpy import allclose
+from DMD.synthetic import wave_superposition
+from DMD.reconstruction import LazyReconstruction
+from numpy import allclose, pi
 from torch import complex128
+import torch as pt
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+def _two_waves():
+    """
+    Function that builds data made of two travelling waves, so that no dataset is needed.
+
+    Returns:
+        data (tuple): Data as returned by process_data, without mask.
+
+    """
+    t = pt.arange(40) * 0.1
+    return (None, [str(round(float(time), 1)) for time in t], 0.1, wave_superposition(200, t))
+
 def test_run_DMD_eigs():
     """
     Test that verifies eigenvalues and eigenvectors computed are as the expected.
@@ -58,3 +73,115 @@ def test_run_DMD_reconstruction():
     tolerance = 1e-3
 
     assert allclose(reconstruction_dmd, reconstruction, atol=tolerance), "Data matrix reconstruction is different from the expected"
+
+def test_run_DMD_real_matches_complex():
+    """
+    Test that verifies the real-arithmetic path gives the same results as the complex one.
+    Data are a superposition of two travelling waves, so no dataset is needed.
+
+    """
+    _, t_steps, _, data_matrix = _two_waves()
+
+    rank_r, eig_val_r, _, phi_r, _, reconstruction_r, mse_r = run_DMD((None, t_steps, 0.1, data_matrix))
+    rank_c, eig_val_c, _, _, _, reconstruction_c, mse_c = run_DMD((None, t_steps, 0.1, data_matrix.type(pt.cfloat)))
+
+    assert rank_r == rank_c, "Optimal ranks are different"
+    assert not mse_r.is_complex(), "MSE of real data should be real"
+    assert phi_r.size(0) == data_matrix.size(0)
+    assert allclose(pt.sort(eig_val_r.real).values, pt.sort(eig_val_c.real).values, atol=1e-4), "Eigenvalues are different"
+    assert allclose(reconstruction_r, reconstruction_c, atol=1e-3), "Reconstructions are different"
+    assert allclose(mse_r, mse_c.real, atol=1e-4), "MSEs are different"
+
+def test_run_DMD_summary_complex(monkeypatch, caplog):
+    """
+    Test that verifies the spectrum summary of complex data lists modes of negative frequency, which have no conjugate,
+    and tells how many modes are not listed.
+
+    """
+    generator = pt.Generator().manual_seed(0)
+    t = pt.arange(60, dtype=pt.float64) * 0.05
+    modes = pt.randn(100, 2, dtype=complex128, generator=generator)
+    data_matrix = modes @ pt.stack([pt.exp(2j * pi * 1.0 * t), 0.5 * pt.exp(-2j * pi * 2.0 * t)])
+    t_steps = [str(round(float(time), 2)) for time in t]
+
+    tables, spectrum = [], simulation.spectrum
+
+    def summary(*args, **kwargs):
+        tables.append(spectrum(*args, **kwargs))
+        return tables[-1]
+
+    monkeypatch.setattr(simulation, "SPECTRUM_SUMMARY", True)
+    monkeypatch.setattr(simulation, "spectrum", summary)
+    monkeypatch.setattr(simulation, "SPECTRUM_SUMMARY_ROWS", 1)
+    with caplog.at_level("INFO", logger="DMD.simulation"):
+        run_DMD((None, t_steps, 0.05, data_matrix), keep_pairs=True)
+
+    frequencies = sorted(tables[0]["frequency"].tolist())
+    assert len(frequencies) == 2, "Modes of complex data were merged as conjugate pairs"
+    assert allclose(frequencies, [-2.0, 1.0], atol=1e-6)
+    assert "... 1 more modes" in caplog.text
+
+def test_compressed_DMD_matches_full():
+    """
+    Test that verifies compressed DMD, both through subsampling and projections, recovers eigenvalues and full-resolution modes.
+    Data have low rank, so a quarter of the points is enough to lose no accuracy.
+
+    """
+    _, t_steps, _, data_matrix = _two_waves()
+
+    for method in ("subsample", "projection"):
+        # Both waves are kept whole, otherwise a split conjugate pair makes the truncated operator sensitive to sampling
+        report = compare_compressed_DMD((None, t_steps, 0.1, data_matrix), n_samples=50, method=method, seed=0, keep_pairs=True)
+
+        assert report["rank_compressed"] == report["rank_full"], f"Optimal ranks are different with {method}"
+        assert report["eigenvalues_error"] < 1e-3, f"Eigenvalues are different with {method}"
+        assert report["modes_error"] < 1e-3, f"Modes are different with {method}"
+        assert abs(report["mse_compressed"] - report["mse_full"]) < 1e-3, f"MSEs are different with {method}"
+
+    reconstruction = run_compressed_DMD((None, t_steps, 0.1, data_matrix), n_samples=50, lazy=True)[5]
+    assert isinstance(reconstruction, LazyReconstruction), "Reconstruction is not lazy"
+
+def test_compress_data_memory(monkeypatch):
+    """
+    Test that verifies projections match the product with the whole Gaussian matrix, and that no block of the
+    Gaussian matrix grows with the number of points, so it is never built whole.
+
+    """
+    data_matrix = pt.randn(10000, 8)
+    blocked = compress_data(data_matrix, 30, "projection", pt.Generator().manual_seed(0), block_size=1000)
+    whole = pt.cat([pt.randn(30, 1000, generator=generator) for generator in [pt.Generator().manual_seed(0)] for _ in range(10)], dim=1)
+    assert pt.allclose(blocked, whole / 30 ** 0.5 @ data_matrix, atol=1e-4)
+
+    blocks, randn = [], pt.randn
+
+    def recorded_randn(*size, **kwargs):
+        blocks.append(size)
+        return randn(*size, **kwargs)
+
+    monkeypatch.setattr(simulation.pt, "randn", recorded_randn)
+
+    n_samples, block_size = 500, 4096
+    for n_points in (100000, 400000):
+        blocks.clear()
+        compress_data(randn(n_points, 10), n_samples, "projection", block_size=block_size)
+
+        assert sum(size[1] for size in blocks) == n_points, "Gaussian blocks don't cover every point"
+        assert max(size[0] * size[1] for size in blocks) <= n_samples * block_size, f"Gaussian matrix was built whole for {n_points} points"
+
+def test_optimized_DMD_matches_exact_on_clean_data():
+    """
+    Test that verifies optimized DMD returns the same outputs as exact DMD where the latter is already exact,
+    and that they have the shapes Plotter expects.
+
+    """
+    data = _two_waves()
+
+    # Both waves are kept whole, otherwise exact DMD splits a conjugate pair and is no longer exact
+    exact = run_DMD(data, keep_pairs=True)
+    rank, eig_val, _, phi, dynamics, reconstruction, mse = run_optimized_DMD(data, warm_start=exact)
+
+    assert rank == exact[0] and phi.shape == exact[3].shape and dynamics.shape == exact[4].shape
+    assert allclose(pt.sort(eig_val.imag).values, pt.sort(exact[1].imag).values, atol=1e-3), "Eigenvalues are different"
+    assert allclose(reconstruction, data[3], atol=1e-2), "Reconstruction is different from data"
+    assert mse.mean() <= exact[6].mean() + 1e-6, "Fit over all snapshots is worse than exact DMD"
+    assert isinstance(run_optimized_DMD(data, warm_start=exact, lazy=True)[5], LazyReconstruction), "Reconstruction is not lazy"
@@ -0,0 +1,53 @@
+import torch as pt
+import pytest
+import sys
+import os
+from numpy import pi
+from DMD.spectrum import spectrum, format_spectrum
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def modes():
+    """
+    Fixture that builds eigenvalues, unit-norm modes and dynamics of two conjugate pairs and a steady mode.
+
+    """
+    dt = 0.1
+    eig_val = pt.exp(dt * pt.tensor([0.5j * 2 * pi, -0.5j * 2 * pi, -0.1 + 2j * 2 * pi, -0.1 - 2j * 2 * pi, 0.0], dtype=pt.complex128))
+    amplitudes = pt.tensor([2.0, 2.0, 0.5, 0.5, 1.0], dtype=pt.complex128)
+
+    phi = pt.eye(6, 5, dtype=pt.complex128)
+    dynamics = amplitudes.unsqueeze(1) * pt.vander(eig_val, 20, increasing=True)
+    return eig_val, phi, dynamics, dt
+
+def test_spectrum_columns(modes):
+    """
+    Test that verifies frequencies, growth rates, amplitudes and energies of every mode.
+
+    """
+    table = spectrum(*modes, sort_by=None)
+
+    assert pt.allclose(table["frequency"], pt.tensor([0.5, -0.5, 2.0, -2.0, 0.0], dtype=pt.float64))
+    assert pt.allclose(table["growth_rate"], pt.tensor([0.0, 0.0, -0.1, -0.1, 0.0], dtype=pt.float64), atol=1e-12)
+    assert pt.allclose(table["amplitude"], pt.tensor([2.0, 2.0, 0.5, 0.5, 1.0], dtype=pt.float64))
+    assert pt.allclose(table["energy"][[0, 4]], pt.tensor([80.0, 20.0], dtype=pt.float64)), "Energies are different from the expected"
+
+def test_spectrum_conjugates_sorting_top_k(modes):
+    """
+    Test that verifies only one mode per conjugate pair is kept, with the energy of both, and that rows are sorted and cut.
+
+    """
+    table = spectrum(*modes, sort_by="energy", top_k=2, conjugates=False)
+
+    assert table["mode"].tolist() == [0, 4], "Rows are not the two most energetic modes with non-negative frequency"
+    assert pt.allclose(table["energy"], pt.tensor([160.0, 20.0], dtype=pt.float64))
+    assert "more modes" not in format_spectrum(table) and len(format_spectrum(table).splitlines()) == 3
+
+def test_spectrum_invalid_column(modes):
+    """
+    Test that verifies the correct raise of an error if rows are sorted by an unknown column.
+
+    """
+    with pytest.raises(ValueError, match="Unknown column"):
+        spectrum(*modes, sort_by="phase")
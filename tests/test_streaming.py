@@ -0,0 +1,81 @@
+import torch as pt
+import pytest
+import sys
+import os
+from DMD.simulation import run_DMD
+from DMD.streaming import StreamingDMD
+from DMD.synthetic import TWO_WAVES, wave_superposition
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def travelling_waves():
+    """
+    Fixture that builds a data matrix made of two travelling waves, at 0.5 Hz and 0.9 Hz, and a weak one at 0.2 Hz.
+
+    """
+    return wave_superposition(300, pt.arange(60, dtype=pt.float64) * 0.1, TWO_WAVES + ((0.02, 5.0, 0.2, 0.0),))
+
+def test_streaming_matches_batch_DMD(travelling_waves):
+    """
+    Test that verifies eigenvalues computed one snapshot at a time match the ones of run_DMD on the full matrix.
+
+    """
+    t_steps = [str(i) for i in range(travelling_waves.size(1))]
+    _, eig_val, _, _, _, _, _ = run_DMD((None, t_steps, 0.1, travelling_waves))
+
+    streaming = StreamingDMD(dt=0.1, max_rank=6)
+    for column in travelling_waves.T:
+        streaming.update(column)
+
+    eig_val_streaming = streaming.eigvals()
+
+    assert eig_val_streaming.size(0) == eig_val.size(0), "Number of eigenvalues is different from the expected"
+    distances = (eig_val_streaming.unsqueeze(1) - eig_val.unsqueeze(0)).abs().min(dim=1).values
+    assert distances.max() < 1e-6, "Eigenvalues are different from the expected"
+    assert streaming.U.size(1) <= 6, "Basis grew beyond the maximum rank"
+
+def test_streaming_batches_and_frequencies(travelling_waves):
+    """
+    Test that verifies batches of snapshots give the same result as single snapshots and frequencies are recovered.
+
+    """
+    single = StreamingDMD(dt=0.1)
+    for column in travelling_waves.T:
+        single.update(column)
+
+    batched = StreamingDMD(dt=0.1)
+    for batch in travelling_waves.split(7, dim=1):
+        batched.update(batch)
+
+    assert batched.n_snapshots == travelling_waves.size(1)
+    assert pt.allclose(batched.frequencies().sort().values, single.frequencies().sort().values)
+    assert single.modes().shape == (travelling_waves.size(0), single.eigvals().size(0))
+
+    frequencies = single.frequencies().abs()
+    assert (frequencies - 0.5).abs().min() < 1e-2 and (frequencies - 0.9).abs().min() < 1e-2
+
+def test_streaming_not_enough_snapshots():
+    """
+    Test that verifies the correct raise of an error if DMD is requested with a single snapshot.
+
+    """
+    streaming = StreamingDMD(dt=0.1).update(pt.rand(10))
+
+    with pytest.raises(ValueError, match="At least two snapshots are needed to compute DMD."):
+        streaming.eigvals()
+
+def test_streaming_zero_first_snapshot(travelling_waves):
+    """
+    Test that verifies zero snapshots at the start, e.g. a field at rest, don't spoil the basis, and only zero snapshots raise an error.
+
+    """
+    zeros = pt.zeros(travelling_waves.size(0), 2, dtype=travelling_waves.dtype)
+    streaming = StreamingDMD(dt=0.1).update(travelling_waves)
+    delayed = StreamingDMD(dt=0.1).update(pt.cat([zeros, travelling_waves], dim=1))
+
+    assert pt.isfinite(delayed.eigvals()).all() and pt.isfinite(delayed.modes()).all()
+    assert pt.allclose(delayed.eigvals(), streaming.eigvals())
+
+    with pytest.raises(ValueError, match="non-zero snapshot"):
+        StreamingDMD(dt=0.1).update(zeros).eigvals()
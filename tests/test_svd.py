@@ -0,0 +1,60 @@
+import torch as pt
+import pytest
+import sys
+import os
+from DMD.svd import compute_svd, randomized_svd, compare_with_exact
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def low_rank_matrix():
+    """
+    Fixture that builds a tall and skinny matrix with quickly decaying singular values.
+
+    """
+    generator = pt.Generator().manual_seed(0)
+    U, _ = pt.linalg.qr(pt.randn(2000, 60, dtype=pt.float64, generator=generator))
+    V, _ = pt.linalg.qr(pt.randn(60, 60, dtype=pt.float64, generator=generator))
+    s = 0.6 ** pt.arange(60, dtype=pt.float64)
+    return (U * s) @ V.T
+
+@pytest.mark.parametrize("method", ["exact", "snapshots", "randomized"])
+def test_compute_svd_methods(low_rank_matrix, method):
+    """
+    Test that verifies every engine gives the same leading singular values and optimal rank as the exact SVD.
+
+    """
+    U_e, s_e, _, rank_e = compute_svd(low_rank_matrix, 99.5, "exact")
+    U, s, Vh, rank = compute_svd(low_rank_matrix, 99.5, method)
+
+    assert rank >= rank_e, "Optimal rank is smaller than the exact one"
+    assert pt.allclose(s[:rank_e], s_e[:rank_e], rtol=1e-6), "Singular values are different from the expected"
+    assert pt.allclose((U[:, :rank_e].T @ U_e[:, :rank_e]).abs().diagonal(), pt.ones(rank_e, dtype=pt.float64), atol=1e-6)
+
+def test_randomized_svd_fixed_rank(low_rank_matrix):
+    """
+    Test that verifies the randomized SVD returns the requested number of triplets.
+
+    """
+    U, s, Vh = randomized_svd(low_rank_matrix, 8, generator=pt.Generator().manual_seed(1))
+
+    assert U.shape == (2000, 8) and s.shape == (8,) and Vh.shape == (8, 60)
+
+def test_compare_with_exact(low_rank_matrix):
+    """
+    Test that verifies the comparison report contains speedup and errors.
+
+    """
+    report = compare_with_exact(low_rank_matrix, 99.5, "snapshots")
+
+    assert report["speedup"] > 0
+    assert report["subspace_error"] < 1e-6
+    assert report["truncation_error_method"] == pytest.approx(report["truncation_error_exact"], rel=1e-6)
+
+def test_compute_svd_invalid_method(low_rank_matrix):
+    """
+    Test that verifies the correct raise of an error if an unknown SVD engine is chosen.
+
+    """
+    with pytest.raises(ValueError, match="Unknown SVD method"):
+        compute_svd(low_rank_matrix, 99.5, "qr")
@@ -0,0 +1,105 @@
+import torch as pt
+import pytest
+import sys
+import os
+import DMD.simulation as simulation
+import DMD.sweep as sweep
+from DMD.simulation import run_DMD
+from DMD.sweep import sweep_DMD
+from DMD.synthetic import SyntheticLoader
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def noisy_data():
+    """
+    Fixture that builds noisy travelling waves, whose optimal rank changes with the threshold.
+
+    """
+    loader = SyntheticLoader("travelling_waves", n_points=600, n_times=60, rank=6, noise=0.05)
+    data_matrix = loader.data_matrix.double()
+    return (None, loader.write_times, float(loader.write_times[1]) - float(loader.write_times[0]), data_matrix)
+
+def _matched(a, b, atol):
+    # Every eigenvalue of each set has one of the other set within the tolerance, whatever the order of eigenvalues
+    distances = (a.unsqueeze(1) - b.unsqueeze(0)).abs()
+    return a.size(0) == b.size(0) and distances.min(dim=1).values.max() < atol and distances.min(dim=0).values.max() < atol
+
+def test_sweep_matches_run_DMD(noisy_data):
+    """
+    Test that verifies every candidate of the sweep matches a separate run of DMD with the same threshold.
+
+    """
+    thresholds = [60.0, 80.0, 95.0]
+    results = sweep_DMD(noisy_data, thresholds=thresholds)
+
+    assert len({result["optimal_rank"] for result in results}) > 1, "Thresholds should lead to different ranks"
+
+    for thr, result in zip(thresholds, results):
+        optimal_rank, eig_val, _, _, _, _, mse = run_DMD(noisy_data, thr=thr)
+
+        assert result["threshold"] == thr and result["optimal_rank"] == optimal_rank
+        assert _matched(result["eig_val"], eig_val, 1e-8), f"Eigenvalues of threshold {thr} are different from the expected"
+        assert pt.allclose(result["mse"], mse, rtol=1e-5, atol=1e-10), f"MSE of threshold {thr} is different from the expected"
+
+@pytest.mark.parametrize("method", ["pinv", "projected", "optimal"])
+def test_sweep_amplitude_methods(noisy_data, monkeypatch, method):
+    """
+    Test that verifies the sweep computes amplitudes with the method of the configuration, as run_DMD does.
+
+    """
+    # Both modules import AMPLITUDE_METHOD from DMD.config, so both are set
+    monkeypatch.setattr(simulation, "AMPLITUDE_METHOD", method)
+    monkeypatch.setattr(sweep, "AMPLITUDE_METHOD", method)
+    result = sweep_DMD(noisy_data, thresholds=[95.0])[0]
+    _, eig_val, _, _, dynamics, _, mse = run_DMD(noisy_data, thr=95.0)
+
+    # Amplitudes compared mode by mode, each mode of the sweep with the one of run_DMD of the closest eigenvalue
+    order = (result["eig_val"].unsqueeze(1) - eig_val.unsqueeze(0)).abs().argmin(dim=1)
+    assert _matched(result["eig_val"], eig_val, 1e-8)
+    assert pt.allclose(result["amplitudes"], dynamics[order, 0].to(result["amplitudes"].dtype), rtol=1e-5, atol=1e-8), \
+        f"Amplitudes of method {method} are different from the expected"
+    assert pt.allclose(result["mse"], mse, rtol=1e-5, atol=1e-10)
+
+    monkeypatch.setattr(sweep, "AMPLITUDE_METHOD", "unknown")
+    with pytest.raises(ValueError):
+        sweep_DMD(noisy_data, thresholds=[95.0])
+
+def test_sweep_randomized_ranks(noisy_data, monkeypatch):
+    """
+    Test that verifies thresholds of a sweep with the randomized engine account for the singular values not computed,
+    as run_DMD does, instead of picking ranks smaller than those of the exact SVD.
+
+    """
+    thresholds = [60.0, 80.0, 95.0]
+    exact = [result["optimal_rank"] for result in sweep_DMD(noisy_data, thresholds=thresholds)]
+
+    monkeypatch.setattr(simulation, "SVD_METHOD", "randomized")
+    monkeypatch.setattr(sweep, "SVD_METHOD", "randomized")
+    pt.manual_seed(0)
+    results = sweep_DMD(noisy_data, thresholds=thresholds)
+    pt.manual_seed(0)
+    optimal_rank = run_DMD(noisy_data, thr=thresholds[-1])[0]    # Same random test matrices as the sweep
+
+    assert all(result["optimal_rank"] >= rank for result, rank in zip(results, exact))
+    assert results[-1]["optimal_rank"] == optimal_rank, "Rank of the largest threshold is different from the one of run_DMD"
+    assert [result["optimal_rank"] for result in sweep_DMD(noisy_data, ranks=[2, 4])] == [2, 4]
+
+def test_sweep_ranks_and_threads(noisy_data):
+    """
+    Test that verifies explicit ranks give the same results with and without a thread pool, and invalid ranks are rejected.
+
+    """
+    ranks = [2, 4, 6, 8]
+    sequential = sweep_DMD(noisy_data, ranks=ranks)
+    threaded = sweep_DMD(noisy_data, ranks=ranks, workers=4)
+
+    assert [result["optimal_rank"] for result in sequential] == ranks
+    assert all(pt.equal(a["mse"], b["mse"]) for a, b in zip(sequential, threaded))
+    assert sequential[2]["mse"].mean() < sequential[0]["mse"].mean(), "Error should decrease with the rank"
+
+    with pytest.raises(ValueError):
+        sweep_DMD(noisy_data, ranks=[0])
+
+    with pytest.raises(ValueError):
+        sweep_DMD(noisy_data)
@@ -0,0 +1,52 @@
+import torch as pt
+import pytest
+import sys
+import os
+from numpy import pi
+from DMD.data_processor import process_data
+from DMD.simulation import run_DMD
+from DMD.synthetic import SyntheticLoader
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def loader():
+    """
+    Fixture that builds a small synthetic vortex street with shedding frequency of 1 Hz.
+
+    """
+    return SyntheticLoader("vortex_shedding", n_points=2000, n_times=80, rank=6)
+
+def test_synthetic_loader_in_pipeline(loader):
+    """
+    Test that verifies synthetic snapshots go through process_data unchanged and DMD recovers the shedding frequency.
+
+    """
+    mask, t_steps, dt, data_matrix = process_data(use_cache=False, lower=[-1.0, -1.0], upper=[2.0, 1.0], min_time=0.0, loader=loader)
+
+    assert mask.all() and len(t_steps) == 80 and dt == 0.025
+    assert pt.allclose(data_matrix, loader.data_matrix), "Data matrix is different from the synthetic snapshots"
+
+    _, eig_val, _, _, _, _, _ = run_DMD((mask, t_steps, dt, data_matrix))
+    frequencies = pt.log(eig_val).imag / (2.0 * pi * dt)
+
+    assert (frequencies.abs() - 1.0).abs().min() < 1e-2, "Shedding frequency was not recovered"
+
+@pytest.mark.parametrize("generator", ["travelling_waves", "vortex_shedding"])
+def test_synthetic_rank(generator):
+    """
+    Test that verifies synthetic data have the requested rank.
+
+    """
+    data_matrix = SyntheticLoader(generator, n_points=1000, n_times=60, rank=8).data_matrix
+    s = pt.linalg.svdvals(data_matrix)
+
+    assert (s > 1e-4 * s[0]).sum() == 8, "Rank of synthetic data is different from the expected"
+
+def test_synthetic_invalid_generator():
+    """
+    Test that verifies the correct raise of an error if an unknown generator is chosen.
+
+    """
+    with pytest.raises(ValueError, match="Unknown generator"):
+        SyntheticLoader("channel_flow")
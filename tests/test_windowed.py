@@ -0,0 +1,60 @@
+import torch as pt
+import pytest
+import sys
+import os
+from numpy import pi
+from DMD.windowed import banded_gram, window_gram, run_windowed_DMD
+from DMD.synthetic import wave_superposition
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+@pytest.fixture
+def drifting_data():
+    """
+    Fixture that builds two travelling waves whose frequencies change halfway through the time series.
+
+    """
+    dt = 0.05
+    t = pt.arange(120, dtype=pt.float64) * dt
+    f1 = pt.where(t < 3.0, 1.0, 2.0)
+
+    data_matrix = wave_superposition(150, t, ((1.0, 1.0, f1, 0.0), (0.5, 3.0, -0.4, pi / 2)))
+    t_steps = [str(round(float(time), 2)) for time in t]
+    return (None, t_steps, dt, data_matrix)
+
+def test_window_gram_matches_direct(drifting_data):
+    """
+    Test that verifies Gram matrices of windows extracted from the band equal the ones computed directly.
+
+    """
+    data_matrix = drifting_data[3]
+    band = banded_gram(data_matrix, 30)
+
+    for start in (0, 7, 90):
+        X = data_matrix[:, start:start + 30]
+        assert pt.allclose(window_gram(band, start, 30), X.T @ X), f"Gram matrix of window {start} is different from the expected"
+
+def test_windowed_DMD_follows_frequency_drift(drifting_data):
+    """
+    Test that verifies windows before and after the change recover the respective frequencies.
+
+    """
+    times, eig_val, frequencies = run_windowed_DMD(drifting_data, window=40, stride=20, rank=4)
+
+    assert times.tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert eig_val.shape == frequencies.shape == (5, 4)
+
+    expected_before = pt.tensor([-1.0, -0.4, 0.4, 1.0], dtype=pt.float64)
+    expected_after = pt.tensor([-2.0, -0.4, 0.4, 2.0], dtype=pt.float64)
+
+    assert pt.allclose(frequencies[0], expected_before, atol=1e-3), "Frequencies before the change are different from the expected"
+    assert pt.allclose(frequencies[-1], expected_after, atol=1e-3), "Frequencies after the change are different from the expected"
+    assert pt.allclose(eig_val[-1].abs(), pt.ones(4, dtype=pt.float64), atol=1e-6), "Undamped waves have damped eigenvalues"
+
+def test_windowed_DMD_invalid_window(drifting_data):
+    """
+    Test that verifies the correct raise of an error if the window is longer than the time series.
+
+    """
+    with pytest.raises(ValueError, match="Window must contain"):
+        run_windowed_DMD(drifting_data, window=500)